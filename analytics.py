@@ -0,0 +1,272 @@
+# ==============================
+# SCORE ANALYTICS
+#   Distribution statistics of FinalScore per domain / technology /
+#   department (team leader's) and of Marks.Percentage per evaluation round:
+#   count, mean, std, min, quartiles, p90, max, a 10-point histogram and
+#   grade-band counts. The rows are pulled once per data version into flat
+#   columns (array('d') values + dictionary-coded groups) and every group is
+#   computed in one pass: with NumPy when it is installed, plain Python else.
+#   Data version = the read cache's write generations of the source tables,
+#   so any write made through services drops the results; ANALYTICS_TTL
+#   bounds how long writes by other clients can go unseen.
+# ==============================
+import bisect
+import math
+import threading
+import time
+from array import array
+
+import services
+from grading import GRADE_CUTOFFS, LOWEST_GRADE
+
+try:
+    import numpy as np
+except ImportError:   # optional: same numbers, computed in Python
+    np = None
+
+ANALYTICS_TTL = 300.0   # seconds, like the read cache
+FETCH_ROWS = 10000
+SOURCE_TABLES = ("Project", "Grade", "Team", "Student", "Marks", "Evaluation", "Faculty")
+
+HIST_WIDTH = 10                      # 0-10, 10-20, ..., 90-100 (100 goes in the last bin)
+HIST_BINS = 100 // HIST_WIDTH
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+# Band edges ascending, so searchsorted / bisect give the band index (0 = lowest grade)
+BAND_EDGES = [float(c) for c, _ in reversed(GRADE_CUTOFFS)]
+BAND_LABELS = [LOWEST_GRADE] + [label for _, label in reversed(GRADE_CUTOFFS)]
+
+# Every graded project; leader's Dept via Team.StudentID
+PROJECT_SQL = """
+    SELECT p.Domain, p.Technology, s.Dept, g.FinalScore
+    FROM Grade g
+    JOIN Project p ON p.ProjectID = g.ProjectID
+    LEFT JOIN Team t ON t.TeamID = p.TeamID
+    LEFT JOIN Student s ON s.StudentID = t.StudentID
+    WHERE g.FinalScore IS NOT NULL
+"""
+MARKS_SQL = """
+    SELECT e.Rounds, m.Percentage
+    FROM Marks m
+    JOIN Evaluation e ON e.EvaluationID = m.EvaluationID
+    WHERE m.Percentage IS NOT NULL
+"""
+
+# dimension -> (dataset, group column, what is measured)
+DIMENSIONS = {
+    "domain":     ("projects", "Domain", "FinalScore"),
+    "technology": ("projects", "Technology", "FinalScore"),
+    "department": ("projects", "Dept", "FinalScore"),
+    "round":      ("marks", "Rounds", "Percentage"),
+}
+STAT_COLUMNS = ["Group", "Count", "Mean", "Std", "Min", "P25", "Median", "P75", "P90", "Max"]
+
+
+class Columns:
+    """One float column plus dictionary-coded group columns (labels interned once)."""
+
+    def __init__(self, groups):
+        self.values = array("d")
+        self.codes = {g: array("i") for g in groups}
+        self.labels = {g: [] for g in groups}
+        self._index = {g: {} for g in groups}
+
+    def append(self, value, groups):
+        self.values.append(float(value))
+        for g, label in zip(self.codes, groups):
+            label = "(none)" if label is None else str(label)
+            index = self._index[g]
+            code = index.get(label)
+            if code is None:
+                code = index[label] = len(self.labels[g])
+                self.labels[g].append(label)
+            self.codes[g].append(code)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def load_columns(conn_fn):
+    """Both datasets from one connection checkout: {"projects": Columns, "marks": Columns}."""
+    data = {"projects": Columns(["Domain", "Technology", "Dept"]), "marks": Columns(["Rounds"])}
+    conn, cursor = conn_fn()
+    try:
+        for name, sql in (("projects", PROJECT_SQL), ("marks", MARKS_SQL)):
+            cols = data[name]
+            cursor.execute(sql)
+            while True:
+                rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    break
+                for row in rows:
+                    cols.append(row[-1], row[:-1])
+    finally:
+        conn.close()
+    return data
+
+
+# ---------- statistics ----------
+def _quantile(sorted_values, lo, n, q):
+    """Linearly interpolated quantile of sorted_values[lo:lo + n] (numpy's default method)."""
+    pos = lo + q * (n - 1)
+    i = int(pos)
+    j = min(i + 1, lo + n - 1)
+    return sorted_values[i] + (sorted_values[j] - sorted_values[i]) * (pos - i)
+
+
+def _group_stats_python(values, codes, n_groups):
+    groups = [[] for _ in range(n_groups)]
+    for v, c in zip(values, codes):
+        groups[c].append(v)
+    out = []
+    for vals in groups:
+        vals.sort()
+        n = len(vals)
+        mean = math.fsum(vals) / n
+        hist = [0] * HIST_BINS
+        bands = [0] * len(BAND_LABELS)
+        for v in vals:
+            hist[min(max(int(v // HIST_WIDTH), 0), HIST_BINS - 1)] += 1
+            bands[bisect.bisect_right(BAND_EDGES, v)] += 1
+        out.append({"count": n, "mean": mean, "std": math.sqrt(math.fsum((v - mean) ** 2 for v in vals) / n),
+                    "min": vals[0], "max": vals[-1],
+                    "quantiles": [_quantile(vals, 0, n, q) for q in QUANTILES], "hist": hist, "bands": bands})
+    return out
+
+
+def _group_stats_numpy(values, codes, n_groups):
+    v = np.frombuffer(values, dtype=np.float64)
+    c = np.frombuffer(codes, dtype=np.intc)
+    order = np.lexsort((v, c))   # by group, then value: each group is a sorted run
+    v, c = v[order], c[order]
+    starts = np.searchsorted(c, np.arange(n_groups))
+    counts = np.diff(np.append(starts, len(c)))
+    means = np.add.reduceat(v, starts) / counts
+    dev = v - np.repeat(means, counts)
+    stds = np.sqrt(np.add.reduceat(dev * dev, starts) / counts)
+    quants = []
+    for q in QUANTILES:
+        pos = starts + q * (counts - 1)
+        i = pos.astype(np.int64)
+        j = np.minimum(i + 1, starts + counts - 1)
+        quants.append(v[i] + (v[j] - v[i]) * (pos - i))
+    bins = np.clip((v // HIST_WIDTH).astype(np.int64), 0, HIST_BINS - 1)
+    hist = np.bincount(c * HIST_BINS + bins, minlength=n_groups * HIST_BINS).reshape(n_groups, HIST_BINS)
+    n_bands = len(BAND_LABELS)
+    band = np.searchsorted(BAND_EDGES, v, side="right")
+    bands = np.bincount(c * n_bands + band, minlength=n_groups * n_bands).reshape(n_groups, n_bands)
+    mins, maxs = v[starts], v[starts + counts - 1]
+    return [{"count": int(counts[g]), "mean": float(means[g]), "std": float(stds[g]),
+             "min": float(mins[g]), "max": float(maxs[g]), "quantiles": [float(q[g]) for q in quants],
+             "hist": hist[g].tolist(), "bands": bands[g].tolist()} for g in range(n_groups)]
+
+
+def group_stats(values, codes, labels, use_numpy=None):
+    """[{group, count, mean, std, min, p25, median, p75, p90, max, hist, bands}] sorted by group.
+
+    std is the population standard deviation; bands maps grade letter -> count.
+    """
+    if not values:
+        return []
+    use_numpy = np is not None if use_numpy is None else use_numpy
+    stats = (_group_stats_numpy if use_numpy else _group_stats_python)(values, codes, len(labels))
+    out = []
+    for label, s in zip(labels, stats):
+        p25, median, p75, p90 = s["quantiles"]
+        out.append({"group": label, "count": s["count"], "mean": round(s["mean"], 2), "std": round(s["std"], 2),
+                    "min": round(s["min"], 2), "p25": round(p25, 2), "median": round(median, 2),
+                    "p75": round(p75, 2), "p90": round(p90, 2), "max": round(s["max"], 2),
+                    "hist": s["hist"], "bands": dict(zip(BAND_LABELS, s["bands"]))})
+    return sorted(out, key=lambda r: (r["group"] == "(none)", _sort_key(r["group"])))
+
+
+def _sort_key(label):
+    return (0, int(label), "") if label.lstrip("-").isdigit() else (1, 0, label)
+
+
+# ---------- cached engine ----------
+class Analytics:
+    def __init__(self, conn_fn=None, version_fn=None, ttl=ANALYTICS_TTL, clock=time.monotonic):
+        self.conn_fn = conn_fn or services.get_conn_cursor
+        self.version_fn = version_fn or (lambda: services.READ_CACHE.generation(*SOURCE_TABLES))
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._data = None
+        self._results = {}   # dimension -> result, for self._version
+
+    def _fresh(self, version):
+        return (self._data is not None and self._version == version
+                and self.clock() - self._loaded_at < self.ttl)
+
+    def analyze(self, dimension, refresh=False):
+        """Stats per group of dimension plus an overall row (runs on a worker thread).
+
+        Returns {"dimension", "measure", "rows": [...], "overall": {...}, "engine",
+        "cached", "seconds", "load_seconds", "version", "data_rows"}.
+        """
+        if dimension not in DIMENSIONS:
+            raise services.ServiceError(f"Unknown dimension {dimension!r}; use one of {', '.join(DIMENSIONS)}")
+        started = time.perf_counter()
+        version = self.version_fn()
+        with self._lock:
+            if refresh or not self._fresh(version):
+                self._data, self._results = None, {}
+            elif dimension in self._results:
+                return dict(self._results[dimension], cached=True, seconds=round(time.perf_counter() - started, 4))
+            data, loaded_version = self._data, self._version
+        load_seconds = 0.0
+        if data is None:
+            load_started = time.perf_counter()
+            data = load_columns(self.conn_fn)
+            load_seconds = round(time.perf_counter() - load_started, 3)
+            loaded_version = version
+        dataset, group_col, measure = DIMENSIONS[dimension]
+        cols = data[dataset]
+        result = {"dimension": dimension, "measure": measure, "engine": "numpy" if np is not None else "python",
+                  "rows": group_stats(cols.values, cols.codes[group_col], cols.labels[group_col]),
+                  "overall": (group_stats(cols.values, array("i", [0]) * len(cols), ["All"]) or [None])[0],
+                  "load_seconds": load_seconds, "version": loaded_version, "data_rows": len(cols)}
+        with self._lock:
+            # A write during the load leaves the result uncached (like ReadCache.get_or_load)
+            if self.version_fn() == loaded_version:
+                if self._data is not data:
+                    self._data, self._version, self._loaded_at, self._results = data, loaded_version, self.clock(), {}
+                self._results[dimension] = result
+        return dict(result, cached=False, seconds=round(time.perf_counter() - started, 4))
+
+    def clear(self):
+        with self._lock:
+            self._data, self._version, self._results = None, None, {}
+
+
+ANALYTICS = Analytics()
+
+
+# ---------- output ----------
+def stat_rows(result):
+    """(columns, rows) for a Treeview / print_rows: one row per group, overall last, then band counts."""
+    columns = STAT_COLUMNS + BAND_LABELS[::-1]
+    rows = [[r["group"], r["count"], r["mean"], r["std"], r["min"], r["p25"], r["median"], r["p75"],
+             r["p90"], r["max"]] + [r["bands"][b] for b in BAND_LABELS[::-1]]
+            for r in result["rows"] + ([result["overall"]] if result["overall"] else [])]
+    return columns, rows
+
+
+def histogram_text(row, width=40):
+    """Text histogram of one stats row."""
+    peak = max(row["hist"]) or 1
+    lines = []
+    for i, n in enumerate(row["hist"]):
+        lo = i * HIST_WIDTH
+        lines.append(f"{lo:3d}-{lo + HIST_WIDTH:<3d} {'#' * round(n / peak * width):<{width}} {n:,}")
+    return "\n".join(lines)
+
+
+def format_summary(result):
+    text = f"{result['measure']} by {result['dimension']}: {result['data_rows']:,} rows, "
+    if result["cached"]:
+        return text + f"cached ({result['seconds'] * 1000:.1f} ms)"
+    text += f"computed with {result['engine']} in {result['seconds']:.3f}s"
+    return text + (f" incl. {result['load_seconds']:.2f}s data load" if result["load_seconds"] else "")
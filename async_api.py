@@ -0,0 +1,301 @@
+# ==============================
+# ASYNC DATA ACCESS (web portal)
+#   The services.py operations for asyncio code: entity CRUD and paging,
+#   the report views, the rubric queries, percentage / grade recalculation
+#   and the rankings. mysql.connector is blocking, so calls run on a private
+#   thread pool and AsyncPool keeps at most DB_POOL.max_size of them in
+#   flight: no thread ever waits inside DB_POOL.acquire(), and the event loop
+#   never blocks. Callers past MAX_WAITING queued calls (or waiting longer
+#   than ACQUIRE_TIMEOUT) get Overloaded at once, which a web handler turns
+#   into a 503 instead of piling up requests behind a saturated database.
+#   Writes go through the same services functions as the GUI, so the read
+#   cache, cascades and change_log behave the same.
+#
+#   python projecteval_cli.py --backend sqlite --sqlite-path check.db async-check
+# ==============================
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmark
+import grading
+import paging
+import rankings
+import services
+
+MAX_WAITING = 100       # queued calls per pool before new ones are refused
+ACQUIRE_TIMEOUT = 10.0  # seconds a call may wait for a free slot (like DB_POOL's timeout)
+ACTIONS = ("add", "update", "delete")
+PAGING_CHECK_ROWS = 2000   # self_check pages through at most this many Grade rows
+
+
+class Overloaded(Exception):
+    """Too many calls waiting for the database: retry later (HTTP 503)."""
+
+
+class AsyncPool:
+    """Bounded async front of DB_POOL: size slots, each backed by one executor thread."""
+
+    def __init__(self, size=None, max_waiting=MAX_WAITING, timeout=ACQUIRE_TIMEOUT):
+        self.size = size or services.DB_POOL.max_size
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(self.size, thread_name_prefix="async-db")
+        self._slots = None   # asyncio.Semaphore, made inside the running loop (one pool per loop)
+        self._stats = {"calls": 0, "errors": 0, "rejected": 0, "timeouts": 0,
+                       "in_flight": 0, "peak_in_flight": 0, "waiting": 0, "peak_waiting": 0}
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) on a pool thread once a slot is free; its result or exception."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        st = self._stats
+        if not self._slots.locked():
+            await self._slots.acquire()   # a slot is free: no waiting
+        else:
+            if st["waiting"] >= self.max_waiting:
+                st["rejected"] += 1
+                raise Overloaded(f"{st['waiting']} database calls already waiting")
+            st["waiting"] += 1
+            st["peak_waiting"] = max(st["peak_waiting"], st["waiting"])
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                st["timeouts"] += 1
+                raise Overloaded(f"no database slot free within {self.timeout:g}s") from None
+            finally:
+                st["waiting"] -= 1
+        st["calls"] += 1
+        st["in_flight"] += 1
+        st["peak_in_flight"] = max(st["peak_in_flight"], st["in_flight"])
+        future = asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        # The slot is freed when the thread finishes, even if the caller is cancelled first
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            st["errors"] += 1
+            raise
+
+    def _release(self, future):
+        self._stats["in_flight"] -= 1
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()   # retrieved: no "never retrieved" warning when the caller was cancelled
+
+    def stats(self):
+        return dict(self._stats, size=self.size, max_waiting=self.max_waiting)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class AsyncData:
+    """The app's operations as coroutines. Results are what the services functions return."""
+
+    def __init__(self, pool=None):
+        self.pool = pool or AsyncPool()
+
+    def _entity(self, entity):
+        if entity not in services.ENTITIES:
+            raise services.ServiceError(f"Unknown entity {entity!r}; use one of {', '.join(services.ENTITIES)}")
+        return services.ENTITIES[entity]
+
+    # ---------- entities ----------
+    async def write(self, entity, action, values):
+        """action add / update (values in services.ENTITIES column order) or delete (values = key).
+
+        Returns (rows_affected, fresh_rows, total, total_is_estimate)."""
+        self._entity(entity)
+        if action not in ACTIONS:
+            raise services.ServiceError(f"Unknown action {action!r}; use one of {', '.join(ACTIONS)}")
+        return await self.pool.run(getattr(services, f"{action}_{entity}"), values)
+
+    async def add(self, entity, values):
+        return await self.write(entity, "add", values)
+
+    async def update(self, entity, values):
+        return await self.write(entity, "update", values)
+
+    async def delete(self, entity, key):
+        return await self.write(entity, "delete", key)
+
+    async def get(self, entity, *keys):
+        """Rows with these keys (Marks: all rows of an EvaluationID)."""
+        spec = self._entity(entity)
+        rows, _, _ = await self.pool.run(services.fetch_by_keys, spec["table"], spec["key"][0], keys)
+        return rows
+
+    async def list(self, entity, limit=None, filters=None):
+        """(columns, rows); filters as for the filter bar (paging.build_where)."""
+        return await self.pool.run(services.list_table, self._entity(entity)["table"], limit, filters)
+
+    async def page(self, entity, after=None, limit=paging.PAGE_SIZE, sort=None, filters=None):
+        """One keyset page: {"rows", "next"}; pass next back as after for the following page.
+
+        sort: [(column, descending)] as on the tab headings. Tables without a key page by OFFSET
+        (after is then the offset)."""
+        spec = self._entity(entity)
+        pager = paging.Pager(spec["table"], spec["columns"], page_size=limit)
+        if filters:
+            where, params, errors = paging.build_where(spec["table"], filters)
+            if errors:
+                raise services.ServiceError("; ".join(errors))
+            pager.set_filter(where, params)
+        pager.set_sort(sort or [])
+        if pager.key_cols:
+            sql, params = paging.keyset_sql(pager.table, pager.key_cols, after=after, limit=limit,
+                                            where=pager.where, where_params=pager.where_params, order=pager.order)
+        else:
+            sql, params = paging.offset_sql(pager.table, after or 0, limit, pager.where, pager.where_params,
+                                            pager.order)
+        rows = await self.pool.run(services.fetch_page, pager.table, sql, params)
+        if len(rows) < limit:
+            return {"rows": rows, "next": None}
+        if pager.key_cols:
+            last = rows[-1]
+            nxt = pager.seek_of(last) if pager.order else pager.key_of(last)
+        else:
+            nxt = (after or 0) + len(rows)
+        return {"rows": rows, "next": nxt}
+
+    # ---------- reports / queries ----------
+    async def project_summary(self):
+        """(columns, rows, source) of vw_project_summary (or the summary table)."""
+        return await self.pool.run(services.project_summary)
+
+    async def top_projects(self, limit=10):
+        return await self.pool.run(services.top_projects, limit)
+
+    async def rubric_query(self, name):
+        return await self.pool.run(services.run_rubric_query, name)
+
+    async def rankings_top(self, board="overall", group=None, k=rankings.TOP_K):
+        return await self.pool.run(rankings.RANKINGS.top, board, group, k)
+
+    async def rank_of(self, entity, key):
+        return await self.pool.run(rankings.RANKINGS.rank_of, entity, key)
+
+    async def report_page(self, top=10):
+        """Everything the reports page shows, fetched concurrently: summary, top projects, rubric queries."""
+        names = list(services.RUBRIC_QUERIES)
+        summary, top_rows, *queries = await asyncio.gather(
+            self.project_summary(), self.top_projects(top), *(self.rubric_query(n) for n in names))
+        return {"summary": summary, "top": top_rows, "queries": dict(zip(names, queries))}
+
+    # ---------- recalculation ----------
+    async def recalc_percentage(self, eid):
+        return await self.pool.run(services.recalc_percentage, eid)
+
+    async def recompute_grades(self, dry_run=False):
+        """grading.recompute_grades stats; a real run drops cached Grade reads like the GUI's."""
+        if dry_run:
+            return await self.pool.run(grading.recompute_grades, services.get_conn_cursor, dry_run=True)
+        return await self.pool.run(services.write_through, ["Grade"], grading.recompute_grades,
+                                   services.get_conn_cursor)
+
+    def close(self):
+        self.pool.close()
+
+
+# ---------- self-check ----------
+def _slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+async def _checks(data, burst, on_result):
+    results = []
+
+    def record(name, ok, detail):
+        results.append({"check": name, "ok": bool(ok), "detail": detail})
+        if on_result:
+            on_result(results[-1])
+
+    # CRUD through every entity, parents first; delete children first (benchmark's rows)
+    for e in reversed(benchmark.CREATE_ORDER):   # left by an interrupted run
+        await data.delete(e, benchmark.BENCH_ID)
+    ok = True
+    for e in benchmark.CREATE_ORDER:
+        affected, rows, _, _ = await data.add(e, benchmark.BENCH_ROWS[e])
+        ok &= affected == 1 and len(rows) == 1
+    for e in benchmark.CREATE_ORDER:
+        await data.update(e, benchmark.BENCH_UPDATES[e])
+    row = (await data.get("student", benchmark.BENCH_ID))[0]
+    ok &= row[1] == benchmark.BENCH_UPDATES["student"][1]
+    for e in reversed(benchmark.CREATE_ORDER):
+        affected, rows, _, _ = await data.delete(e, benchmark.BENCH_ID)
+        ok &= affected >= 1 and not rows
+    record("crud", ok, "add/update/delete of " + ", ".join(benchmark.CREATE_ORDER))
+
+    # Keyset pages sorted by FinalScore: in order, no row twice, as many as one read returns
+    seen, after = [], None
+    while len(seen) < PAGING_CHECK_ROWS:
+        page = await data.page("grade", after, limit=50, sort=[("FinalScore", True)])
+        seen += page["rows"]
+        after = page["next"]
+        if after is None:
+            break
+    _, every = await data.list("grade", len(seen) + 1)
+    scores = [-1 if r[1] is None else r[1] for r in seen]
+    record("paging", scores == sorted(scores, reverse=True) and len({r[2] for r in seen}) == len(seen)
+           and (len(every) == len(seen) if after is None else len(every) > len(seen)),
+           f"{len(seen):,} Grade rows in pages of 50, sorted by FinalScore")
+
+    # Fan-out: the report page's queries at once vs one after another
+    services.READ_CACHE.clear()
+    started = time.perf_counter()
+    page = await data.report_page()
+    fanned = time.perf_counter() - started
+    services.READ_CACHE.clear()
+    started = time.perf_counter()
+    await data.project_summary()
+    await data.top_projects(10)
+    for name in services.RUBRIC_QUERIES:
+        await data.rubric_query(name)
+    serial = time.perf_counter() - started
+    record("fan-out", page["summary"][1] is not None and set(page["queries"]) == set(services.RUBRIC_QUERIES),
+           f"report page {fanned * 1000:.1f} ms concurrent, {serial * 1000:.1f} ms one by one")
+
+    # Backpressure: never more than size calls in flight; callers past max_waiting are refused
+    pool = data.pool
+    before = pool.stats()
+    outcomes = await asyncio.gather(*(pool.run(_slow, 0.05) for _ in range(burst)), return_exceptions=True)
+    after_stats = pool.stats()
+    refused = sum(isinstance(o, Overloaded) for o in outcomes)
+    expected = max(0, burst - pool.size - pool.max_waiting)
+    record("backpressure", after_stats["peak_in_flight"] <= pool.size and refused == expected
+           and after_stats["rejected"] - before["rejected"] == refused,
+           f"{burst} calls: peak {after_stats['peak_in_flight']} in flight (size {pool.size}), "
+           f"{refused} refused (expected {expected})")
+
+    # A cancelled caller keeps its slot until the thread is done, then frees it
+    task = asyncio.ensure_future(pool.run(_slow, 0.2))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.sleep(0)
+    held = pool.stats()["in_flight"]
+    await asyncio.sleep(0.3)
+    record("cancel", held == 1 and pool.stats()["in_flight"] == 0,
+           f"{held} in flight right after cancel, {pool.stats()['in_flight']} once the thread finished")
+
+    # Errors come back as the services exceptions
+    try:
+        await data.rubric_query("nope")
+        record("errors", False, "no ServiceError")
+    except services.ServiceError as e:
+        record("errors", True, f"ServiceError: {e}")
+    return results
+
+
+def self_check(size=None, max_waiting=20, burst=60, on_result=None):
+    """Run the async API against the configured database (use a scratch SQLite file).
+
+    Returns [{"check", "ok", "detail"}]. Writes use benchmark.BENCH_ID rows and delete them.
+    """
+    data = AsyncData(AsyncPool(size, max_waiting=max_waiting))
+    try:
+        return asyncio.run(_checks(data, burst, on_result))
+    finally:
+        data.close()
@@ -0,0 +1,223 @@
+# ==============================
+# BENCHMARK HARNESS
+#   Times the app's own operations (the services / grading / recalc calls
+#   behind the GUI buttons and the CLI) against whatever data is loaded,
+#   usually a datagen.generate() dataset, and writes JSON results that
+#   can be compared run to run. Reads run with the read cache cleared so
+#   every run reaches MySQL. CRUD runs use BENCH_ID rows and delete them.
+# ==============================
+import json
+import platform
+import statistics
+import time
+
+import grading
+import migrations
+import paging
+import recalc
+import services
+from perf_metrics import METRICS, percentile
+
+BENCH_ID = 2_000_000_000   # far above generated IDs, still a valid INT
+BENCH_TABLES = ["Student", "Team", "TeamMember", "Project", "Evaluation", "Faculty", "Marks", "Grade"]
+
+# CRUD rows, in GUI column order (services.ENTITIES)
+BENCH_ROWS = {
+    "student":    [BENCH_ID, "CSE", 2, "Bench", "Mark", 20, "6000000000"],
+    "team":       [BENCH_ID, "Bench Team", 1, BENCH_ID],
+    "project":    [BENCH_ID, "Bench Project", "AI", "Python", "3 months", BENCH_ID],
+    "evaluation": [BENCH_ID, 100, 1, "2025-06-01", "benchmark"],
+    "marks":      [80, 100, None, BENCH_ID],
+    "grade":      ["A", 92.5, BENCH_ID],
+}
+BENCH_UPDATES = {
+    "student":    [BENCH_ID, "ECE", 3, "Bench", "Mark", 21, "6000000000"],
+    "team":       [BENCH_ID, "Bench Team 2", 2, BENCH_ID],
+    "project":    [BENCH_ID, "Bench Project 2", "ML", "Python", "4 months", BENCH_ID],
+    "evaluation": [BENCH_ID, 100, 2, "2025-06-02", "benchmark 2"],
+    "marks":      [90, 100, None, BENCH_ID],
+    "grade":      ["A+", 98.5, BENCH_ID],
+}
+CREATE_ORDER = ["student", "team", "project", "evaluation", "marks", "grade"]
+
+
+def _crud_ops():
+    """(group, name, fn) for add / update / delete of every entity; parents first, children deleted first."""
+    ops = [("crud", f"add {e}", lambda e=e: getattr(services, f"add_{e}")(BENCH_ROWS[e])) for e in CREATE_ORDER]
+    ops += [("crud", f"update {e}", lambda e=e: getattr(services, f"update_{e}")(BENCH_UPDATES[e]))
+            for e in CREATE_ORDER]
+    ops += [("crud", f"delete {e}", lambda e=e: getattr(services, f"delete_{e}")(BENCH_ID))
+            for e in reversed(CREATE_ORDER)]
+    return ops
+
+
+def _cleanup():
+    """Remove BENCH_ID rows left by an interrupted run."""
+    for e in reversed(CREATE_ORDER):
+        getattr(services, f"delete_{e}")(BENCH_ID)
+
+
+def _page(table, filters=None):
+    pager = paging.Pager(table, next(s["columns"] for s in services.ENTITIES.values() if s["table"] == table))
+    if filters:
+        where, params, _ = paging.build_where(table, filters)
+        pager.set_filter(where, params)
+    sql, params = pager.first_query()
+    return lambda: services.fetch_first_page(table, sql, params, pager.where, pager.where_params)
+
+
+def _read_ops(sample_eid):
+    ops = [("read", f"first page {t}", _page(t))
+           for t in ("Student", "Team", "Project", "Marks", "Evaluation", "Grade")]
+    ops += [("read", "filter Student name prefix", _page("Student", {"Name": "Ra"})),
+            ("read", "filter Grade FinalScore >= 90", _page("Grade", {"FinalScore": ("90", "")}))]
+    ops += [("query", f"{name} query", lambda n=name: services.run_rubric_query(n))
+            for name in services.RUBRIC_QUERIES]
+    ops += [("report", "project summary", services.project_summary),
+            ("report", "top projects", lambda: services.top_projects(10))]
+    ops += [("grading", "grade recompute (dry run)",
+             lambda: grading.recompute_grades(services.get_conn_cursor, dry_run=True))]
+    if sample_eid is not None:
+        ops += [("grading", "recalc_percentage (one evaluation)", lambda: services.recalc_percentage(sample_eid)),
+                ("grading", "bulk recalc (1000 evaluations)",
+                 lambda: recalc.recalc_percentages(services.get_conn_cursor,
+                                                   recalc.scope_of(sample_eid, sample_eid + 999),
+                                                   checkpoint_path=None))]
+    return ops
+
+
+def _meta(conn_fn, repeat):
+    conn, cursor = conn_fn()
+    try:
+        cursor.execute("SELECT VERSION()")
+        version = cursor.fetchone()[0]
+        rows = {}
+        for table in BENCH_TABLES:
+            try:
+                rows[table] = paging.count_rows(cursor, table)[0]
+            except Exception:
+                rows[table] = None   # table not created (TeamMember is optional)
+        try:
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+            schema = cursor.fetchone()[0]
+        except Exception:
+            schema = 0
+        cursor.execute("SELECT MIN(EvaluationID) FROM Marks")
+        sample_eid = cursor.fetchone()[0]
+    finally:
+        conn.close()
+    return {"started_at": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "backend": services.BACKEND, "mysql": version,
+            "schema_version": schema,
+            "rows": rows, "repeat": repeat}, sample_eid
+
+
+def _time(name, fn, repeat):
+    totals, phases, rows, error = [], {"connect": [], "execute": [], "fetch": []}, 0, None
+    for _ in range(repeat):
+        services.READ_CACHE.clear()
+        tag = f"bench:{name}"
+        try:
+            METRICS.track(tag, fn)
+        except Exception as e:
+            error = str(e)
+            break
+        op = METRICS.latest(tag)
+        totals.append(op["total_ms"])
+        for phase in phases:
+            phases[phase].append(op[phase + "_ms"])
+        rows = op["rows"]
+    if not totals:
+        return {"runs": 0, "error": error}
+    ordered = sorted(totals)
+    out = {"runs": len(totals), "min_ms": round(ordered[0], 3), "median_ms": round(statistics.median(ordered), 3),
+           "p90_ms": round(percentile(ordered, 0.9), 3), "max_ms": round(ordered[-1], 3), "rows": rows,
+           "error": error}
+    out.update({f"{p}_median_ms": round(statistics.median(v), 3) for p, v in phases.items()})
+    return out
+
+
+def run_benchmark(conn_fn=services.get_conn_cursor, repeat=5, only=None, on_progress=None):
+    """Time every app operation `repeat` times. only = group or name substring filter.
+
+    Returns {"meta": {...}, "results": {name: {group, runs, min/median/p90/max_ms, rows, ...}}}.
+    """
+    started = time.perf_counter()
+    migrations.use_schema_keys(conn_fn)   # page Marks like the GUI does
+    meta, sample_eid = _meta(conn_fn, repeat)
+    results = {}
+    groups = [("crud", _crud_ops()), ("reads", _read_ops(sample_eid))]
+    for label, all_ops in groups:
+        ops = [op for op in all_ops if not only or only == op[0] or only in op[1]]
+        if not ops:
+            continue
+        if label == "crud":
+            ops = all_ops   # a cycle needs its adds and deletes
+            _cleanup()
+            # Each cycle needs its adds before its updates and deletes: run them round by round
+            runs = {name: [] for _, name, _ in ops}
+            for _ in range(repeat):
+                for group, name, fn in ops:
+                    runs[name].append(_time(name, fn, 1))
+            for group, name, _ in ops:
+                results[name] = _merge_runs(group, runs[name])
+                if on_progress:
+                    on_progress(name, results[name])
+        else:
+            for group, name, fn in ops:
+                results[name] = dict(group=group, **_time(name, fn, repeat))
+                if on_progress:
+                    on_progress(name, results[name])
+    meta["seconds"] = round(time.perf_counter() - started, 3)
+    return {"meta": meta, "results": results}
+
+
+def _merge_runs(group, single_runs):
+    """Combine one-run _time() results (CRUD ops run once per cycle)."""
+    ok = [r for r in single_runs if r["runs"]]
+    error = next((r["error"] for r in single_runs if r.get("error")), None)
+    if not ok:
+        return {"group": group, "runs": 0, "error": error}
+    totals = sorted(r["min_ms"] for r in ok)
+    out = {"group": group, "runs": len(ok), "min_ms": totals[0], "median_ms": round(statistics.median(totals), 3),
+           "p90_ms": round(percentile(totals, 0.9), 3), "max_ms": totals[-1], "rows": ok[-1]["rows"], "error": error}
+    for phase in ("connect", "execute", "fetch"):
+        out[f"{phase}_median_ms"] = round(statistics.median(r[f"{phase}_median_ms"] for r in ok), 3)
+    return out
+
+
+# ---------- results files ----------
+def write_results(result, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, default=str)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_results(result):
+    lines = [f"{'median':>10}  {'p90':>10}  {'rows':>8}  operation"]
+    for name, r in result["results"].items():
+        if not r["runs"]:
+            lines.append(f"{'failed':>10}  {'':>10}  {'':>8}  {name}: {r['error']}")
+            continue
+        lines.append(f"{r['median_ms']:8.2f}ms  {r['p90_ms']:8.2f}ms  {r['rows']:>8,}  {name}")
+    rows = ", ".join(f"{t} {n:,}" for t, n in result["meta"]["rows"].items() if n is not None)
+    lines.append(f"\nData: {rows}")
+    return "\n".join(lines)
+
+
+def format_comparison(before, after):
+    """Median before/after per operation present in both runs."""
+    lines = [f"{'before':>10}  {'after':>10}  {'speedup':>8}  operation"]
+    for name, a in after["results"].items():
+        b = before["results"].get(name)
+        if not b or not b["runs"] or not a["runs"]:
+            continue
+        speed = f"{b['median_ms'] / a['median_ms']:7.2f}x" if a["median_ms"] else "      -"
+        lines.append(f"{b['median_ms']:8.2f}ms  {a['median_ms']:8.2f}ms  {speed}  {name}")
+    if before["meta"]["rows"] != after["meta"]["rows"]:
+        lines.append("\nNote: the runs were on different row counts")
+    return "\n".join(lines)
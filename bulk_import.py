@@ -0,0 +1,317 @@
+# ==============================
+# BULK IMPORT (CSV / Excel) — Students, Marks, Evaluations
+#   Streams the file in chunks, validates each row against the schema
+#   constraints, and inserts every chunk with executemany() in its own
+#   transaction. Rejected rows go to a side CSV, never into memory.
+# ==============================
+import csv
+import datetime
+import os
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+CHUNK_ROWS = 1000   # rows per executemany() / COMMIT
+
+
+# Column rules mirror schema_tables.sql
+IMPORT_SPECS = {
+    "Student": {
+        "columns":  ["StudentID", "Dept", "Year", "Fname", "Lname", "Age", "PhoneNo"],
+        "ints":     ["StudentID", "Year", "Age"],
+        "not_null": ["StudentID", "Dept", "Year"],
+        "lengths":  {"Dept": 50, "Fname": 50, "Lname": 50, "PhoneNo": 15},
+        "unique":   ["StudentID", "PhoneNo"],      # PRIMARY KEY + UNIQUE
+        "foreign":  {},
+    },
+    "Evaluation": {
+        "columns":  ["EvaluationID", "TotalMarks", "Rounds", "EvalDate", "Comments"],
+        "ints":     ["EvaluationID", "TotalMarks", "Rounds"],
+        "dates":    ["EvalDate"],
+        "not_null": ["EvaluationID"],
+        "defaults": ["Rounds", "EvalDate"],        # blank -> column DEFAULT, not NULL
+        "lengths":  {"Comments": 255},
+        "unique":   ["EvaluationID"],
+        "foreign":  {},
+    },
+    "Marks": {
+        "columns":  ["MarksObtained", "MaxMarks", "EvaluationID"],
+        "ints":     ["MarksObtained", "MaxMarks", "EvaluationID"],
+        "not_null": ["MaxMarks"],
+        "lengths":  {},
+        "unique":   [],
+        "foreign":  {"EvaluationID": ("Evaluation", "EvaluationID")},
+    },
+}
+
+
+
+class BulkImportError(Exception):
+    """Bad file / header problems that stop the whole import."""
+
+
+# ---------- readers (generators: one row at a time) ----------
+def _read_csv(path, progress):
+    size = os.path.getsize(path) or 1
+    consumed = [0]
+
+    def lines(fb):
+        for raw in fb:
+            consumed[0] += len(raw)
+            yield raw.decode("utf-8-sig")
+
+    with open(path, "rb") as fb:
+        reader = csv.reader(lines(fb))
+        header = next(reader, None)
+        if header is None:
+            return
+        yield [h.strip() for h in header]
+        for row in reader:
+            progress["fraction"] = consumed[0] / size
+            yield row
+
+
+def _read_excel(path, progress):
+    try:
+        import openpyxl
+    except ImportError:
+        raise BulkImportError("Excel import needs openpyxl (pip install openpyxl); or save the sheet as CSV")
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total = ws.max_row or 1
+        for n, row in enumerate(ws.iter_rows(values_only=True), start=1):
+            progress["fraction"] = n / total
+            yield ["" if v is None else v for v in row]
+    finally:
+        wb.close()
+
+
+def read_rows(path, progress):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        return _read_excel(path, progress)
+    return _read_csv(path, progress)
+
+
+# ---------- validation ----------
+def _blank(v):
+    return v is None or (isinstance(v, str) and v.strip() == "")
+
+
+def _to_date(v):
+    if isinstance(v, datetime.datetime):
+        return v.date()
+    if isinstance(v, datetime.date):
+        return v
+    return datetime.date.fromisoformat(str(v).strip())
+
+
+def percentage(obtained, max_marks):
+    """Same rule as trg_marks_before_insert: ROUND(obtained*100/max, 2), NULL if max <= 0."""
+    if obtained is None or not max_marks or max_marks <= 0:
+        return None
+    return (Decimal(obtained) * 100 / Decimal(max_marks)).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+def validate_row(table, record):
+    """Convert one {column: raw value} record; returns (values_dict, None) or (None, reason)."""
+    spec = IMPORT_SPECS[table]
+    out = {}
+    for col in spec["columns"]:
+        raw = record.get(col)
+        if _blank(raw):
+            if col in spec["not_null"]:
+                return None, f"{col} is required"
+            out[col] = None
+            continue
+        try:
+            if col in spec["ints"]:
+                out[col] = int(str(raw).strip())
+            elif col in spec.get("dates", ()):
+                out[col] = _to_date(raw)
+            else:
+                out[col] = str(raw).strip()
+        except ValueError:
+            return None, f"{col} has invalid value {raw!r}"
+        limit = spec["lengths"].get(col)
+        if limit and len(out[col]) > limit:
+            return None, f"{col} longer than {limit} characters"
+
+    # CHECK constraints
+    if table == "Student" and out["Age"] is not None and out["Age"] <= 15:
+        return None, "Age must be > 15"
+    return out, None
+
+
+def _existing(cursor, table, column, values):
+    """Which of values already exist in table.column (one IN query per chunk)."""
+    values = [v for v in set(values) if v is not None]
+    if not values:
+        return set()
+    marks = ",".join(["%s"] * len(values))
+    cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({marks})", values)
+    return {str(r[0]) for r in cursor.fetchall()}
+
+
+def _insert(table, v):
+    """(sql, params) for one row. Blank columns that have a DEFAULT are left out
+    of the INSERT so the server fills them in (a NULL would be stored as is)."""
+    spec = IMPORT_SPECS[table]
+    columns = [c for c in spec["columns"] if not (v[c] is None and c in spec.get("defaults", ()))]
+    params = [v[c] for c in columns]
+    if table == "Marks":
+        # Percentage is filled in here the same way trg_marks_before_insert does it
+        columns.append("Percentage")
+        params.append(percentage(v["MarksObtained"], v["MaxMarks"]))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({','.join(['%s'] * len(columns))})"
+    return sql, tuple(params)
+
+
+# ---------- main entry ----------
+def import_file(path, table, conn_fn, chunk_rows=CHUNK_ROWS, rejects_path=None,
+                on_progress=None, dry_run=False):
+    """Stream path into table. conn_fn() -> (conn, cursor).
+
+    on_progress(stats) is called after every chunk (from the calling thread).
+    Returns a stats dict: read / inserted / rejected / seconds / rows_per_sec / rejects_path.
+    """
+    if table not in IMPORT_SPECS:
+        raise BulkImportError(f"Bulk import supports {', '.join(IMPORT_SPECS)} (got {table})")
+    spec = IMPORT_SPECS[table]
+    rejects_path = rejects_path or os.path.splitext(path)[0] + f".{table.lower()}_rejects.csv"
+
+    progress = {"fraction": 0.0}
+    stats = {"table": table, "read": 0, "inserted": 0, "rejected": 0, "chunks": 0,
+             "seconds": 0.0, "rows_per_sec": 0.0, "fraction": 0.0, "rejects_path": rejects_path}
+    started = time.perf_counter()
+
+    rows = read_rows(path, progress)
+    header = next(rows, None)
+    if header is None:
+        raise BulkImportError("File is empty")
+    lookup = {str(h).strip().lower(): i for i, h in enumerate(header)}
+    missing = [c for c in spec["not_null"] if c.lower() not in lookup]
+    if missing:
+        raise BulkImportError(f"Missing column(s) in header: {', '.join(missing)}")
+
+    conn, cursor = conn_fn()
+    rej_file = open(rejects_path, "w", newline="", encoding="utf-8")
+    rej = csv.writer(rej_file)
+    rej.writerow(["line", "reason"] + spec["columns"])
+
+    def reject(line_no, reason, record):
+        stats["rejected"] += 1
+        rej.writerow([line_no, reason] + [record.get(c, "") for c in spec["columns"]])
+
+    def flush(chunk):
+        if not chunk:
+            return
+        # Duplicates inside the chunk; ones in earlier chunks are already in the
+        # table, so the clash query (or the PK/UNIQUE error below) catches them
+        seen = {col: set() for col in spec["unique"]}
+        unique = []
+        for line_no, v, record in chunk:
+            dup = next((col for col in spec["unique"] if v[col] is not None and v[col] in seen[col]), None)
+            if dup:
+                reject(line_no, f"duplicate {dup} {v[dup]} earlier in file", record)
+                continue
+            for col in spec["unique"]:
+                seen[col].add(v[col])
+            unique.append((line_no, v, record))
+        chunk = unique
+
+        # Constraint checks that need the DB: PK/UNIQUE clashes and FK targets
+        clashes = {col: _existing(cursor, table, col, [v[col] for _, v, _ in chunk])
+                   for col in spec["unique"]}
+        missing_fk = {}
+        for col, (ref_table, ref_col) in spec["foreign"].items():
+            wanted = [v[col] for _, v, _ in chunk]
+            found = _existing(cursor, ref_table, ref_col, wanted)
+            missing_fk[col] = {str(x) for x in wanted if x is not None} - found
+
+        good = []
+        for line_no, v, record in chunk:
+            bad = next((f"{col} {v[col]} already exists" for col in spec["unique"]
+                        if v[col] is not None and str(v[col]) in clashes[col]), None)
+            bad = bad or next((f"{col} {v[col]} not found in {spec['foreign'][col][0]}"
+                               for col in spec["foreign"]
+                               if v[col] is not None and str(v[col]) in missing_fk[col]), None)
+            if bad:
+                reject(line_no, bad, record)
+            else:
+                good.append((line_no, v, record))
+
+        if good and not dry_run:
+            # One executemany() per column set (rows with blank defaulted columns differ)
+            batches = {}
+            for _, v, _ in good:
+                sql, params = _insert(table, v)
+                batches.setdefault(sql, []).append(params)
+            try:
+                for sql, params in batches.items():
+                    cursor.executemany(sql, params)
+                conn.commit()
+                stats["inserted"] += len(good)
+            except Exception:
+                # One bad row fails the whole batch: redo this chunk row by row to find it
+                conn.rollback()
+                for line_no, v, record in good:
+                    try:
+                        cursor.execute(*_insert(table, v))
+                        stats["inserted"] += 1
+                    except Exception as e:
+                        reject(line_no, str(e), record)
+                conn.commit()
+        elif good:
+            stats["inserted"] += len(good)   # dry run: would be inserted
+
+        stats["chunks"] += 1
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed else 0.0
+        stats["fraction"] = round(progress["fraction"], 4)
+        if on_progress:
+            on_progress(dict(stats))
+
+    try:
+        chunk = []
+        for line_no, raw in enumerate(rows, start=2):
+            if not any(not _blank(x) for x in raw):
+                continue
+            stats["read"] += 1
+            record = {c: (raw[lookup[c.lower()]] if c.lower() in lookup and lookup[c.lower()] < len(raw) else None)
+                      for c in spec["columns"]}
+            values, reason = validate_row(table, record)
+            if reason:
+                reject(line_no, reason, record)
+                continue
+            chunk.append((line_no, values, record))
+            if len(chunk) >= chunk_rows:
+                flush(chunk)
+                chunk = []
+        flush(chunk)
+    finally:
+        rej_file.close()
+        conn.close()
+
+    progress["fraction"] = 1.0
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed else 0.0
+    stats["fraction"] = 1.0
+    if stats["rejected"] == 0:
+        os.remove(rejects_path)
+        stats["rejects_path"] = None
+    return stats
+
+
+def format_stats(stats):
+    lines = [
+        f"Table: {stats['table']}",
+        f"Rows read: {stats['read']:,}",
+        f"Inserted: {stats['inserted']:,}",
+        f"Rejected: {stats['rejected']:,}",
+        f"Time: {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/s)",
+    ]
+    if stats.get("rejects_path"):
+        lines.append(f"Rejects written to: {stats['rejects_path']}")
+    return "\n".join(lines)
@@ -0,0 +1,160 @@
+# ==============================
+# CHANGE FEED (multi-client refresh)
+#   change_log gets one row per written row, from AFTER INSERT / UPDATE /
+#   DELETE triggers on the six entity tables (migration 4). Version is the
+#   log's AUTO_INCREMENT id, so "what changed since I last looked" is one
+#   primary-key range read: an idle client's poll returns no rows.
+#   Versions are handed out at INSERT time but become visible at COMMIT, so
+#   a version skipped by a poll may belong to a transaction still running:
+#   such holes are asked for again for HOLE_SECONDS (rolled-back ones never
+#   show up and simply expire).
+#   FK cascades don't fire triggers in MySQL, so a delete also reports the
+#   tables its cascades reach (services.WRITE_CASCADES) for a full reload.
+# ==============================
+import time
+
+import services
+
+CHANGE_TABLE = "change_log"
+# Table -> column stored as RowKey (the column the tabs match rows on; Marks: EvaluationID)
+TRACKED = {"Student": "StudentID", "Team": "TeamID", "Project": "ProjectID",
+           "Evaluation": "EvaluationID", "Marks": "EvaluationID", "Grade": "ProjectID"}
+EVENTS = {"INSERT": ("I", "NEW"), "UPDATE": ("U", "NEW"), "DELETE": ("D", "OLD")}
+
+FETCH_LIMIT = 1000      # change rows per poll; a full batch means "poll again now"
+HOLE_SECONDS = 30.0     # how long a skipped version is waited for
+MAX_HOLES = 1000
+KEEP_VERSIONS = 100000  # prune() keeps this many newest versions
+
+CREATE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+        Version BIGINT AUTO_INCREMENT PRIMARY KEY,
+        TableName VARCHAR(32) NOT NULL,
+        RowKey VARCHAR(64),
+        Op CHAR(1) NOT NULL,
+        ChangedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def trigger_name(table, event):
+    return f"trg_changes_{table.lower()}_a{event[0].lower()}"
+
+
+def trigger_sql(table, event):
+    """Same text runs on MySQL and SQLite (BEGIN ... END, no IF)."""
+    op, row = EVENTS[event]
+    return (f"CREATE TRIGGER {trigger_name(table, event)} AFTER {event} ON {table} FOR EACH ROW BEGIN "
+            f"INSERT INTO {CHANGE_TABLE} (TableName, RowKey, Op) VALUES ('{table}', {row}.{TRACKED[table]}, '{op}'); "
+            "END")
+
+
+def all_triggers():
+    """[(name, create_sql)] for every tracked table and event."""
+    return [(trigger_name(t, e), trigger_sql(t, e)) for t in TRACKED for e in EVENTS]
+
+
+class ChangeFeed:
+    """Reads change_log forward from the newest version seen (one per client)."""
+
+    def __init__(self, conn_fn=None, limit=FETCH_LIMIT, hole_seconds=HOLE_SECONDS, clock=time.monotonic):
+        self.conn_fn = conn_fn or services.get_conn_cursor
+        self.limit = limit
+        self.hole_seconds = hole_seconds
+        self.clock = clock
+        self.last_seen = None
+        self.holes = {}   # version -> when it was first skipped
+
+    def start(self):
+        """Begin at the current newest version: what is loaded now is already fresh."""
+        conn, cursor = self.conn_fn()
+        try:
+            cursor.execute(f"SELECT MAX(Version) FROM {CHANGE_TABLE}")
+            self.last_seen = cursor.fetchone()[0] or 0
+        finally:
+            conn.close()
+        self.holes.clear()
+        return self.last_seen
+
+    def poll(self):
+        """Changes committed since the last poll (runs on a worker thread).
+
+        Returns {"tables": {table: {keys}}, "reload": {tables}, "version", "rows", "more"}:
+        rows to re-read per table by key, tables to reload whole (cascades) and
+        more=True when the batch was full. Changed tables are dropped from the read cache.
+        """
+        out = {"tables": {}, "reload": set(), "version": self.last_seen, "rows": 0, "more": False}
+        if self.last_seen is None:
+            out["version"] = self.start()
+            return out
+        sql, params = f"SELECT Version, TableName, RowKey, Op FROM {CHANGE_TABLE} WHERE Version > %s", [self.last_seen]
+        if self.holes:
+            holes = sorted(self.holes)
+            sql += f" OR Version IN ({', '.join(['%s'] * len(holes))})"
+            params += holes
+        sql += " ORDER BY Version LIMIT %s"
+        conn, cursor = self.conn_fn()
+        try:
+            cursor.execute(sql, params + [self.limit])
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        now = self.clock()
+        for version, table, key, op in rows:
+            if version > self.last_seen:
+                if version - self.last_seen <= MAX_HOLES:
+                    for missing in range(self.last_seen + 1, version):
+                        self.holes.setdefault(missing, now)
+                self.last_seen = version
+            else:
+                self.holes.pop(version, None)
+            if table not in TRACKED:
+                continue
+            if key is not None:
+                out["tables"].setdefault(table, set()).add(str(key))
+            if op == "D":
+                out["reload"] |= services.WRITE_CASCADES.get(table, set())
+        for version, since in list(self.holes.items()):
+            if now - since > self.hole_seconds or version <= self.last_seen - MAX_HOLES:
+                del self.holes[version]
+        changed = set(out["tables"]) | out["reload"]
+        if changed:
+            services.invalidate(*changed)
+        out.update(version=self.last_seen, rows=len(rows), more=len(rows) >= self.limit)
+        return out
+
+
+def status(conn_fn):
+    """{"newest": version, "oldest": version, "rows": n} of change_log."""
+    conn, cursor = conn_fn()
+    try:
+        cursor.execute(f"SELECT MAX(Version), MIN(Version), COUNT(*) FROM {CHANGE_TABLE}")
+        newest, oldest, rows = cursor.fetchone()
+    finally:
+        conn.close()
+    return {"newest": newest or 0, "oldest": oldest or 0, "rows": rows}
+
+
+def tail(conn_fn, limit=20):
+    """(columns, rows): the newest change_log entries, newest first."""
+    conn, cursor = conn_fn()
+    try:
+        cursor.execute(f"SELECT Version, TableName, RowKey, Op, ChangedAt FROM {CHANGE_TABLE} "
+                       "ORDER BY Version DESC LIMIT %s", (int(limit),))
+        return [d[0] for d in cursor.description], cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def prune(conn_fn, keep=KEEP_VERSIONS):
+    """Delete all but the newest `keep` versions (clients poll far more often). Returns rows deleted."""
+    conn, cursor = conn_fn()
+    try:
+        cursor.execute(f"SELECT MAX(Version) FROM {CHANGE_TABLE}")
+        newest = cursor.fetchone()[0] or 0
+        cursor.execute(f"DELETE FROM {CHANGE_TABLE} WHERE Version <= %s", (newest - int(keep),))
+        deleted = cursor.rowcount
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
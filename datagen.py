@@ -0,0 +1,156 @@
+# ==============================
+# SYNTHETIC DATA GENERATOR
+#   Fills every table with a large, reproducible (seeded) dataset shaped
+#   like the sample rows in schema_tables.sql, for timing queries and
+#   indexes. IDs start above the current maximum so existing rows are kept.
+#   Rows are streamed in chunks, so 10M-row runs don't need 10M rows in
+#   memory. Parents are inserted before children (FKs stay valid) and the
+#   values stay inside the CHECK / UNIQUE constraints.
+# ==============================
+import array
+import random
+import time
+
+from grading import grade_label
+
+CHUNK_ROWS = 5000
+
+DEPTS = ["CSE", "ECE", "ISE", "EEE", "ME", "CIVIL", "AIML"]
+DOMAINS = ["AI", "IoT", "Robotics", "ML", "Cloud", "Web", "Security", "Blockchain", "AR/VR", "Data"]
+TECH = ["Python, OpenCV", "Arduino, MQTT", "ROS, C++", "Python, TensorFlow", "Java, AWS",
+        "React, Node", "Go, Kubernetes", "Solidity", "Unity, C#", "Spark, Scala"]
+FIRST = ["Aarav", "Meera", "Rohit", "Sneha", "Karan", "Tanya", "Vikram", "Ananya", "Ishaan", "Diya"]
+LAST = ["Sharma", "Iyer", "Verma", "Patil", "Rao", "Reddy", "Nair", "Gupta", "Menon", "Das"]
+WORDS = ["Smart", "Autonomous", "Cloud", "Secure", "Adaptive", "Predictive", "Distributed", "Mobile"]
+THINGS = ["Attendance System", "Weather Monitor", "Robot", "Price Predictor", "File Manager",
+          "Chatbot", "Traffic Analyzer", "Health Tracker", "Voting Platform", "Inventory Manager"]
+COMMENTS = ["Good progress", "Needs improvement", "Excellent work", "Average performance", "Strong execution"]
+
+
+SCALE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_count(text):
+    """"50000", "10k", "2.5M" -> int (for --projects)."""
+    text = str(text).strip().lower().replace("_", "")
+    factor = SCALE_SUFFIXES.get(text[-1:], 1)
+    if factor > 1:
+        text = text[:-1]
+    return int(float(text) * factor)
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT 1 FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1", (table,))
+    return cursor.fetchone() is not None
+
+
+def _next_id(cursor, table, column, floor):
+    cursor.execute(f"SELECT MAX({column}) FROM {table}")
+    top = cursor.fetchone()[0]
+    return max(floor, (top or 0) + 1)
+
+
+def generate(conn_fn, projects=10000, evals_per_project=3, seed=42, chunk_rows=CHUNK_ROWS, on_progress=None,
+             max_team_size=5):
+    """Insert `projects` projects with their teams (1..max_team_size students each,
+    ~3x projects Student rows), team members, evaluations, faculty, marks and grades.
+    conn_fn() -> (conn, cursor). Same seed -> same data.
+
+    TeamMember (review_queries.sql) is filled when that table exists.
+    Returns {table: rows inserted, ..., "seconds": n}.
+    """
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    counts = {}
+    conn, cursor = conn_fn()
+    try:
+        has_members = _table_exists(cursor, "TeamMember")
+        sid0 = _next_id(cursor, "Student", "StudentID", 1)
+        tid0 = _next_id(cursor, "Team", "TeamID", 100)
+        pid0 = _next_id(cursor, "Project", "ProjectID", 200)
+        eid0 = _next_id(cursor, "Evaluation", "EvaluationID", 300)
+        fid0 = _next_id(cursor, "Faculty", "FacultyID", 400)
+
+        def insert(table, sql, rows):
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunk_rows:
+                    cursor.executemany(sql, batch)
+                    conn.commit()
+                    counts[table] = counts.get(table, 0) + len(batch)
+                    batch = []
+                    if on_progress:
+                        on_progress(dict(counts))
+            if batch:
+                cursor.executemany(sql, batch)
+                conn.commit()
+                counts[table] = counts.get(table, 0) + len(batch)
+            if on_progress:
+                on_progress(dict(counts))
+
+        # One team per project; team i's students are leader[i] .. leader[i] + sizes[i] - 1
+        sizes = array.array("b", (rnd.randint(1, max_team_size) for _ in range(projects)))
+        n_students = sum(sizes)
+
+        def leaders():
+            sid = sid0
+            for size in sizes:
+                yield sid
+                sid += size
+
+        # Age > 15 (CHECK) and a unique PhoneNo per student
+        insert("Student", "INSERT INTO Student (StudentID, Dept, Year, Fname, Lname, Age, PhoneNo) "
+                          "VALUES (%s,%s,%s,%s,%s,%s,%s)",
+               ((sid0 + i, rnd.choice(DEPTS), rnd.randint(1, 4), rnd.choice(FIRST), rnd.choice(LAST),
+                 rnd.randint(17, 26), f"7{sid0 + i:09d}") for i in range(n_students)))
+        # Members > 0 (CHECK)
+        insert("Team", "INSERT INTO Team (TeamID, TeamName, Members, StudentID) VALUES (%s,%s,%s,%s)",
+               ((tid0 + i, f"Team {tid0 + i}", sizes[i], leader) for i, leader in enumerate(leaders())))
+        if has_members:
+            insert("TeamMember", "INSERT INTO TeamMember (TeamID, StudentID, Role) VALUES (%s,%s,%s)",
+                   ((tid0 + i, leader + k, "Lead" if k == 0 else "Member")
+                    for i, leader in enumerate(leaders()) for k in range(sizes[i])))
+            # The TeamMember triggers (if installed) bumped Members again: set it to the real count
+            for lo in range(tid0, tid0 + projects, chunk_rows):
+                # Correlated subquery (not UPDATE .. JOIN) so the SQLite backend runs it too
+                cursor.execute("UPDATE Team SET Members = (SELECT COUNT(*) FROM TeamMember m "
+                               "WHERE m.TeamID = Team.TeamID) WHERE TeamID BETWEEN %s AND %s",
+                               (lo, min(lo + chunk_rows, tid0 + projects) - 1))
+                conn.commit()
+        insert("Project", "INSERT INTO Project (ProjectID, Title, Domain, Technology, Duration, TeamID) "
+                          "VALUES (%s,%s,%s,%s,%s,%s)",
+               ((pid0 + i, f"{rnd.choice(WORDS)} {rnd.choice(THINGS)}", rnd.choice(DOMAINS),
+                 rnd.choice(TECH), f"{rnd.randint(3, 9)} months", tid0 + i) for i in range(projects)))
+
+        n_evals = projects * evals_per_project
+        insert("Evaluation", "INSERT INTO Evaluation (EvaluationID, TotalMarks, Rounds, EvalDate, Comments) "
+                             "VALUES (%s,%s,%s,%s,%s)",
+               ((eid0 + i, 100, rnd.randint(1, 3),
+                 f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", rnd.choice(COMMENTS))
+                for i in range(n_evals)))
+        # One faculty row per evaluation links it to its project (as in the sample data)
+        insert("Faculty", "INSERT INTO Faculty (FacultyID, Name, Email, PhoneNo, ProjectID, EvaluationID) "
+                          "VALUES (%s,%s,%s,%s,%s,%s)",
+               ((fid0 + i, f"Prof. {rnd.choice(LAST)}", f"f{fid0 + i}@college.edu", f"9{fid0 + i:09d}",
+                 pid0 + i // evals_per_project, eid0 + i) for i in range(n_evals)))
+
+        def marks():
+            for i in range(n_evals):
+                max_marks = rnd.choice((50, 90, 100))
+                obtained = min(max_marks, max(0, int(rnd.gauss(0.78, 0.12) * max_marks)))
+                yield obtained, max_marks, round(obtained * 100 / max_marks, 2), eid0 + i
+        insert("Marks", "INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) "
+                        "VALUES (%s,%s,%s,%s)", marks())
+        # Grades for ~80% of projects; grading.recompute_grades fills in the rest
+        def grades():
+            for i in range(projects):
+                if rnd.random() < 0.8:
+                    score = round(rnd.uniform(40, 100), 2)
+                    yield grade_label(score), score, pid0 + i
+        insert("Grade", "INSERT INTO Grade (Grade, FinalScore, ProjectID) VALUES (%s,%s,%s)", grades())
+    finally:
+        conn.close()
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    return counts
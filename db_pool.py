@@ -0,0 +1,222 @@
+# ==============================
+# CONNECTION POOL
+#   Keeps a bounded set of open DB connections so a button click
+#   reuses a socket instead of paying a full connect() handshake.
+# ==============================
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when every pooled connection is busy for longer than the timeout."""
+
+
+class PooledConnection:
+    """Wraps a raw connection; close() hands it back to the pool instead of closing it."""
+
+    def __init__(self, pool, raw, generation):
+        self._pool = pool
+        self._raw = raw
+        self._generation = generation   # pool's close_all() count at checkout
+        self._cursors = []
+        self._released = False
+
+    def cursor(self, *args, **kwargs):
+        cur = self._raw.cursor(*args, **kwargs)
+        self._cursors.append(cur)
+        return cur
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        healthy = True
+        for cur in self._cursors:
+            try:
+                cur.close()
+            except Exception:
+                healthy = False
+        self._cursors = []
+        # Never hand out a connection with a half-finished transaction
+        try:
+            self._raw.rollback()
+        except Exception:
+            healthy = False
+        self._pool._release(self._raw, healthy, self._generation)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded pool of connections created by connect_fn().
+
+    - max_size:          hard cap on open connections
+    - timeout:           seconds acquire() waits for a free connection
+    - validate_interval: idle seconds after which a connection is pinged on checkout
+                         (0 = validate on every checkout)
+    - max_idle:          idle seconds after which a connection is replaced outright
+                         (server side wait_timeout has most likely dropped it)
+    """
+
+    def __init__(self, connect_fn, max_size=5, timeout=10.0,
+                 validate_interval=0.0, max_idle=3600.0):
+        self.connect_fn = connect_fn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate_interval = validate_interval
+        self.max_idle = max_idle
+
+        self._idle = []          # list of (raw_conn, returned_at)
+        self._open = 0           # idle + checked out
+        self._generation = 0     # bumped by close_all(): older checkouts are closed on return
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "waits": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "timeouts": 0,
+            "validation_failures": 0,
+            "reconnects": 0,
+            "discarded": 0,
+            "peak_in_use": 0,
+        }
+
+    # ---------- checkout ----------
+    def acquire(self):
+        started = time.perf_counter()
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, returned_at = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    raw, returned_at = None, None
+                    self._open += 1
+                    break
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"No free DB connection after {self.timeout:.1f}s "
+                                      f"(pool size {self.max_size})")
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            if waited:
+                wait_ms = (time.perf_counter() - started) * 1000
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            in_use = self._open - len(self._idle)
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], in_use)
+            generation = self._generation
+
+        # Network work happens outside the lock
+        try:
+            if raw is None:
+                raw = self._connect()
+            else:
+                raw = self._checked(raw, returned_at)
+                with self._cond:
+                    self._stats["reused"] += 1
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, generation)
+
+    def _connect(self):
+        raw = self.connect_fn()
+        with self._cond:
+            self._stats["created"] += 1
+        return raw
+
+    def _checked(self, raw, returned_at):
+        idle_for = time.monotonic() - returned_at
+        if idle_for >= self.max_idle:
+            self._close_quietly(raw)
+            with self._cond:
+                self._stats["reconnects"] += 1
+            return self._connect()
+        if idle_for < self.validate_interval:
+            return raw
+        if self._is_alive(raw):
+            return raw
+        with self._cond:
+            self._stats["validation_failures"] += 1
+            self._stats["reconnects"] += 1
+        # Server dropped us (restart / wait_timeout): try in-place reconnect first
+        try:
+            raw.reconnect(attempts=1, delay=0)
+            return raw
+        except Exception:
+            self._close_quietly(raw)
+            return self._connect()
+
+    @staticmethod
+    def _is_alive(raw):
+        try:
+            if hasattr(raw, "is_connected"):
+                return raw.is_connected()
+            raw.cursor().execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    # ---------- checkin ----------
+    def _release(self, raw, healthy=True, generation=None):
+        with self._cond:
+            # Checked out before close_all() (maybe to another backend): close, don't reuse
+            keep = healthy and generation in (None, self._generation)
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._open -= 1
+                if not healthy:
+                    self._stats["discarded"] += 1
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(raw)
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close idle connections; checked-out ones are closed when returned.
+        The pool stays usable: later checkouts open new connections."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._generation += 1
+        for raw, _ in idle:
+            self._close_quietly(raw)
+
+    # ---------- sizing info ----------
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            s["max_size"] = self.max_size
+            s["open"] = self._open
+            s["idle"] = len(self._idle)
+            s["in_use"] = self._open - len(self._idle)
+        s["reuse_ratio"] = round(s["reused"] / s["checkouts"], 3) if s["checkouts"] else 0.0
+        s["wait_ms_avg"] = round(s["wait_ms_total"] / s["waits"], 2) if s["waits"] else 0.0
+        s["wait_ms_total"] = round(s["wait_ms_total"], 2)
+        s["wait_ms_max"] = round(s["wait_ms_max"], 2)
+        return s
@@ -0,0 +1,176 @@
+# ==============================
+# BACKGROUND DB WORKER
+#   Runs DB calls on worker threads so the Tk event loop never blocks.
+#   Results come back to the Tk thread through root.after() polling.
+# ==============================
+import functools
+import logging
+import queue
+import threading
+import time
+
+from perf_metrics import caller_tag
+
+log = logging.getLogger(__name__)
+
+
+class _Job:
+    def __init__(self, key, generation, work, on_done, on_error, tag=None):
+        self.key = key
+        self.tag = tag
+        self.generation = generation
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.started = False
+
+
+class DbWorker:
+    """Small thread pool for DB work.
+
+    submit(key, work, on_done, on_error):
+      - work() runs on a worker thread (no Tk calls in there!)
+      - on_done(result) / on_error(exc) run later on the Tk thread
+      - jobs sharing a key are coalesced: a queued job that has not started yet
+        is replaced by the newer one, and results of a superseded job are dropped
+        (e.g. double-clicking "Show All" only renders once)
+      - key=None means "always run" (used for writes)
+
+    metrics (a perf_metrics.Metrics) times each job under the name of the
+    method that submitted it, and the on_done callback as its render time.
+    """
+
+    def __init__(self, workers=3, poll_ms=16, metrics=None):
+        self.poll_ms = poll_ms      # ~60 fps result polling
+        self.metrics = metrics
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._latest = {}           # key -> newest generation
+        self._queued = {}           # key -> job not yet picked up by a thread
+        self._in_flight = 0
+        self._root = None
+        self._on_busy = None
+        self._on_callback_error = None
+        self._stopped = False
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._run, name=f"db-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # ---------- Tk side ----------
+    def attach(self, root, on_busy=None, on_callback_error=None):
+        """Start polling for finished jobs from root's event loop.
+
+        on_callback_error(exc) is told when an on_done / on_error callback raises
+        (the traceback is logged either way)."""
+        self._root = root
+        self._on_busy = on_busy
+        self._on_callback_error = on_callback_error
+        root.after(self.poll_ms, self._drain)
+
+    def submit(self, key, work, on_done=None, on_error=None):
+        tag = None
+        if self.metrics is not None:
+            tag = caller_tag(key)
+            work = functools.partial(self.metrics.track, tag, work)
+        with self._lock:
+            generation = self._latest.get(key, 0) + 1
+            if key is not None:
+                self._latest[key] = generation
+                queued = self._queued.get(key)
+                if queued is not None and not queued.started:
+                    # Coalesce: reuse the queued slot with the newer request
+                    queued.generation = generation
+                    queued.work, queued.on_done, queued.on_error = work, on_done, on_error
+                    queued.tag = tag
+                    return generation
+            job = _Job(key, generation, work, on_done, on_error, tag)
+            if key is not None:
+                self._queued[key] = job
+            self._in_flight += 1
+        self._jobs.put(job)
+        self._notify_busy()
+        return generation
+
+    def cancel(self, key):
+        """Forget any pending/running job for key; its result will be ignored."""
+        with self._lock:
+            self._latest[key] = self._latest.get(key, 0) + 1
+
+    def is_current(self, key, generation):
+        with self._lock:
+            return key is None or self._latest.get(key) == generation
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._in_flight
+
+    def _drain(self):
+        if self._stopped:
+            return
+        try:
+            while True:
+                job, ok, value = self._results.get_nowait()
+                with self._lock:
+                    self._in_flight -= 1
+                current = self.is_current(job.key, job.generation)
+                self._notify_busy()
+                if not current:
+                    continue
+                callback = job.on_done if ok else job.on_error
+                if callback is not None:
+                    started = time.perf_counter()
+                    if self.metrics is not None:
+                        self.metrics.render_tag = job.tag   # fill_tree keeps adding its later chunks
+                    try:
+                        callback(value)
+                    except Exception as e:
+                        # Keep the poller alive even if a UI callback breaks
+                        log.error("callback for %r failed", job.key, exc_info=True)
+                        if self._on_callback_error is not None:
+                            try:
+                                self._on_callback_error(e)
+                            except Exception:
+                                log.exception("on_callback_error failed")
+                    finally:
+                        if self.metrics is not None:
+                            self.metrics.render_tag = None
+                            if ok and job.tag:
+                                self.metrics.add_render(job.tag, (time.perf_counter() - started) * 1000)
+        except queue.Empty:
+            pass
+        self._root.after(self.poll_ms, self._drain)
+
+    def _notify_busy(self):
+        if self._on_busy is not None and self._root is not None:
+            # May be called from submit() on the Tk thread only
+            if threading.current_thread() is threading.main_thread():
+                self._on_busy(self.busy)
+
+    # ---------- worker threads ----------
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                job.started = True
+                if self._queued.get(job.key) is job:
+                    del self._queued[job.key]
+                stale = job.key is not None and self._latest.get(job.key) != job.generation
+            if stale:
+                # Superseded (cancelled) before it even started: skip the query
+                self._results.put((job, False, None))
+                continue
+            try:
+                self._results.put((job, True, job.work()))
+            except Exception as e:
+                self._results.put((job, False, e))
+
+    def shutdown(self):
+        self._stopped = True
+        for _ in self._threads:
+            self._jobs.put(None)
@@ -0,0 +1,259 @@
+# ==============================
+# STREAMING EXPORT — CSV and columnar (.pecol)
+#   Rows are pulled with fetchmany() from an unbuffered cursor, so memory
+#   stays flat no matter how big the table / view / query result is.
+# ==============================
+import array
+import csv
+import datetime
+import json
+import re
+import struct
+import time
+import zlib
+from decimal import Decimal
+
+FETCH_ROWS = 5000          # rows per fetchmany() round trip
+ROW_GROUP_ROWS = 50000     # rows buffered per columnar row group
+
+PECOL_MAGIC = b"PECOL1"
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ExportError(Exception):
+    pass
+
+
+def source_sql(source):
+    """A table/view name becomes SELECT * FROM name; a SELECT statement is used as-is."""
+    text = source.strip().rstrip(";")
+    if _IDENT.match(text):
+        return f"SELECT * FROM {text}"   # also tables named like selections / without_marks
+    if re.match(r"(select|with)\s", text, re.I):
+        return text
+    raise ExportError(f"Not a table/view name or SELECT: {source!r}")
+
+
+# ---------- CSV ----------
+class CsvWriter:
+    def __init__(self, path, columns):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.w = csv.writer(self.f)
+        self.w.writerow(columns)
+
+    def write_rows(self, rows):
+        self.w.writerows(["" if v is None else v for v in row] for row in rows)
+
+    def close(self):
+        self.f.close()
+
+
+# ---------- Columnar (.pecol) ----------
+# File layout:
+#   PECOL1 | row group* | footer JSON | uint32 footer length | PECOL1
+# Row group: per column -> type byte, uint32 payload length, zlib(payload)
+#   'i' int64 / 'f' float64 / 'D' date (days since 0001-01-01): null bitmap + array
+#   's' text: dictionary of distinct strings + int32 codes (-1 = NULL)
+# Dictionary encoding keeps repeated Dept / Domain / Technology values tiny.
+
+def _column_type(values):
+    kinds = set()
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool) or isinstance(v, int):
+            kinds.add("i")
+        elif isinstance(v, (float, Decimal)):
+            kinds.add("f")
+        elif isinstance(v, datetime.date) and not isinstance(v, datetime.datetime):
+            kinds.add("D")
+        else:
+            kinds.add("s")
+    if kinds <= {"i"}:
+        return "i"
+    if kinds <= {"i", "f"}:
+        return "f"
+    if kinds == {"D"}:
+        return "D"
+    return "s"
+
+
+def _null_bitmap(values):
+    bits = bytearray((len(values) + 7) // 8)
+    for i, v in enumerate(values):
+        if v is None:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+
+def _encode_column(values):
+    kind = _column_type(values)
+    if kind == "i":
+        body = _null_bitmap(values) + array.array("q", (0 if v is None else int(v) for v in values)).tobytes()
+    elif kind == "f":
+        body = _null_bitmap(values) + array.array("d", (0.0 if v is None else float(v) for v in values)).tobytes()
+    elif kind == "D":
+        body = _null_bitmap(values) + array.array("i", (0 if v is None else v.toordinal() for v in values)).tobytes()
+    else:
+        codes = {}
+        out = array.array("i")
+        for v in values:
+            if v is None:
+                out.append(-1)
+            else:
+                out.append(codes.setdefault(str(v), len(codes)))
+        words = [w.encode("utf-8") for w in codes]
+        head = struct.pack("<I", len(words)) + b"".join(struct.pack("<I", len(w)) + w for w in words)
+        body = head + out.tobytes()
+    return kind, zlib.compress(body, 6)
+
+
+def _decode_column(kind, blob, n):
+    body = zlib.decompress(blob)
+    if kind == "s":
+        (count,), pos = struct.unpack_from("<I", body), 4
+        words = []
+        for _ in range(count):
+            (length,) = struct.unpack_from("<I", body, pos)
+            pos += 4
+            words.append(body[pos:pos + length].decode("utf-8"))
+            pos += length
+        codes = array.array("i")
+        codes.frombytes(body[pos:])
+        return [None if c < 0 else words[c] for c in codes]
+    nb = (n + 7) // 8
+    bits, data = body[:nb], body[nb:]
+    arr = array.array({"i": "q", "f": "d", "D": "i"}[kind])
+    arr.frombytes(data)
+    if kind == "D":
+        arr = [datetime.date.fromordinal(v) if v > 0 else None for v in arr]
+    return [None if bits[i >> 3] & (1 << (i & 7)) else arr[i] for i in range(n)]
+
+
+class ColumnarWriter:
+    def __init__(self, path, columns, group_rows=ROW_GROUP_ROWS):
+        self.f = open(path, "wb")
+        self.f.write(PECOL_MAGIC)
+        self.columns = list(columns)
+        self.group_rows = group_rows
+        self.buffer = []
+        self.groups = []       # footer: [offset, rows, [type per column]]
+        self.rows = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.buffer.append(row)
+            if len(self.buffer) >= self.group_rows:
+                self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        offset = self.f.tell()
+        kinds = []
+        for i in range(len(self.columns)):
+            kind, blob = _encode_column([r[i] for r in self.buffer])
+            kinds.append(kind)
+            self.f.write(kind.encode() + struct.pack("<I", len(blob)) + blob)
+        self.groups.append([offset, len(self.buffer), kinds])
+        self.rows += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self._flush()
+        footer = json.dumps({"columns": self.columns, "rows": self.rows,
+                             "row_groups": self.groups}).encode("utf-8")
+        self.f.write(footer + struct.pack("<I", len(footer)) + PECOL_MAGIC)
+        self.f.close()
+
+
+def read_columnar_meta(path):
+    with open(path, "rb") as f:
+        f.seek(-(4 + len(PECOL_MAGIC)), 2)
+        (length,) = struct.unpack("<I", f.read(4))
+        if f.read(len(PECOL_MAGIC)) != PECOL_MAGIC:
+            raise ExportError(f"{path} is not a .pecol file")
+        f.seek(-(4 + len(PECOL_MAGIC) + length), 2)
+        return json.loads(f.read(length))
+
+
+def read_columnar(path, columns=None):
+    """Yield (column_name -> list of values) one row group at a time.
+
+    Only the requested columns are decompressed.
+    """
+    meta = read_columnar_meta(path)
+    wanted = set(columns or meta["columns"])
+    with open(path, "rb") as f:
+        for offset, n, kinds in meta["row_groups"]:
+            f.seek(offset)
+            group = {}
+            for name, kind in zip(meta["columns"], kinds):
+                f.read(1)
+                (length,) = struct.unpack("<I", f.read(4))
+                if name in wanted:
+                    group[name] = _decode_column(kind, f.read(length), n)
+                else:
+                    f.seek(length, 1)
+            yield group
+
+
+def iter_columnar_rows(path):
+    meta = read_columnar_meta(path)
+    for group in read_columnar(path):
+        yield from zip(*(group[c] for c in meta["columns"]))
+
+
+# ---------- main entry ----------
+def writer_for(path, columns):
+    if path.lower().endswith(".pecol"):
+        return ColumnarWriter(path, columns)
+    return CsvWriter(path, columns)
+
+
+def export_query(conn_fn, source, path, params=None, fetch_rows=FETCH_ROWS, on_progress=None):
+    """Stream a table, view or SELECT to path (.csv or .pecol). conn_fn() -> (conn, cursor).
+
+    Returns {"rows", "seconds", "rows_per_sec", "path", "columns"}.
+    """
+    sql = source_sql(source)
+    started = time.perf_counter()
+    conn, cursor = conn_fn()
+    writer = None
+    rows = 0
+    try:
+        cursor.execute(sql, params or ())
+        columns = [d[0] for d in cursor.description]
+        writer = writer_for(path, columns)
+        while True:
+            batch = cursor.fetchmany(fetch_rows)
+            if not batch:
+                break
+            writer.write_rows(batch)
+            rows += len(batch)
+            if on_progress:
+                on_progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+        conn.close()
+    elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+            "path": path, "columns": columns}
+
+
+def export_rows(columns, rows, path, chunk_rows=FETCH_ROWS):
+    """Write rows already in memory (a list or row_store.RowStore) to path, as export_query does."""
+    started = time.perf_counter()
+    writer = writer_for(path, columns)
+    try:
+        for start in range(0, len(rows), chunk_rows):
+            writer.write_rows(rows[start:start + chunk_rows])
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+    return {"rows": len(rows), "seconds": round(elapsed, 3),
+            "rows_per_sec": round(len(rows) / elapsed, 1) if elapsed else 0.0,
+            "path": path, "columns": list(columns)}
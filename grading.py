@@ -0,0 +1,166 @@
+# ==============================
+# BATCH GRADE COMPUTATION (end of term)
+#   One GROUP BY query scores every project the way fn_project_avg_percentage
+#   does, letters come from the get_grade_label() cutoffs, and only the
+#   changed Grade rows are upserted, a chunk per executemany() / COMMIT.
+# ==============================
+import csv
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+CHUNK_ROWS = 5000   # Grade rows per multi-row upsert / COMMIT
+
+# Same cutoffs as get_grade_label() in review_queries.sql (checked top-down)
+GRADE_CUTOFFS = [(Decimal("98"), "A+"), (Decimal("90"), "A"), (Decimal("80"), "B+"), (Decimal("70"), "B")]
+LOWEST_GRADE = "C"
+
+# fn_project_avg_percentage for all projects at once
+_AVG_SQL = """
+    SELECT f.ProjectID, ROUND(AVG(m.Percentage), 2) AS Score
+    FROM Marks m
+    JOIN Evaluation e ON m.EvaluationID = e.EvaluationID
+    JOIN Faculty f ON e.EvaluationID = f.EvaluationID
+    WHERE f.ProjectID IS NOT NULL
+    GROUP BY f.ProjectID
+"""
+
+# Projects with marks only (default), or every project with 0 for no marks (the function's IFNULL)
+SCORES_SQL = f"""
+    SELECT s.ProjectID, s.Score, g.Grade, g.FinalScore
+    FROM ({_AVG_SQL}) s
+    LEFT JOIN Grade g ON g.ProjectID = s.ProjectID
+    ORDER BY s.ProjectID
+"""
+
+ALL_PROJECTS_SQL = f"""
+    SELECT p.ProjectID, s.Score, g.Grade, g.FinalScore
+    FROM Project p
+    LEFT JOIN ({_AVG_SQL}) s ON s.ProjectID = p.ProjectID
+    LEFT JOIN Grade g ON g.ProjectID = p.ProjectID
+    ORDER BY p.ProjectID
+"""
+
+# The grade triggers still fire per row (MySQL can't suspend them) but compute the same letter
+UPSERT_SQL = """
+    INSERT INTO Grade (Grade, FinalScore, ProjectID) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE Grade = VALUES(Grade), FinalScore = VALUES(FinalScore)
+"""
+
+
+def _score(v):
+    if v is None:
+        return Decimal("0.00")   # IFNULL(avg_pct, 0)
+    return Decimal(str(v)).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+def grade_label(score):
+    """Python twin of get_grade_label(score)."""
+    score = _score(score)
+    for cutoff, label in GRADE_CUTOFFS:
+        if score >= cutoff:
+            return label
+    return LOWEST_GRADE
+
+
+def compute_changes(rows):
+    """rows: (ProjectID, Score, old Grade, old FinalScore). Yields (pid, old_grade, old_score, grade, score, change)."""
+    for pid, score, old_grade, old_score in rows:
+        score = _score(score)
+        grade = grade_label(score)
+        if old_grade is None and old_score is None:
+            change = "insert"
+        elif old_score is None or _score(old_score) != score or (old_grade or "").strip() != grade:
+            change = "update"
+        else:
+            change = "same"
+        yield pid, old_grade, old_score, grade, score, change
+
+
+def recompute_grades(conn_fn, chunk_rows=CHUNK_ROWS, dry_run=False, include_unmarked=False,
+                     diff_path=None, on_progress=None, sample_size=20):
+    """Recompute every project's Grade. conn_fn() -> (conn, cursor).
+
+    dry_run only computes the diff. diff_path (CSV) receives every changed row.
+    Returns stats: projects / inserted / updated / unchanged / chunks / seconds ...
+    plus "sample", the first sample_size changes for a preview.
+    """
+    started = time.perf_counter()
+    stats = {"projects": 0, "inserted": 0, "updated": 0, "unchanged": 0, "chunks": 0,
+             "compute_seconds": 0.0, "write_seconds": 0.0, "seconds": 0.0, "rows_per_sec": 0.0,
+             "dry_run": dry_run, "diff_path": diff_path, "sample": []}
+    conn, cursor = conn_fn()
+    diff_file = open(diff_path, "w", newline="", encoding="utf-8") if diff_path else None
+    try:
+        cursor.execute(ALL_PROJECTS_SQL if include_unmarked else SCORES_SQL)
+        rows = cursor.fetchall()
+        stats["compute_seconds"] = round(time.perf_counter() - started, 3)
+
+        diff = csv.writer(diff_file) if diff_file else None
+        if diff:
+            diff.writerow(["ProjectID", "change", "old_grade", "old_score", "new_grade", "new_score"])
+
+        write_started = time.perf_counter()
+        chunk = []
+
+        def flush():
+            if chunk and not dry_run:
+                cursor.executemany(UPSERT_SQL, chunk)
+                conn.commit()
+            if chunk:
+                stats["chunks"] += 1
+                if on_progress:
+                    on_progress(dict(stats, sample=None))
+            chunk.clear()
+
+        for pid, old_grade, old_score, grade, score, change in compute_changes(rows):
+            stats["projects"] += 1
+            if change == "same":
+                stats["unchanged"] += 1
+                continue
+            stats["inserted" if change == "insert" else "updated"] += 1
+            if diff:
+                diff.writerow([pid, change, old_grade or "", "" if old_score is None else old_score, grade, score])
+            if len(stats["sample"]) < sample_size:
+                stats["sample"].append((pid, change, old_grade, old_score, grade, score))
+            chunk.append((grade, score, pid))
+            if len(chunk) >= chunk_rows:
+                flush()
+        flush()
+        stats["write_seconds"] = round(time.perf_counter() - write_started, 3)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if diff_file:
+            diff_file.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["projects"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def format_stats(stats):
+    mode = "Dry run — nothing written" if stats["dry_run"] else "Grades written"
+    lines = [
+        mode,
+        f"Projects scored: {stats['projects']:,}",
+        f"New grades: {stats['inserted']:,}",
+        f"Changed grades: {stats['updated']:,}",
+        f"Unchanged: {stats['unchanged']:,}",
+        f"Time: {stats['seconds']:.2f}s (compute {stats['compute_seconds']:.2f}s, "
+        f"write {stats['write_seconds']:.2f}s in {stats['chunks']} chunk(s))",
+    ]
+    if stats["sample"]:
+        lines.append("")
+        lines.append("ProjectID  old → new")
+        for pid, change, old_grade, old_score, grade, score in stats["sample"]:
+            old = "—" if change == "insert" else f"{old_grade} {old_score}"
+            lines.append(f"{pid}  {old} → {grade} {score}")
+        more = stats["inserted"] + stats["updated"] - len(stats["sample"])
+        if more > 0:
+            lines.append(f"… and {more:,} more")
+    if stats.get("diff_path"):
+        lines.append(f"Full diff: {stats['diff_path']}")
+    return "\n".join(lines)
@@ -0,0 +1,307 @@
+# ==============================
+# VERSIONED SCHEMA MIGRATIONS + INDEX ADVISOR
+#   Each migration has a version, a name and its steps; applied versions
+#   are recorded in schema_version. Steps check information_schema first,
+#   so re-running a half-applied migration (MySQL DDL auto-commits) is safe.
+#   explain_report() runs EXPLAIN over the app's own queries and flags
+#   full scans / filesorts; time_queries() gives before/after timings.
+# ==============================
+import time
+
+import change_feed
+import grading
+import paging
+import recalc
+import services
+
+
+class MigrationError(Exception):
+    pass
+
+
+VERSION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        seconds DECIMAL(10,3)
+    )
+"""
+
+
+# ---------- step builders: (description, exists_sql, params, up_sql, down_sql) ----------
+def add_index(table, name, columns):
+    return (f"index {name} on {table}({', '.join(columns)})",
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+            (table, name),
+            f"CREATE INDEX {name} ON {table} ({', '.join(columns)})",
+            f"DROP INDEX {name} ON {table}")
+
+
+def add_column(table, column, definition):
+    return (f"column {table}.{column}",
+            "SELECT 1 FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s LIMIT 1",
+            (table, column),
+            f"ALTER TABLE {table} ADD COLUMN {column} {definition}",
+            f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+def add_table(table, create_sql):
+    return (f"table {table}",
+            "SELECT 1 FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1",
+            (table,), create_sql, f"DROP TABLE {table}")
+
+
+def add_trigger(name, create_sql):
+    return (f"trigger {name}",
+            "SELECT 1 FROM information_schema.TRIGGERS "
+            "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s LIMIT 1",
+            (name,), create_sql, f"DROP TRIGGER {name}")
+
+
+MIGRATIONS = [
+    (1, "marks_primary_key", [
+        # Appended last so SELECT * keeps MarksObtained..EvaluationID in their old positions
+        add_column("Marks", "MarkID", "INT NOT NULL AUTO_INCREMENT PRIMARY KEY"),
+    ]),
+    (2, "hot_path_indexes", [
+        # update_/delete_marks, sp_recalc_percentage, fn_project_avg_percentage (covers Percentage)
+        add_index("Marks", "idx_marks_eval_pct", ["EvaluationID", "Percentage"]),
+        # Marks -> Evaluation -> Faculty join, then GROUP BY ProjectID
+        add_index("Faculty", "idx_faculty_eval_project", ["EvaluationID", "ProjectID"]),
+        add_index("Faculty", "idx_faculty_project", ["ProjectID"]),
+        # Aggregate query: GROUP BY Domain
+        add_index("Project", "idx_project_domain", ["Domain"]),
+        # Nested query filter + vw_top_projects ORDER BY
+        add_index("Grade", "idx_grade_finalscore", ["FinalScore"]),
+        # Bulk recalc EvalDate window
+        add_index("Evaluation", "idx_evaluation_evaldate", ["EvalDate"]),
+        # Join query: Student <-> Team
+        add_index("Team", "idx_team_student", ["StudentID"]),
+    ]),
+    (3, "filter_bar_indexes", [
+        # Prefix LIKE 'abc%' can range-scan these (see paging.FILTERS)
+        add_index("Student", "idx_student_fname", ["Fname"]),
+        add_index("Student", "idx_student_lname", ["Lname"]),
+        add_index("Student", "idx_student_year", ["Year"]),
+        add_index("Team", "idx_team_name", ["TeamName"]),
+        add_index("Project", "idx_project_title", ["Title"]),
+    ]),
+    (4, "change_log", [
+        # Row versions for the change feed other open clients poll (see change_feed.py)
+        add_table(change_feed.CHANGE_TABLE, change_feed.CREATE_SQL),
+    ] + [add_trigger(name, sql) for name, sql in change_feed.all_triggers()]),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+
+# ---------- runner ----------
+def applied_versions(cursor):
+    cursor.execute(VERSION_TABLE_SQL)
+    cursor.execute("SELECT version, name, applied_at, seconds FROM schema_version ORDER BY version")
+    return cursor.fetchall()
+
+
+def status(conn_fn):
+    """[(version, name, applied_at or None, seconds or None)] for every known migration."""
+    conn, cursor = conn_fn()
+    try:
+        done = {r[0]: r for r in applied_versions(cursor)}
+    finally:
+        conn.close()
+    return [(v, name, done[v][2] if v in done else None, done[v][3] if v in done else None)
+            for v, name, _ in MIGRATIONS]
+
+
+def migrate(conn_fn, target=None, log=print):
+    """Apply (or, for a lower target, roll back) migrations. Returns the versions touched."""
+    target = LATEST if target is None else int(target)
+    conn, cursor = conn_fn()
+    touched = []
+    try:
+        current = max((r[0] for r in applied_versions(cursor)), default=0)
+        conn.commit()
+        if target >= current:
+            for version, name, steps in MIGRATIONS:
+                if current < version <= target:
+                    _run(cursor, version, name, steps, up=True, log=log)
+                    conn.commit()
+                    touched.append(version)
+        else:
+            for version, name, steps in reversed(MIGRATIONS):
+                if target < version <= current:
+                    _run(cursor, version, name, list(reversed(steps)), up=False, log=log)
+                    conn.commit()
+                    touched.append(version)
+    finally:
+        conn.close()
+    # Indexes / keys changed: cached pages and counts may be shaped differently now
+    services.READ_CACHE.clear()
+    return touched
+
+
+def _run(cursor, version, name, steps, up, log):
+    started = time.perf_counter()
+    log(f"{'Applying' if up else 'Rolling back'} {version:03d}_{name}")
+    for desc, exists_sql, params, up_sql, down_sql in steps:
+        cursor.execute(exists_sql, params)
+        exists = cursor.fetchone() is not None
+        if exists == up:
+            log(f"  {desc}: {'already there' if up else 'not there'}, skipped")
+            continue
+        step_started = time.perf_counter()
+        try:
+            cursor.execute(up_sql if up else down_sql)
+        except Exception as e:
+            raise MigrationError(f"{version:03d}_{name}: {desc} failed: {e}")
+        log(f"  {desc}: {'added' if up else 'dropped'} ({time.perf_counter() - step_started:.2f}s)")
+    if up:
+        cursor.execute("INSERT INTO schema_version (version, name, seconds) VALUES (%s, %s, %s)",
+                       (version, name, round(time.perf_counter() - started, 3)))
+    else:
+        cursor.execute("DELETE FROM schema_version WHERE version = %s", (version,))
+
+
+def marks_has_key(conn_fn):
+    """True once migration 1 gave Marks its MarkID primary key."""
+    conn, cursor = conn_fn()
+    try:
+        _, exists_sql, params, _, _ = MIGRATIONS[0][2][0]
+        cursor.execute(exists_sql, params)
+        return cursor.fetchone() is not None
+    finally:
+        conn.close()
+
+
+def use_schema_keys(conn_fn):
+    """Page Marks by MarkID (keyset) instead of OFFSET once migration 1 is applied."""
+    try:
+        keyed = marks_has_key(conn_fn)
+    except Exception:
+        keyed = False   # DB unreachable: the tabs report that themselves
+    if keyed:
+        paging.TABLE_KEYS["Marks"] = ["MarkID"]
+        if "MarkID" not in services.ENTITIES["marks"]["columns"]:
+            services.ENTITIES["marks"]["columns"].append("MarkID")
+    return keyed
+
+
+# ---------- index advisor ----------
+def app_queries(sample_id=1):
+    """(name, sql, params, timed) for the statements the app runs most; writes are only EXPLAINed."""
+    return [
+        ("nested query (FinalScore > AVG)", services.NESTED_QUERY_SQL, (), True),
+        ("join query (Student-Team)", services.JOIN_QUERY_SQL, (), True),
+        ("aggregate query (GROUP BY Domain)", services.AGGREGATE_QUERY_SQL, (), True),
+        ("vw_project_summary", "SELECT * FROM vw_project_summary", (), True),
+        ("vw_top_projects LIMIT 10", "SELECT * FROM vw_top_projects LIMIT 10", (), True),
+        ("fn_project_avg_percentage (one project)",
+         "SELECT ROUND(AVG(m.Percentage),2) FROM Marks m "
+         "JOIN Evaluation e ON m.EvaluationID = e.EvaluationID "
+         "JOIN Faculty f ON e.EvaluationID = f.EvaluationID WHERE f.ProjectID = %s", (sample_id,), True),
+        ("batch grading scores", grading.SCORES_SQL, (), True),
+        ("marks by EvaluationID (update_/delete_marks)",
+         "SELECT * FROM Marks WHERE EvaluationID = %s", (sample_id,), True),
+        ("recalc window (EvalDate)", "SELECT EvaluationID FROM Evaluation WHERE EvalDate >= %s AND EvalDate <= %s "
+         "ORDER BY EvaluationID LIMIT 500", ("2025-03-01", "2025-03-31"), True),
+        ("filter bar: student name prefix",
+         "SELECT * FROM Student WHERE (Fname LIKE %s OR Lname LIKE %s) ORDER BY StudentID LIMIT 100",
+         ("Ra%", "Ra%"), True),
+        ("filter bar: project title prefix",
+         "SELECT * FROM Project WHERE (Title LIKE %s) ORDER BY ProjectID LIMIT 100", ("Smart%",), True),
+        ("recalc batch update", recalc.RECALC_SQL.format(ids="%s"), (sample_id,), False),
+        ("delete_marks", "DELETE FROM Marks WHERE EvaluationID = %s", (sample_id,), False),
+    ]
+
+
+def explain_report(conn_fn):
+    """EXPLAIN every app query. Returns [(query, table, type, key, rows, extra, warning)]."""
+    out = []
+    conn, cursor = conn_fn()
+    try:
+        for name, sql, params, _ in app_queries():
+            try:
+                cursor.execute("EXPLAIN " + sql, params)
+                cols = [d[0].lower() for d in cursor.description]
+                plan = [_sqlite_step(r[-1]) if cols[-1] == "detail" else dict(zip(cols, r))
+                        for r in cursor.fetchall()]
+            except Exception as e:
+                out.append((name, "", "", "", "", str(e), "EXPLAIN failed"))
+                continue
+            for step in plan:
+                extra = step.get("extra") or ""
+                warn = []
+                if step.get("type") == "ALL":
+                    warn.append("FULL SCAN")
+                if "filesort" in extra:
+                    warn.append("filesort")
+                if "temporary" in extra:
+                    warn.append("temp table")
+                out.append((name, step.get("table") or "", step.get("type") or "", step.get("key") or "",
+                            step.get("rows") or "", extra, ", ".join(warn)))
+    finally:
+        conn.close()
+    return out
+
+
+def _sqlite_step(detail):
+    """One EXPLAIN QUERY PLAN line (SQLite backend) in MySQL EXPLAIN terms."""
+    words = detail.split()
+    if words[0] == "USE":   # USE TEMP B-TREE FOR ORDER BY / GROUP BY / DISTINCT
+        return {"extra": "Using filesort" if "ORDER" in words else "Using temporary"}
+    step = {"table": words[1] if len(words) > 1 else "", "extra": detail}
+    if "INDEX" in words:
+        step["key"] = words[words.index("INDEX") + 1]
+        step["type"] = "ref" if words[0] == "SEARCH" else "index"
+    elif words[0] == "SEARCH":
+        step["type"] = "eq_ref"   # rowid / primary key lookup
+    elif words[0] == "SCAN":
+        step["type"] = "ALL"
+    return step
+
+
+def time_queries(conn_fn, repeat=3):
+    """Best-of-repeat wall time (ms) for each read query in app_queries()."""
+    timings = []
+    conn, cursor = conn_fn()
+    try:
+        for name, sql, params, timed in app_queries():
+            if not timed:
+                continue
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                ms = (time.perf_counter() - started) * 1000
+                best = ms if best is None else min(best, ms)
+            timings.append((name, round(best, 2)))
+    finally:
+        conn.close()
+    return timings
+
+
+def format_explain(rows):
+    lines = []
+    for name, table, kind, key, n, extra, warn in rows:
+        flag = f"  <-- {warn}" if warn else ""
+        lines.append(f"{name}: {table} type={kind} key={key or '-'} rows={n} {extra}".rstrip() + flag)
+    scans = sum(1 for r in rows if "FULL SCAN" in r[6])
+    lines.append(f"\n{scans} full table scan(s) in {len({r[0] for r in rows})} queries")
+    return "\n".join(lines)
+
+
+def format_timings(before, after=None):
+    if after is None:
+        return "\n".join(f"{ms:10.2f} ms  {name}" for name, ms in before)
+    after = dict(after)
+    lines = [f"{'before':>10}  {'after':>10}  {'speedup':>8}  query"]
+    for name, ms in before:
+        a = after.get(name)
+        speed = f"{ms / a:7.1f}x" if a else "      -"
+        lines.append(f"{ms:8.2f}ms  {a if a is not None else 0:8.2f}ms  {speed}  {name}")
+    return "\n".join(lines)
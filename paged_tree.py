@@ -0,0 +1,243 @@
+# ==============================
+# PAGED / VIRTUAL-SCROLLING TREEVIEW
+#   Keeps only a few pages of rows in the Treeview. Scrolling to the
+#   bottom (or top) fetches the next (or previous) page on the DB worker
+#   and drops the page furthest away. The filter bar under it pushes a
+#   WHERE clause down to MySQL once typing pauses for FILTER_DELAY_MS.
+#   Clicking a heading sorts (shift-click: add a tie-breaker): in memory when
+#   every matching row is loaded, otherwise as ORDER BY on the paged query.
+# ==============================
+import tkinter as tk
+from tkinter import ttk
+
+import sorting
+from paging import Pager, PAGE_SIZE, MAX_PAGES, FILTERS, build_where
+
+FILTER_DELAY_MS = 300
+SHIFT = 0x0001
+
+
+def bind_heading_sort(tree, on_click):
+    """Call on_click(column, add) when a heading is clicked (add = shift held)."""
+    def released(event):
+        if tree.identify_region(event.x, event.y) != "heading":
+            return
+        index = int(tree.identify_column(event.x)[1:]) - 1
+        columns = tree["columns"]
+        if 0 <= index < len(columns):
+            on_click(columns[index], bool(event.state & SHIFT))
+    tree.bind("<ButtonRelease-1>", released, add="+")
+
+
+def show_sort(tree, order):
+    """Put the ▲/▼ markers of order on tree's headings."""
+    for c in tree["columns"]:
+        tree.heading(c, text=sorting.heading_text(c, order))
+
+
+class PagedTree:
+    def __init__(self, app, parent, tree, table, columns, fetch_fn, first_fn,
+                 page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        """fetch_fn(sql, params) -> rows and first_fn(sql, params, where, where_params)
+        -> (rows, total, is_estimate) run on the worker (see services.fetch_page /
+        fetch_first_page)."""
+        self.app = app
+        self.tree = tree
+        self.pager = Pager(table, columns, page_size, max_pages)
+        self.fetch_fn = fetch_fn
+        self.first_fn = first_fn
+        self.key = f"page:{table}"
+        self.loading = False
+
+        self.scroll = ttk.Scrollbar(parent, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=self._on_scroll)
+
+        self.nav = ttk.Frame(parent)
+        ttk.Button(self.nav, text="⏮ First", command=self.reload).pack(side="left", padx=2)
+        ttk.Button(self.nav, text="◀ Prev page", command=self.load_prev).pack(side="left", padx=2)
+        ttk.Button(self.nav, text="Next page ▶", command=self.load_next).pack(side="left", padx=2)
+        self.status = ttk.Label(self.nav, text="")
+        self.status.pack(side="left", padx=10)
+
+        self.filter_bar = ttk.Frame(parent)
+        self.filter_vars = {}     # label -> StringVar, or (from, to) StringVars for ranges
+        self._filter_job = None
+        ttk.Label(self.filter_bar, text="Filter:").pack(side="left", padx=(0, 4))
+        for field in FILTERS.get(table, []):
+            ttk.Label(self.filter_bar, text=field["label"]).pack(side="left", padx=(6, 2))
+            if field["kind"] == "range":
+                pair = (tk.StringVar(), tk.StringVar())
+                ttk.Entry(self.filter_bar, textvariable=pair[0], width=10).pack(side="left")
+                ttk.Label(self.filter_bar, text="–").pack(side="left")
+                ttk.Entry(self.filter_bar, textvariable=pair[1], width=10).pack(side="left")
+                self.filter_vars[field["label"]] = pair
+            else:
+                var = tk.StringVar()
+                ttk.Entry(self.filter_bar, textvariable=var, width=14).pack(side="left")
+                self.filter_vars[field["label"]] = var
+        for var in self._all_filter_vars():
+            var.trace_add("write", lambda *_: self._schedule_filter())
+        ttk.Button(self.filter_bar, text="Clear", command=self.clear_filter).pack(side="left", padx=6)
+        self.filter_msg = ttk.Label(self.filter_bar, text="", foreground="red")
+        self.filter_msg.pack(side="left")
+        bind_heading_sort(tree, self.sort_by)
+
+    def grid(self, row, column, rowspan):
+        """Place scrollbar right of the tree, the nav bar under it and the filter bar below that."""
+        self.scroll.grid(row=row, column=column + 1, rowspan=rowspan, sticky="ns", pady=10)
+        self.nav.grid(row=row + rowspan, column=column, sticky="w", padx=10)
+        self.filter_bar.grid(row=row + rowspan + 1, column=column, sticky="w", padx=10, pady=(0, 6))
+
+    # ---------- filtering ----------
+    def _all_filter_vars(self):
+        for v in self.filter_vars.values():
+            yield from (v if isinstance(v, tuple) else (v,))
+
+    def _schedule_filter(self):
+        # Debounce: every keystroke restarts the timer, only the last one queries
+        if self._filter_job is not None:
+            self.tree.after_cancel(self._filter_job)
+        self._filter_job = self.tree.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        self._filter_job = None
+        values = {label: tuple(x.get() for x in v) if isinstance(v, tuple) else v.get()
+                  for label, v in self.filter_vars.items()}
+        where, params, errors = build_where(self.pager.table, values)
+        self.filter_msg.config(text="; ".join(errors))
+        if (where, params) == (self.pager.where, self.pager.where_params) and self.pager.total is not None:
+            return   # e.g. a trailing space: same query as on screen
+        self.pager.set_filter(where, params)
+        self.reload()
+
+    def clear_filter(self):
+        for var in self._all_filter_vars():
+            var.set("")
+        if self._filter_job is not None:
+            self.tree.after_cancel(self._filter_job)
+        self.apply_filter()
+
+    # ---------- sorting ----------
+    def sort_by(self, column, add=False):
+        order = sorting.next_order(self.pager.sort, column, add)
+        if self.loading:
+            return
+        show_sort(self.tree, order)
+        if self.pager.sort_loaded(order):
+            self.tree.delete(*self.tree.get_children())
+            self._insert([r for page in self.pager.pages for r in page], tk.END)
+            self._update_status()
+        else:
+            self.pager.set_sort(order)
+            self.reload()
+
+    # ---------- loading ----------
+    def reload(self):
+        sql, params = self.pager.first_query()
+        where, where_params = self.pager.where, self.pager.where_params
+
+        def done(result):
+            rows, total, is_estimate = result
+            self.loading = False
+            self.tree.delete(*self.tree.get_children())
+            self._insert(self.pager.apply_first(rows, total, is_estimate), tk.END)
+            self.tree.yview_moveto(0)
+            self._update_status()
+
+        self._start(lambda: self.first_fn(sql, params, where, where_params), done)
+
+    def load_next(self):
+        if self.loading or (self.pager.pages and not self.pager.has_more):
+            return
+        sql, params = self.pager.next_query()
+
+        def done(rows):
+            self.loading = False
+            dropped = self.pager.apply_next(rows)
+            self._drop(self.tree.get_children()[:dropped])
+            self._insert(rows, tk.END)
+            if rows:
+                self.tree.see(self.tree.get_children()[-len(rows)])
+            self._update_status()
+
+        self._start(lambda: self.fetch_fn(sql, params), done)
+
+    def load_prev(self):
+        if self.loading or self.pager.start_offset == 0:
+            return
+        sql, params = self.pager.prev_query()
+
+        def done(rows):
+            self.loading = False
+            ordered, dropped = self.pager.apply_prev(rows)
+            if dropped:
+                self._drop(self.tree.get_children()[-dropped:])
+            self._insert(ordered, 0)
+            if ordered:
+                self.tree.see(self.tree.get_children()[len(ordered) - 1])
+            self._update_status()
+
+        self._start(lambda: self.fetch_fn(sql, params), done)
+
+    def selected_rows(self):
+        """[(iid, row)] for the selected items, with the rows as fetched (not Tk's strings)."""
+        children = self.tree.get_children()
+        rows = [r for page in self.pager.pages for r in page]
+        pos = {iid: i for i, iid in enumerate(children)}
+        return [(iid, rows[pos[iid]]) for iid in self.tree.selection() if pos.get(iid, len(rows)) < len(rows)]
+
+    def reload_if_loaded(self):
+        if self.pager.total is not None:
+            self.reload()
+
+    def patch(self, match_cols, match_vals, rows, total=None, is_estimate=False):
+        """Incremental refresh: put the freshly read rows in place of the old ones."""
+        if self.pager.total is None:
+            return self.reload()
+        match_idx = [self.pager.columns.index(c) for c in match_cols]
+        removed, insert_at = self.pager.replace(match_idx, match_vals, rows)
+        children = self.tree.get_children()
+        if self.pager.key_idx and len(removed) == 1 and len(rows) == 1 and insert_at == removed[0]:
+            # Same primary key, new values: edit the item in place
+            self.tree.item(children[removed[0]], values=rows[0])
+        else:
+            self._drop([children[i] for i in removed])
+            if rows and insert_at is not None:
+                self._insert(rows, insert_at)
+        if total is not None:
+            self.pager.total, self.pager.total_is_estimate = total, is_estimate
+        self._update_status()
+
+    def _start(self, work, done):
+        self.loading = True
+
+        def failed(e):
+            self.loading = False
+            self.app.show_db_error(e)
+        self.app.worker.submit(self.key, work, done, failed)
+
+    # ---------- tree updates ----------
+    def _insert(self, rows, index):
+        for offset, row in enumerate(rows):
+            pos = index if index == tk.END else index + offset
+            iid = self.pager.iid_of(row)
+            if iid is not None:
+                self.tree.insert('', pos, iid=iid, values=row)
+            else:
+                self.tree.insert('', pos, values=row)
+
+    def _drop(self, items):
+        if items:
+            self.tree.delete(*items)
+
+    def _update_status(self):
+        self.status.config(text=self.pager.status_text())
+
+    def _on_scroll(self, first, last):
+        self.scroll.set(first, last)
+        if self.loading or not self.pager.pages:
+            return
+        if float(last) >= 0.999 and self.pager.has_more:
+            self.load_next()
+        elif float(first) <= 0.0 and self.pager.start_offset > 0:
+            self.load_prev()
@@ -0,0 +1,398 @@
+# ==============================
+# KEYSET PAGINATION (no Tk imports)
+#   Builds "next window of rows" queries on the primary key so large
+#   tables are never fetched in one go.
+# ==============================
+import bisect
+import datetime
+
+import sorting
+from row_store import RowStore
+
+PAGE_SIZE = 200          # rows fetched per round trip
+MAX_PAGES = 3            # pages kept in the Treeview at once (visible + buffer)
+ESTIMATE_ABOVE = 50000   # above this many rows show the InnoDB estimate instead of COUNT(*)
+COUNT_CAP = 10000        # filtered counts stop here ("10,000+")
+
+# Primary key columns per table. Marks has no primary key, so it pages by OFFSET.
+TABLE_KEYS = {
+    "Student":    ["StudentID"],
+    "Team":       ["TeamID"],
+    "Project":    ["ProjectID"],
+    "Evaluation": ["EvaluationID"],
+    "Grade":      ["ProjectID"],
+    "Marks":      [],
+}
+
+
+# Filter bar fields per table: prefix = word-prefix search over the columns,
+# exact = equality, range = min/max (type: int / float / date)
+FILTERS = {
+    "Student":    [{"label": "Name", "kind": "prefix", "cols": ["Fname", "Lname"]},
+                   {"label": "StudentID", "kind": "exact", "cols": ["StudentID"], "type": "int"},
+                   {"label": "Dept", "kind": "exact", "cols": ["Dept"]},
+                   {"label": "Year", "kind": "range", "cols": ["Year"], "type": "int"}],
+    "Team":       [{"label": "TeamName", "kind": "prefix", "cols": ["TeamName"]},
+                   {"label": "StudentID", "kind": "exact", "cols": ["StudentID"], "type": "int"}],
+    "Project":    [{"label": "Title", "kind": "prefix", "cols": ["Title"]},
+                   {"label": "Domain", "kind": "exact", "cols": ["Domain"]},
+                   {"label": "TeamID", "kind": "exact", "cols": ["TeamID"], "type": "int"}],
+    "Marks":      [{"label": "EvaluationID", "kind": "exact", "cols": ["EvaluationID"], "type": "int"},
+                   {"label": "Percentage", "kind": "range", "cols": ["Percentage"], "type": "float"}],
+    "Evaluation": [{"label": "EvaluationID", "kind": "exact", "cols": ["EvaluationID"], "type": "int"},
+                   {"label": "EvalDate", "kind": "range", "cols": ["EvalDate"], "type": "date"}],
+    "Grade":      [{"label": "Grade", "kind": "exact", "cols": ["Grade"]},
+                   {"label": "FinalScore", "kind": "range", "cols": ["FinalScore"], "type": "float"}],
+}
+
+_CONVERT = {"int": int, "float": float, "date": datetime.date.fromisoformat, None: str}
+
+
+def _like_prefix(text):
+    # Escape LIKE wildcards so "50%" or "a_b" match literally ('!' escapes the same way in MySQL and SQLite)
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+
+
+def build_where(table, values):
+    """Turn filter bar input into a parameterized WHERE clause.
+
+    values: {label: text} for prefix/exact fields, {label: (min_text, max_text)} for ranges
+    (a plain text for a range means exactly that value).
+    Returns (where_sql_without_WHERE, params, errors); blank inputs are ignored.
+    """
+    clauses, params, errors = [], [], []
+    for field in FILTERS.get(table, []):
+        raw = values.get(field["label"])
+        convert = _CONVERT[field.get("type")]
+        if field["kind"] == "range":
+            lo, hi = (raw, raw) if isinstance(raw, str) else (raw or ("", ""))
+            for text, op, name in ((lo, ">=", "from"), (hi, "<=", "to")):
+                text = (text or "").strip()
+                if not text:
+                    continue
+                try:
+                    params.append(convert(text))
+                except ValueError:
+                    errors.append(f"{field['label']} {name}: {text!r} is not a valid {field.get('type')}")
+                    continue
+                clauses.append(f"{field['cols'][0]} {op} %s")
+            continue
+        text = (raw or "").strip()
+        if not text:
+            continue
+        if field["kind"] == "prefix":
+            # Every word must start one of the columns: "asha ra" -> Fname LIKE 'asha%' AND Lname LIKE 'ra%' ...
+            for word in text.split():
+                clauses.append("(" + " OR ".join(f"{c} LIKE %s ESCAPE '!'" for c in field["cols"]) + ")")
+                params.extend([_like_prefix(word)] * len(field["cols"]))
+        else:
+            try:
+                params.append(convert(text))
+            except ValueError:
+                errors.append(f"{field['label']}: {text!r} is not a valid {field.get('type')}")
+                continue
+            clauses.append(f"{field['cols'][0]} = %s")
+    return " AND ".join(clauses), tuple(params), errors
+
+
+def _key_predicate(key_cols, op):
+    if len(key_cols) == 1:
+        return f"{key_cols[0]} {op} %s"
+    cols = ", ".join(key_cols)
+    marks = ", ".join(["%s"] * len(key_cols))
+    return f"({cols}) {op} ({marks})"
+
+
+def _where_sql(clauses):
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+def _seek_predicate(order, values, not_null=()):
+    """Rows after `values` in `order` ([(col, descending)]), NULLs first ascending / last descending
+    as MySQL and SQLite sort them: a > x OR (a = x AND b > y) OR ... (not_null: key columns)."""
+    terms, params = [], []
+    equal, equal_params = [], []
+    for (col, descending), v in zip(order, values):
+        if v is None:
+            after, after_params = (None, ()) if descending else (f"{col} IS NOT NULL", ())
+        elif descending and col not in not_null:
+            after, after_params = f"({col} < %s OR {col} IS NULL)", (v,)
+        elif descending:
+            after, after_params = f"{col} < %s", (v,)
+        else:
+            after, after_params = f"{col} > %s", (v,)
+        if after:
+            terms.append(" AND ".join(equal + [after]))
+            params += equal_params + list(after_params)
+        equal.append(f"{col} IS NULL" if v is None else f"{col} = %s")
+        equal_params += [] if v is None else [v]
+    if not terms:
+        return "1 = 0", ()
+    return "(" + " OR ".join(f"({t})" for t in terms) + ")", tuple(params)
+
+
+def order_sql(order):
+    return ", ".join(f"{c} {'DESC' if d else 'ASC'}" for c, d in order)
+
+
+def keyset_sql(table, key_cols, after=None, before=None, limit=PAGE_SIZE, where="", where_params=(), order=None):
+    """SELECT * ordered by key_cols, strictly after (or before) the given key tuple.
+
+    where/where_params is an optional filter (see build_where). Pages fetched
+    with before= come back in descending order; callers reverse them.
+    order ([(col, descending)], ending in the key columns) sorts by other
+    columns too; after / before are then that order's values. An index on the
+    leading sort column (which InnoDB extends with the primary key) serves it.
+    """
+    clauses = [f"({where})"] if where else []
+    params = tuple(where_params) if where else ()
+    if order:
+        if before is not None:
+            order = [(c, not d) for c, d in order]
+        seek = after if after is not None else before
+        if seek is not None:
+            predicate, seek_params = _seek_predicate(order, seek, key_cols)
+            clauses.append(predicate)
+            params += seek_params
+        return (f"SELECT * FROM {table}{_where_sql(clauses)} ORDER BY {order_sql(order)} LIMIT {int(limit)}",
+                params)
+    if after is not None:
+        clauses.append(_key_predicate(key_cols, ">"))
+        params += tuple(after)
+    elif before is not None:
+        clauses.append(_key_predicate(key_cols, "<"))
+        params += tuple(before)
+    direction = "DESC" if before is not None else "ASC"
+    order_by = ", ".join(f"{c} {direction}" for c in key_cols)
+    return f"SELECT * FROM {table}{_where_sql(clauses)} ORDER BY {order_by} LIMIT {int(limit)}", params
+
+
+def offset_sql(table, offset, limit=PAGE_SIZE, where="", where_params=(), order=None):
+    clauses = [f"({where})"] if where else []
+    order_by = f" ORDER BY {order_sql(order)}" if order else ""
+    return (f"SELECT * FROM {table}{_where_sql(clauses)}{order_by} LIMIT {int(limit)} OFFSET {int(offset)}",
+            tuple(where_params) if where else ())
+
+
+def count_rows(cursor, table, where="", where_params=()):
+    """Return (row_count, is_estimate).
+
+    Big InnoDB tables make COUNT(*) a full index scan, so the table statistics
+    estimate is used once it passes ESTIMATE_ABOVE rows. Filtered counts stop
+    at COUNT_CAP (returned as an estimate).
+    """
+    if where:
+        cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {where} "
+                       f"LIMIT {COUNT_CAP + 1}) capped", tuple(where_params))
+        n = int(cursor.fetchone()[0])
+        return (COUNT_CAP, True) if n > COUNT_CAP else (n, False)
+    try:
+        cursor.execute("""
+            SELECT TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        row = cursor.fetchone()
+        if row and row[0] is not None and row[0] > ESTIMATE_ABOVE:
+            return int(row[0]), True
+    except Exception:
+        pass
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return int(cursor.fetchone()[0]), False
+
+
+class Pager:
+    """Sliding window of pages over one table.
+
+    Query builders (*_query) run on the Tk thread, the SQL runs on a worker,
+    and apply_* (back on the Tk thread) updates the window and says what to
+    add/remove from the Treeview.
+    """
+
+    def __init__(self, table, columns, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        self.table = table
+        self.columns = list(columns)
+        self.key_cols = TABLE_KEYS.get(table, [])
+        self.key_idx = [self.columns.index(c) for c in self.key_cols]
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.where, self.where_params = "", ()
+        self.sort = []           # [(column, descending)] picked on the headings; [] = key order
+        self.reset()
+
+    def set_filter(self, where, params):
+        """New filter (from build_where); the window restarts from the first page."""
+        self.where, self.where_params = where, tuple(params)
+        self.reset()
+
+    def set_sort(self, sort):
+        """New sort order (see sorting.next_order); the window restarts from the first page."""
+        self.sort = list(sort)
+        self.reset()
+
+    def sort_loaded(self, sort):
+        """Re-sort in memory when the window holds every row; False means reload with set_sort."""
+        if not self.complete:
+            return False
+        self.sort = list(sort)
+        rows = [r for page in self.pages for r in page]
+        if self.order:
+            rows = sorting.sort_rows(rows, sorting.by_index(self.order, self.columns))
+        elif self.key_idx:
+            rows.sort(key=self.key_of)
+        else:
+            return False   # no key to restore the table's own order by
+        self.pages = [self._page(rows[i:i + self.page_size]) for i in range(0, len(rows), self.page_size)]
+        return True
+
+    def reset(self):
+        self.pages = []          # RowStores (one per page) currently in the window
+        self.start_offset = 0    # absolute position of the first row in the window
+        self.has_more = False
+        self.total = None
+        self.total_is_estimate = False
+
+    # ---------- helpers ----------
+    def _page(self, rows):
+        return RowStore.from_rows(rows, self.columns)
+
+    def key_of(self, row):
+        return tuple(row[i] for i in self.key_idx)
+
+    def iid_of(self, row):
+        """Treeview item id for a row (primary key), or None for tables without one."""
+        if not self.key_idx:
+            return None
+        return "|".join(str(v) for v in self.key_of(row))
+
+    @property
+    def loaded(self):
+        return sum(len(p) for p in self.pages)
+
+    @property
+    def complete(self):
+        """Every row matching the filter is in the window."""
+        return self.total is not None and self.start_offset == 0 and not self.has_more
+
+    @property
+    def order(self):
+        """The ORDER BY as [(column, descending)]: the picked sort, then the key as tie-breaker."""
+        if not self.sort:
+            return None
+        picked = {c for c, _ in self.sort}
+        return self.sort + [(c, False) for c in self.key_cols if c not in picked]
+
+    def seek_of(self, row):
+        """Values of row in the ORDER BY columns (the keyset position)."""
+        return tuple(row[self.columns.index(c)] for c, _ in self.order)
+
+    # ---------- query builders (Tk thread) ----------
+    def _position(self, row):
+        return self.seek_of(row) if self.order else self.key_of(row)
+
+    def first_query(self):
+        if self.key_cols:
+            return keyset_sql(self.table, self.key_cols, limit=self.page_size,
+                              where=self.where, where_params=self.where_params, order=self.order)
+        return offset_sql(self.table, 0, self.page_size, self.where, self.where_params, self.order)
+
+    def next_query(self):
+        if not self.pages:
+            return self.first_query()
+        if self.key_cols:
+            return keyset_sql(self.table, self.key_cols, after=self._position(self.pages[-1][-1]),
+                              limit=self.page_size, where=self.where, where_params=self.where_params,
+                              order=self.order)
+        return offset_sql(self.table, self.start_offset + self.loaded, self.page_size,
+                          self.where, self.where_params, self.order)
+
+    def prev_query(self):
+        if self.key_cols:
+            return keyset_sql(self.table, self.key_cols, before=self._position(self.pages[0][0]),
+                              limit=self.page_size, where=self.where, where_params=self.where_params,
+                              order=self.order)
+        offset = max(0, self.start_offset - self.page_size)
+        return offset_sql(self.table, offset, self.start_offset - offset, self.where, self.where_params,
+                          self.order)
+
+    # ---------- window updates (Tk thread) ----------
+    def apply_first(self, rows, total=None, is_estimate=False):
+        self.reset()
+        self.total, self.total_is_estimate = total, is_estimate
+        if rows:
+            self.pages = [self._page(rows)]
+        self.has_more = len(rows) >= self.page_size
+        return rows
+
+    def apply_next(self, rows):
+        """Returns how many rows to drop from the top of the tree."""
+        self.has_more = len(rows) >= self.page_size
+        if not rows:
+            return 0
+        self.pages.append(self._page(rows))
+        dropped = 0
+        while len(self.pages) > self.max_pages:
+            dropped += len(self.pages.pop(0))
+        self.start_offset += dropped
+        return dropped
+
+    def apply_prev(self, rows):
+        """rows as fetched (descending for keyset). Returns (rows_in_order, dropped_from_bottom)."""
+        if self.key_cols:
+            rows = list(reversed(rows))
+        if not rows:
+            self.start_offset = 0
+            return [], 0
+        self.pages.insert(0, self._page(rows))
+        self.start_offset = max(0, self.start_offset - len(rows))
+        dropped = 0
+        while len(self.pages) > self.max_pages:
+            dropped += len(self.pages.pop())
+            self.has_more = True
+        return rows, dropped
+
+    def replace(self, match_idx, match_vals, new_rows):
+        """Swap the window rows matching match_vals (compared as text) for new_rows.
+
+        Used after a write so only the affected rows change. Returns
+        (removed_positions, insert_at); insert_at is None when the new rows
+        belong outside the loaded window.
+        """
+        want = [str(v) for v in match_vals]
+        flat = [r for page in self.pages for r in page]
+        removed = [i for i, r in enumerate(flat) if [str(r[j]) for j in match_idx] == want]
+        gone = set(removed)
+        keep = [r for i, r in enumerate(flat) if i not in gone]
+
+        insert_at = None
+        if new_rows:
+            if removed and not (self.order and self.key_idx):
+                insert_at = removed[0]
+            elif self.key_idx:
+                if self.order:
+                    insert_at = sorting.insert_position(keep, new_rows[0], sorting.by_index(self.order, self.columns))
+                else:
+                    keys = [self.key_of(r) for r in keep]
+                    insert_at = bisect.bisect_left(keys, self.key_of(new_rows[0]))
+                before_window = insert_at == 0 and self.start_offset > 0
+                after_window = insert_at == len(keep) and self.has_more
+                if before_window or after_window:
+                    insert_at = None
+            elif not self.has_more:
+                insert_at = len(keep)
+            if insert_at is not None:
+                keep[insert_at:insert_at] = list(new_rows)
+
+        self.pages = [self._page(keep[i:i + self.page_size]) for i in range(0, len(keep), self.page_size)]
+        return removed, insert_at
+
+    def status_text(self):
+        if not self.pages:
+            shown = "No rows"
+        else:
+            shown = f"Rows {self.start_offset + 1:,}–{self.start_offset + self.loaded:,}"
+        if self.total is None:
+            return shown
+        if self.where and self.total_is_estimate:
+            return f"{shown} of {self.total:,}+ matching"
+        prefix = "~" if self.total_is_estimate else ""
+        return f"{shown} of {prefix}{self.total:,}" + (" matching" if self.where else "")
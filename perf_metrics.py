@@ -0,0 +1,254 @@
+# ==============================
+# DB OPERATION TIMING
+#   Every DB operation (one DbWorker job, tagged with the GUI method that
+#   started it, e.g. show_marks / run_join_query) records connect, execute
+#   and fetch time, rows fetched and the Treeview render time that follows.
+#   get_conn_cursor hands out TimedCursors, so all modules are covered; a
+#   checkout outside any job counts as one operation until conn.close().
+#   Export: JSON lines (one per operation) or Prometheus text format.
+# ==============================
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+PHASES = ("connect", "execute", "fetch", "render", "total")
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Helper frames skipped when naming an operation after the method that started it
+PLUMBING = {
+    "submit", "get_conn_cursor", "run_db", "write_db", "load_tree", "write_row",
+    "_start", "reload", "load_next", "load_prev", "reload_if_loaded", "patch", "apply_filter",
+    "clear_filter", "_on_scroll", "<lambda>",
+}
+
+
+def caller_tag(key=None):
+    """Name of the first non-helper function on the calling stack.
+
+    Reached straight from a Tk callback (scrolling, the pager's own buttons),
+    the innermost helper plus the worker key is used instead, e.g. "load_next[page:Marks]".
+    """
+    frame = sys._getframe(1)
+    helper = None
+    while frame is not None:
+        name = frame.f_code.co_name
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("tkinter"):
+            break
+        if module != __name__ and name not in PLUMBING:
+            return name
+        if module != __name__ and name not in ("submit", "<lambda>"):
+            helper = name
+        frame = frame.f_back
+    base = helper or "unknown"
+    return f"{base}[{key}]" if key else base
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+class Metrics:
+    def __init__(self, max_samples=5000, clock=time.perf_counter):
+        self.clock = clock
+        self.samples = deque(maxlen=max_samples)   # finished operations, oldest first
+        self._lock = threading.Lock()
+        self._local = threading.local()            # .op = operation running on this thread
+        self._latest = {}                          # tag -> newest sample (render time lands there)
+        self.render_tag = None                     # set by DbWorker while a result callback runs
+
+    # ---------- recording ----------
+    def begin(self, tag):
+        """Start an operation on this thread; None if one is already running (it absorbs this one)."""
+        if getattr(self._local, "op", None) is not None:
+            return None
+        op = {"tag": tag, "at": round(time.time(), 3), "connect_ms": 0.0, "execute_ms": 0.0,
+              "fetch_ms": 0.0, "render_ms": 0.0, "total_ms": 0.0, "rows": 0, "statements": 0,
+              "error": None, "_started": self.clock()}
+        self._local.op = op
+        return op
+
+    def end(self, op, error=None):
+        op["total_ms"] = round((self.clock() - op.pop("_started")) * 1000, 3)
+        op["error"] = error
+        self._local.op = None
+        self._store(op)
+
+    def track(self, tag, fn, *args, **kw):
+        """Run fn as one operation named tag; the DB calls inside it add up."""
+        op = self.begin(tag)
+        if op is None:
+            return fn(*args, **kw)   # nested: part of the outer operation
+        error = None
+        try:
+            return fn(*args, **kw)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.end(op, error)
+
+    def add(self, phase, ms, rows=0, statements=0):
+        """Time spent in one phase of the current operation (or a one-off call outside any)."""
+        op = getattr(self._local, "op", None)
+        if op is None:
+            return self.track(caller_tag(), self.add, phase, ms, rows, statements)
+        op[phase + "_ms"] = round(op[phase + "_ms"] + ms, 3)
+        op["rows"] += rows
+        op["statements"] += statements
+
+    def add_render(self, tag, ms):
+        """Tk-thread time spent showing the newest result of tag."""
+        with self._lock:
+            op = self._latest.get(tag)
+            if op is not None:
+                op["render_ms"] = round(op["render_ms"] + ms, 3)
+
+    def _store(self, op):
+        with self._lock:
+            self.samples.append(op)
+            self._latest[op["tag"]] = op
+
+    def latest(self, tag):
+        """Copy of the newest finished operation named tag (or None)."""
+        with self._lock:
+            op = self._latest.get(tag)
+            return dict(op) if op is not None else None
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+            self._latest.clear()
+
+    # ---------- reporting ----------
+    def snapshot(self):
+        with self._lock:
+            return [dict(op) for op in self.samples]
+
+    def summary(self):
+        """{tag: {"count", "errors", "rows_avg", "rows_max", <phase>: {p50, p90, p99, max, sum}}}"""
+        by_tag = {}
+        for op in self.snapshot():
+            by_tag.setdefault(op["tag"], []).append(op)
+        out = {}
+        for tag, ops in sorted(by_tag.items()):
+            rows = [op["rows"] for op in ops]
+            entry = {"count": len(ops), "errors": sum(1 for op in ops if op["error"]),
+                     "rows_avg": round(sum(rows) / len(rows), 1), "rows_max": max(rows)}
+            for phase in PHASES:
+                values = sorted(op[phase + "_ms"] for op in ops)
+                entry[phase] = {f"p{int(q * 100)}": round(percentile(values, q), 2) for q in QUANTILES}
+                entry[phase]["max"] = round(values[-1], 2)
+                entry[phase]["sum"] = round(sum(values), 3)
+            out[tag] = entry
+        return out
+
+    def prometheus_text(self):
+        lines = ["# HELP projecteval_db_op_ms Time per DB operation phase in milliseconds, by calling method.",
+                 "# TYPE projecteval_db_op_ms summary"]
+        summary = self.summary()
+        for tag, entry in summary.items():
+            label = tag.replace("\\", "\\\\").replace('"', '\\"')
+            for phase in PHASES:
+                for q in QUANTILES:
+                    lines.append(f'projecteval_db_op_ms{{op="{label}",phase="{phase}",quantile="{q}"}} '
+                                 f'{entry[phase][f"p{int(q * 100)}"]}')
+                lines.append(f'projecteval_db_op_ms_sum{{op="{label}",phase="{phase}"}} {entry[phase]["sum"]}')
+                lines.append(f'projecteval_db_op_ms_count{{op="{label}",phase="{phase}"}} {entry["count"]}')
+        lines += ["# HELP projecteval_db_op_errors_total Failed DB operations, by calling method.",
+                  "# TYPE projecteval_db_op_errors_total counter"]
+        for tag, entry in summary.items():
+            label = tag.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'projecteval_db_op_errors_total{{op="{label}"}} {entry["errors"]}')
+        lines += ["# HELP projecteval_db_rows_max Most rows fetched by one operation, by calling method.",
+                  "# TYPE projecteval_db_rows_max gauge"]
+        for tag, entry in summary.items():
+            label = tag.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'projecteval_db_rows_max{{op="{label}"}} {entry["rows_max"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, path):
+        ops = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op) + "\n")
+        return len(ops)
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+
+
+class TimedConnection:
+    """Pooled connection whose close() ends the operation begun at checkout."""
+
+    def __init__(self, conn, metrics, op):
+        self._conn = conn
+        self._metrics = metrics
+        self._op = op
+
+    def close(self):
+        try:
+            self._conn.close()
+        finally:
+            if self._op is not None:
+                self._metrics.end(self._op)
+                self._op = None
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class TimedCursor:
+    """DB-API cursor wrapper that reports execute / fetch time and row counts."""
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def execute(self, *args, **kw):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(*args, **kw)
+        finally:
+            self._metrics.add("execute", (time.perf_counter() - started) * 1000, statements=1)
+
+    def executemany(self, *args, **kw):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(*args, **kw)
+        finally:
+            self._metrics.add("execute", (time.perf_counter() - started) * 1000, statements=1)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._metrics.add("fetch", (time.perf_counter() - started) * 1000, rows=int(row is not None))
+        return row
+
+    def fetchmany(self, *args, **kw):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kw)
+        self._metrics.add("fetch", (time.perf_counter() - started) * 1000, rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._metrics.add("fetch", (time.perf_counter() - started) * 1000, rows=len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+METRICS = Metrics()
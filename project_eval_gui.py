@@ -1,27 +1,31 @@
 # ==============================
 # STANDARD IMPORTS
 # ==============================
-import tkinter as tk
-from tkinter import ttk, messagebox
-import mysql.connector
-
-
-# ==============================
-# DATABASE CONFIG
-# ==============================
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': 'kavya@0108',
-    'database': 'project_eval'
-}
-
+import time
+APP_STARTED = time.perf_counter()   # before the other imports: startup timing includes them
 
-# Small helper: open connection + cursor
-def get_conn_cursor():
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    return conn, cursor
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+import services
+from services import DB_POOL, get_conn_cursor
+from db_worker import DbWorker
+from paged_tree import PagedTree, bind_heading_sort, show_sort
+from bulk_import import import_file, format_stats
+from export_data import export_query, export_rows
+import grading
+import recalc
+import migrations
+from startup_timing import StartupTimer
+from perf_metrics import METRICS
+from staged_edits import EditBatch, format_result as format_batch_result
+import analytics
+import rankings
+import sorting
+import write_queue
+from change_feed import ChangeFeed, TRACKED
+
+# DB_CONFIG and the connection pool live in services.py (shared with projecteval_cli.py)
 
 
 # Small helper: run a statement safely and show errors in GUI
@@ -44,48 +48,540 @@ def exec_sql(sql, params=None, success_msg="Done"):
 # MAIN APPLICATION (TABS ARE ORDERED TO MATCH THE RUBRIC FLOW)
 # ============================================================
 class ProjectEvalApp(tk.Tk):
+    # (tab title, builder); tabs are built on first open, not at startup
+    TABS = [
+        # ---- CRUD Tabs (Create / Read / Update / Delete) ----
+        ("Students", "init_students_tab"),
+        ("Teams", "init_teams_tab"),
+        ("Projects", "init_projects_tab"),
+        ("Marks", "init_marks_tab"),
+        ("Evaluations", "init_evaluations_tab"),
+        ("Grades", "init_grades_tab"),
+        # ---- Reports / Views ----
+        ("Reports (Views)", "init_reports_tab"),
+        ("Rankings", "init_rankings_tab"),
+        # ---- Queries (Nested, Join, Aggregate) ----
+        ("Queries", "init_queries_tab"),
+        # ---- Users (Create/Grant/List/Delete) ----
+        ("User Creation", "init_user_tab"),
+        # ---- DB Tools (Triggers + Procedures + Views creation) ----
+        ("DB Tools (Triggers/Procedures/Views)", "init_dbtools_tab"),
+        # ---- Performance (per-operation DB / render timings) ----
+        ("Performance", "init_performance_tab"),
+    ]
+
     def __init__(self):
+        self.startup = StartupTimer(APP_STARTED)
+        self.startup.mark("imports done")
         super().__init__()
-        self.title("ProjectEval Management System")
+        self.title(f"ProjectEval Management System — {services.backend_label()}")
         self.geometry("1350x820")
 
+        # ---- Background DB worker + busy indicator ----
+        self._render_tokens = {}
+        self._tree_sort = {}   # tree path -> sort order, for trees made sortable
+        self._tree_rows = {}   # tree path -> (rows as loaded, width): what a heading click re-sorts
+        self.init_status_bar()
+        self.worker = DbWorker(workers=3, metrics=METRICS)
+        self.worker.attach(self, on_busy=self.on_busy,
+                           on_callback_error=lambda e: self.show_db_error(e, "Showing the result failed: "))
+        self.update_queue_status()
+        self.after(self.SYNC_INTERVAL_MS, self._sync_tick)
+        # Rows changed by other clients (change_log, migration 4) are patched into open tabs
+        self.changes = ChangeFeed()
+        self._changes_delay = self.CHANGES_MIN_MS
+        self.after(self.CHANGES_MIN_MS, self._changes_tick)
+
+        # Marks pages by MarkID once the schema migration added it; looked up in the
+        # background (init_marks_tab asks directly if it is opened before this returns)
+        self.marks_keyed = None
+        self._marks_tab_waiting = None   # Marks tab opened before the lookup returned
+        self.run_db("schema_keys", lambda: migrations.use_schema_keys(get_conn_cursor), self._schema_keys_done)
+
         self.tabs = ttk.Notebook(self)
         self.tabs.pack(expand=1, fill="both")
+        self.tabs.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self._unbuilt_tabs = {}   # frame path -> (title, builder)
+        for title, builder in self.TABS:
+            frame = ttk.Frame(self.tabs)
+            self.tabs.add(frame, text=title)
+            self._unbuilt_tabs[str(frame)] = (title, builder)
+        self.on_tab_changed()     # first tab (the event may have fired before the bind)
+
+        self.startup.mark("window built")
+        self.after_idle(self._first_paint)
+
+    def _first_paint(self):
+        self.startup.mark("first paint")
+        if not self.worker.busy:   # first tab's data was already there
+            self._startup_done()
+
+    def _startup_done(self):
+        self.startup.mark("first tab data loaded")
+        self.startup.log()
+
+    def on_tab_changed(self, event=None):
+        """Build a tab (and run its initial load) the first time it is selected."""
+        frame = self.tabs.select()
+        if frame not in self._unbuilt_tabs:
+            return
+        title, builder = self._unbuilt_tabs.pop(frame)
+        started = time.perf_counter()
+        getattr(self, builder)(self.nametowidget(frame))
+        self.startup.tab_built(title, (time.perf_counter() - started) * 1000)
 
-        # ---- CRUD Tabs (Create / Read / Update / Delete) ----
-        self.init_students_tab()     # Student CRUD
-        self.init_teams_tab()        # Team CRUD
-        self.init_projects_tab()     # Project CRUD
-        self.init_marks_tab()        # Marks CRUD
-        self.init_evaluations_tab()  # Evaluation CRUD
-        self.init_grades_tab()       # Grade CRUD
-
-        # ---- Reports / Views ----
-        self.init_reports_tab()
 
-        # ---- Queries (Nested, Join, Aggregate) ----
-        self.init_queries_tab()
-
-        # ---- Users (Create/Grant/List/Delete) ----
-        self.init_user_tab()
+    # ============================================================
+    # BACKGROUND DB HELPERS
+    #   DB work runs on DbWorker threads; results come back via after()
+    #   so the window keeps repainting while MySQL answers.
+    # ============================================================
+    def init_status_bar(self):
+        bar = ttk.Frame(self)
+        bar.pack(side="bottom", fill="x")
+        self.status_label = ttk.Label(bar, text="Ready")
+        self.status_label.pack(side="left", padx=8, pady=2)
+        self.busy_bar = ttk.Progressbar(bar, mode="indeterminate", length=140)
+        self.busy_bar.pack(side="right", padx=8, pady=2)
+        # Offline write queue (see write_queue.py)
+        ttk.Button(bar, text="Review Queue…", command=self.open_write_queue).pack(side="right", padx=2)
+        ttk.Button(bar, text="Sync Now", command=self.sync_write_queue).pack(side="right", padx=2)
+        self.queue_writes = tk.BooleanVar(value=False)
+        self._auto_offline = False   # switched on by a connection error, off again by a clean sync
+        ttk.Checkbutton(bar, text="Queue writes (offline)", variable=self.queue_writes).pack(side="right", padx=6)
+        self.queue_label = ttk.Label(bar, text="")
+        self.queue_label.pack(side="right", padx=8)
+
+    def on_busy(self, count):
+        if count:
+            self.status_label.config(text=f"Working… ({count} DB request{'s' if count > 1 else ''})")
+            self.busy_bar.start(15)
+        else:
+            self.status_label.config(text="Ready")
+            self.busy_bar.stop()
+            if not self.startup.reported and self.startup.has("first paint"):
+                self._startup_done()
+
+    def show_db_error(self, e, prefix=""):
+        if e is not None:
+            messagebox.showerror("Error", f"{prefix}{e}")
+
+    def run_db(self, key, work, on_done=None, error_prefix=""):
+        """Run work() in the background. Same key = newer request supersedes older."""
+        self.worker.submit(key, work, on_done, lambda e: self.show_db_error(e, error_prefix))
+
+    def write_db(self, work, ok_msg, refresh=None, ok_title="OK", error_prefix=""):
+        """Run a write in the background, report it, then refresh (like the old finally: blocks)."""
+        def on_done(_):
+            messagebox.showinfo(ok_title, ok_msg)
+            if refresh:
+                refresh()
+
+        def on_error(e):
+            messagebox.showerror("Error", f"{error_prefix}{e}")
+            if refresh:
+                refresh()
+        self.worker.submit(None, work, on_done, on_error)
+
+    def load_tree(self, key, tree, work, width=None, empty_msg=None, error_prefix="", on_loaded=None):
+        """Run a services read ((columns, rows, ...)) in the background and render the rows into tree."""
+        def on_done(result):
+            rows = result[1]
+            self.fill_tree(tree, rows, width)
+            if on_loaded:
+                on_loaded(result)
+            if not rows and empty_msg:
+                messagebox.showinfo("Info", empty_msg)
+        self.run_db(key, work, on_done, error_prefix)
+
+    SORT_ON_WORKER = 50000   # heading clicks on bigger results sort on the DB worker, off the Tk thread
+
+    def fill_tree(self, tree, rows, width=None, chunk=500, ordered=False):
+        """Insert rows a chunk per event-loop tick so big results don't stall repaints.
+
+        Sortable trees keep the rows and show them in the heading order (ordered=True: already sorted)."""
+        name = str(tree)
+        if name in self._tree_sort and not ordered:
+            self._tree_rows[name] = (rows, width)
+            rows = self._sorted(tree, rows)
+        tree.delete(*tree.get_children())
+        token = object()
+        self._render_tokens[str(tree)] = token   # a newer fill of the same tree cancels this one
+        tag = METRICS.render_tag   # the first chunk is timed with the callback by DbWorker
+
+        def step(start):
+            if self._render_tokens.get(str(tree)) is not token:
+                return
+            started = time.perf_counter()
+            for row in rows[start:start + chunk]:
+                if width:
+                    row = tuple(row) + ("",) * (width - len(row))
+                tree.insert('', tk.END, values=row)
+            if start + chunk < len(rows):
+                self.after(1, step, start + chunk)
+            if start and tag:
+                METRICS.add_render(tag, (time.perf_counter() - started) * 1000)
+        step(0)
+
+    def make_sortable(self, tree):
+        """Heading clicks sort the rows last filled into tree (as fetched, so numbers and dates sort by value)."""
+        self._tree_sort[str(tree)] = []
+        bind_heading_sort(tree, lambda column, add: self.sort_tree(tree, column, add))
+
+    def _sorted(self, tree, rows):
+        order = self._tree_sort[str(tree)]
+        return sorting.sort_rows(rows, sorting.by_index(order, tree["columns"])) if order else rows
+
+    def sort_tree(self, tree, column, add=False):
+        name = str(tree)
+        self._tree_sort[name] = sorting.next_order(self._tree_sort[name], column, add)
+        show_sort(tree, self._tree_sort[name])
+        if name not in self._tree_rows:
+            return
+        rows, width = self._tree_rows[name]
+        if len(rows) <= self.SORT_ON_WORKER:
+            self.fill_tree(tree, self._sorted(tree, rows), width, ordered=True)
+            return
+        order = sorting.by_index(self._tree_sort[name], tree["columns"])   # Tk is read on this thread only
+
+        def done(ordered):
+            if self._tree_rows.get(name, (None,))[0] is rows:   # not refilled meanwhile
+                self.fill_tree(tree, ordered, width, ordered=True)
+        self.run_db(f"sort:{name}", lambda: sorting.sort_rows(rows, order) if order else rows, done)
+
+    def write_row(self, paged, work, ok_msg, match_cols, match_vals, delta=0, cascade=(), queue=None):
+        """Run a services.*_<entity> write, then patch only the affected rows of the paged tree.
+
+        delta is +1 for INSERT, -1 for DELETE, 0 for UPDATE. If the new row count
+        doesn't match what this write explains, somebody else changed the table
+        and the tab is reloaded instead (as it is while a filter is active). cascade = pager
+        attributes of other tabs whose rows the write can change through ON DELETE
+        CASCADE / SET NULL (tabs not opened yet are skipped). queue = (entity, action, values):
+        the write goes to the offline queue instead while "Queue writes" is on, and when
+        the database turns out to be unreachable.
+        """
+        if queue and self.queue_writes.get():
+            self.queue_write(paged, *queue)
+            return
 
-        # ---- DB Tools (Triggers + Procedures + Views creation) ----
-        self.init_dbtools_tab()
+        def on_done(result):
+            affected, rows, total, is_estimate = result
+            messagebox.showinfo("OK", ok_msg)
+            pager = paged.pager
+            exact = pager.total is not None and not pager.total_is_estimate and not is_estimate
+            if pager.where:
+                # total is the whole table's and the row may not match the filter
+                paged.reload()
+            elif exact and total != pager.total + delta * affected:
+                paged.reload()
+            else:
+                paged.patch(match_cols, match_vals, rows, total, is_estimate)
+            for name in cascade:
+                other = getattr(self, name, None)   # None: tab not opened yet, it loads fresh later
+                if other is not None:
+                    other.reload_if_loaded()
+
+        def on_error(e):
+            if queue and write_queue.is_connection_error(e):
+                self._auto_offline = True
+                self.queue_writes.set(True)
+                self.queue_write(paged, *queue, reason=f"Database unreachable: {e}\n\n")
+            else:
+                self.show_db_error(e)
+        self.worker.submit(None, work, on_done, on_error)
+
+    # ---------- Offline write queue ----------
+    SYNC_INTERVAL_MS = 15000
+    PAGERS = {"Student": "stud_pager", "Team": "team_pager", "Project": "project_pager",
+              "Marks": "marks_pager", "Evaluation": "eval_pager", "Grade": "grade_pager"}
+
+    def queue_write(self, paged, entity, action, values, reason=""):
+        try:
+            write_queue.QUEUE.enqueue(entity, action, values, self.shown_row(paged, entity, action, values))
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not queue the change: {e}")
+            return
+        self.update_queue_status()
+        messagebox.showinfo("Queued", f"{reason}Saved to the offline queue; it is sent to the database "
+                                      f"in the background once it can be reached.")
+
+    def shown_row(self, paged, entity, action, values):
+        """The row with this key as loaded in the tab ({column: value}), for conflict checks."""
+        if paged is None:
+            return None
+        columns = paged.pager.columns
+        key_col = write_queue.key_column(entity, values)
+        if key_col not in columns:
+            return None
+        i, key = columns.index(key_col), write_queue.key_of(entity, action, values)
+        for page in paged.pager.pages:
+            for row in page:
+                if str(row[i]).strip() == key:
+                    return dict(zip(columns, row))
+        return None
+
+    def update_queue_status(self):
+        counts = write_queue.QUEUE.counts()
+        problems = counts["failed"] + counts["conflict"]
+        self.queue_label.config(text=f"Queued writes: {write_queue.format_counts(counts)}" if any(counts.values())
+                                else "", foreground="red" if problems else "")
+        return counts
+
+    def _sync_tick(self):
+        # Background replay while writes are waiting
+        if self.update_queue_status()["pending"]:
+            self.sync_write_queue(quiet=True)
+        self.after(self.SYNC_INTERVAL_MS, self._sync_tick)
+
+    def sync_write_queue(self, quiet=False):
+        def done(result):
+            if self._auto_offline and result["offline"] is None:
+                self._auto_offline = False
+                self.queue_writes.set(False)
+            reload = set(result["tables"])
+            for table in result["tables"]:
+                reload |= services.WRITE_CASCADES.get(table, set())
+            for table in reload:
+                other = getattr(self, self.PAGERS.get(table, ""), None)
+                if other is not None:
+                    other.reload_if_loaded()
+            self.update_queue_status()
+            if not quiet:
+                messagebox.showinfo("Offline Queue", write_queue.format_replay(result))
+
+        def failed(e):
+            self.update_queue_status()
+            if not quiet:
+                self.show_db_error(e, "Sync failed: ")
+        self.worker.submit("write_queue_sync", write_queue.replay, done, failed)
+
+    def open_write_queue(self):
+        """Queued writes with their status; failed / conflicting ones can be retried or discarded."""
+        win = tk.Toplevel(self)
+        win.title("Offline Write Queue")
+        columns = ["ID", "Status", "Action", "Entity", "Key", "Values", "Error", "Attempts", "Queued At"]
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=16, selectmode="extended")
+        for c in columns:
+            tree.heading(c, text=c)
+            tree.column(c, width={"Values": 260, "Error": 300}.get(c, 80))
+        tree.tag_configure("conflict", background="#ffd6d6")
+        tree.tag_configure("failed", background="#ffe8c2")
+        tree.grid(row=0, column=0, columnspan=5, sticky="nsew", padx=8, pady=8)
+        win.rowconfigure(0, weight=1)
+        win.columnconfigure(4, weight=1)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for e in write_queue.QUEUE.entries():
+                tree.insert("", tk.END, iid=str(e["id"]), tags=(e["status"],), values=(
+                    e["id"], e["status"], e["action"], e["entity"], e["key"], e["values"], e["error"] or "",
+                    e["attempts"], e["queued_at"]))
+            self.update_queue_status()
+
+        def act(fn):
+            fn(tree.selection() or None)
+            refresh()
+
+        ttk.Button(win, text="Retry Selected / All", command=lambda: act(write_queue.QUEUE.retry)).grid(row=1, column=0, padx=6, pady=6, sticky="ew")
+        ttk.Button(win, text="Discard Selected / Failed", command=lambda: act(write_queue.QUEUE.discard)).grid(row=1, column=1, padx=6, pady=6, sticky="ew")
+        ttk.Button(win, text="Sync Now", command=self.sync_write_queue).grid(row=1, column=2, padx=6, pady=6, sticky="ew")
+        ttk.Button(win, text="Refresh", command=refresh).grid(row=1, column=3, padx=6, pady=6, sticky="ew")
+        refresh()
+
+    # ---------- Changes made by other clients (see change_feed.py) ----------
+    CHANGES_MIN_MS = 2000     # poll interval right after a change ...
+    CHANGES_MAX_MS = 30000    # ... doubling while nothing changes (and after errors)
+    CHANGES_PATCH_MAX = 200   # more changed keys than this in one table: reload the tab
+
+    def _changes_tick(self):
+        # Open tabs without a filter get their changed rows patched in; filtered ones reload
+        patchable = {}
+        for table, name in self.PAGERS.items():
+            paged = getattr(self, name, None)
+            if paged is not None and paged.pager.total is not None and not paged.pager.where:
+                patchable[table] = paged
+
+        def work():
+            delta = self.changes.poll()
+            fresh = {t: services.fetch_by_keys(t, TRACKED[t], keys) for t, keys in delta["tables"].items()
+                     if t in patchable and t not in delta["reload"] and len(keys) <= self.CHANGES_PATCH_MAX}
+            return delta, fresh
+
+        def done(result):
+            delta, fresh = result
+            self.apply_changes(delta, fresh)
+            self._changes_delay = (0 if delta["more"] else self.CHANGES_MIN_MS) if delta["rows"] \
+                else min(self._changes_delay * 2, self.CHANGES_MAX_MS)
+            self.after(self._changes_delay, self._changes_tick)
+
+        def failed(e):
+            # Server down or change_log not created yet (migration 4): keep trying, slowly
+            self._changes_delay = self.CHANGES_MAX_MS
+            self.after(self._changes_delay, self._changes_tick)
+        self.worker.submit("changes_poll", work, done, failed)
+
+    def apply_changes(self, delta, fresh):
+        for table in set(delta["tables"]) | delta["reload"]:
+            paged = getattr(self, self.PAGERS.get(table, ""), None)
+            if paged is None or paged.pager.total is None:
+                continue   # not opened yet: loads fresh when it is
+            if table not in fresh:
+                paged.reload()
+                continue
+            rows, total, is_estimate = fresh[table]
+            key_col = TRACKED[table]
+            i = paged.pager.columns.index(key_col)
+            by_key = {}
+            for row in rows:
+                by_key.setdefault(str(row[i]), []).append(row)
+            own_key = paged.pager.key_cols
+            for key in delta["tables"][table]:
+                if not own_key or own_key == [key_col]:
+                    paged.patch([key_col], [key], by_key.get(key, []), total, is_estimate)
+                    continue
+                # Keyed by something else (Marks by MarkID): drop the old rows, then put
+                # each fresh one at its own position, not all where the first one goes
+                paged.patch([key_col], [key], [], total, is_estimate)
+                for row in by_key.get(key, []):
+                    paged.patch(own_key, [row[j] for j in paged.pager.key_idx], [row], total, is_estimate)
+
+    def make_batch_bar(self, tab, entity, paged, fields):
+        """Batch edit bar under a paged tree: stage edits on many selected rows, then Save
+        them in one transaction (services.apply_batch) with one result dialog."""
+        batch = EditBatch(entity)
+        tree = paged.tree
+        tree.configure(selectmode="extended")
+        tree.tag_configure("staged_update", background="#fff2b3")
+        tree.tag_configure("staged_delete", background="#f5c6c6")
+        key_cols = services.ENTITIES[entity]["key"]
+
+        bar = ttk.Frame(tab)
+        bar.grid(row=14, column=3, sticky="w", padx=10, pady=(0, 6))
+        status = ttk.Label(bar, text="")
+
+        def refresh():
+            status.config(text=batch.summary() if len(batch) else "Batch edit: nothing staged")
+
+        def stage_add():
+            batch.insert([e.get() for e in fields.values()])
+            refresh()
+
+        def stage_update():
+            picked = paged.selected_rows()
+            if not picked:
+                # No selection: the whole form is the new row, like Update
+                if not batch.update([e.get() for e in fields.values()]) and batch.key_idx[0] >= len(fields):
+                    messagebox.showinfo("Batch edit", "Select the rows to change in the table "
+                                                      f"(they are matched by {', '.join(services.batch_key(entity))}).")
+                return refresh()
+            changes = {c: e.get() for c, e in fields.items() if e.get().strip() and c not in key_cols}
+            if not changes:
+                messagebox.showinfo("Batch edit", "Fill in the fields to change on the selected rows "
+                                                  f"({', '.join(key_cols)} is not changed).")
+                return
+            for iid, row in picked:
+                new = list(row)
+                for c, v in changes.items():
+                    new[paged.pager.columns.index(c)] = v
+                if batch.update(new):
+                    tree.item(iid, values=new, tags=("staged_update",))
+            refresh()
+
+        def stage_delete():
+            for iid, row in paged.selected_rows():
+                batch.delete(list(row))
+                tree.item(iid, tags=("staged_delete",))
+            refresh()
+
+        def save():
+            if not len(batch):
+                return
+
+            def done(result):
+                batch.clear()
+                refresh()
+                messagebox.showinfo("Batch saved", format_batch_result(result))
+                paged.reload()
+
+            def failed(e):
+                # Staged edits are kept so the bad row can be fixed and saved again
+                messagebox.showerror("Batch not saved", str(e))
+            self.worker.submit(None, batch.save, done, failed)
+
+        def discard():
+            batch.clear()
+            refresh()
+            paged.reload()
+
+        ttk.Label(bar, text="Batch:").pack(side="left", padx=(0, 4))
+        ttk.Button(bar, text="Stage Add", command=stage_add).pack(side="left", padx=2)
+        ttk.Button(bar, text="Stage Update (selected ← form)", command=stage_update).pack(side="left", padx=2)
+        ttk.Button(bar, text="Stage Delete (selected)", command=stage_delete).pack(side="left", padx=2)
+        ttk.Button(bar, text="Save", command=save).pack(side="left", padx=(10, 2))
+        ttk.Button(bar, text="Discard", command=discard).pack(side="left", padx=2)
+        status.pack(side="left", padx=10)
+        refresh()
+        return batch
+
+    def bulk_import(self, table, paged):
+        """Stream a CSV/Excel file into table on the worker, with live progress in the status bar."""
+        path = filedialog.askopenfilename(
+            title=f"Bulk import into {table}",
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")])
+        if not path:
+            return
+        self.import_progress = {}
+
+        def work():
+            # on_progress runs on the worker: only store the numbers, Tk reads them in poll()
+            return services.write_through([table], import_file, path, table, get_conn_cursor,
+                                          on_progress=lambda st: setattr(self, "import_progress", st))
+
+        def done(stats):
+            self.import_progress = None
+            messagebox.showinfo("Import finished", format_stats(stats))
+            paged.reload()
+
+        def failed(e):
+            self.import_progress = None
+            self.show_db_error(e, "Import failed: ")
+            paged.reload()
+
+        def poll():
+            st = self.import_progress
+            if st is None:
+                return
+            if st:
+                self.status_label.config(
+                    text=f"Importing {table}: {st['fraction']:.0%} — {st['read']:,} rows read, "
+                         f"{st['inserted']:,} inserted, {st['rejected']:,} rejected "
+                         f"({st['rows_per_sec']:,.0f} rows/s)")
+            self.after(200, poll)
+
+        self.worker.submit(f"import:{table}", work, done, failed)
+        self.after(200, poll)
+
+    def make_pager(self, tab, tree, table, columns):
+        """Paged (keyset) loading for an entity tree gridded at row 0 / column 3."""
+        pager = PagedTree(self, tab, tree, table, columns,
+                          lambda sql, params: services.fetch_page(table, sql, params),
+                          lambda sql, params, where, where_params:
+                              services.fetch_first_page(table, sql, params, where, where_params))
+        pager.grid(row=0, column=3, rowspan=12)
+        return pager
 
 
     # ============================================================
     # [RUBRIC] STUDENTS — CREATE / READ / UPDATE / DELETE (WITH GUI)
     # ============================================================
-    def init_students_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Students")
-
+    def init_students_tab(self, tab):
         columns = ["StudentID","Dept","Year","Fname","Lname","Age","PhoneNo"]
         self.stud_tree = ttk.Treeview(tab, columns=columns, show='headings', height=18)
         for c in columns:
             self.stud_tree.heading(c, text=c)
             self.stud_tree.column(c, width=110, anchor="center")
         self.stud_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.stud_pager = self.make_pager(tab, self.stud_tree, "Student", columns)
 
         self.student_fields = {c: tk.Entry(tab, width=18) for c in columns}
         for i, c in enumerate(columns):
@@ -96,82 +592,44 @@ class ProjectEvalApp(tk.Tk):
         tk.Button(tab, text="Show All (Read)",command=self.show_students).grid(row=7, column=1, pady=6, sticky="ew")
         tk.Button(tab, text="Update",         command=self.update_student).grid(row=8, column=0, pady=6, sticky="ew")
         tk.Button(tab, text="Delete",         command=self.delete_student).grid(row=8, column=1, pady=6, sticky="ew")
+        tk.Button(tab, text="Bulk Import CSV/Excel", command=lambda: self.bulk_import("Student", self.stud_pager)).grid(row=9, column=0, columnspan=2, pady=6, sticky="ew")
+
+        self.make_batch_bar(tab, "student", self.stud_pager, self.student_fields)
 
         self.show_students()
 
     def add_student(self):
         vals = [self.student_fields[c].get() for c in self.student_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("INSERT INTO Student VALUES (%s,%s,%s,%s,%s,%s,%s)", vals)
-            conn.commit()
-            messagebox.showinfo("OK", "Student added")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_students()
-            try: conn.close()
-            except: pass
+        self.write_row(self.stud_pager, lambda: services.add_student(vals),
+                       "Student added", ["StudentID"], [vals[0]], delta=1, queue=("student", "add", vals))
 
     def update_student(self):
         vals = [self.student_fields[c].get() for c in self.student_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Student 
-                SET Dept=%s, Year=%s, Fname=%s, Lname=%s, Age=%s, PhoneNo=%s 
-                WHERE StudentID=%s
-            """, (vals[1], vals[2], vals[3], vals[4], vals[5], vals[6], vals[0]))
-            conn.commit()
-            messagebox.showinfo("OK", "Student updated")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_students()
-            try: conn.close()
-            except: pass
+        self.write_row(self.stud_pager, lambda: services.update_student(vals),
+                       "Student updated", ["StudentID"], [vals[0]], queue=("student", "update", vals))
 
     def delete_student(self):
         sid = self.student_fields["StudentID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Student WHERE StudentID=%s", (sid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Student deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_students()
-            try: conn.close()
-            except: pass
+        # Team.StudentID is ON DELETE SET NULL
+        self.write_row(self.stud_pager, lambda: services.delete_student(sid),
+                       "Student deleted", ["StudentID"], [sid], delta=-1, cascade=["team_pager"],
+                       queue=("student", "delete", sid))
 
     def show_students(self):
-        self.stud_tree.delete(*self.stud_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Student")
-            for row in cursor.fetchall():
-                self.stud_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.stud_pager.reload()
 
 
     # ============================================================
     # [RUBRIC] TEAMS — CRUD (WITH GUI)
     # ============================================================
-    def init_teams_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Teams")
-
+    def init_teams_tab(self, tab):
         columns=["TeamID","TeamName","Members","StudentID"]
         self.team_tree = ttk.Treeview(tab, columns=columns, show='headings', height=18)
         for c in columns:
             self.team_tree.heading(c, text=c)
             self.team_tree.column(c, width=120, anchor="center")
         self.team_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.team_pager = self.make_pager(tab, self.team_tree, "Team", columns)
 
         self.team_fields = {c: tk.Entry(tab, width=18) for c in columns}
         for i, c in enumerate(columns):
@@ -183,74 +641,35 @@ class ProjectEvalApp(tk.Tk):
         tk.Button(tab, text="Update", command=self.update_team).grid(row=7, column=0, pady=6, sticky="ew")
         tk.Button(tab, text="Delete", command=self.delete_team).grid(row=7, column=1, pady=6, sticky="ew")
 
+        self.make_batch_bar(tab, "team", self.team_pager, self.team_fields)
+
         self.show_teams()
 
     def add_team(self):
         vals = [self.team_fields[c].get() for c in self.team_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("INSERT INTO Team VALUES (%s,%s,%s,%s)", vals)
-            conn.commit()
-            messagebox.showinfo("OK", "Team added")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_teams()
-            try: conn.close()
-            except: pass
+        self.write_row(self.team_pager, lambda: services.add_team(vals),
+                       "Team added", ["TeamID"], [vals[0]], delta=1, queue=("team", "add", vals))
 
     def update_team(self):
         v = [self.team_fields[c].get() for c in self.team_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Team SET TeamName=%s, Members=%s, StudentID=%s 
-                WHERE TeamID=%s
-            """, (v[1], v[2], v[3], v[0]))
-            conn.commit()
-            messagebox.showinfo("OK", "Team updated")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_teams()
-            try: conn.close()
-            except: pass
+        self.write_row(self.team_pager, lambda: services.update_team(v),
+                       "Team updated", ["TeamID"], [v[0]], queue=("team", "update", v))
 
     def delete_team(self):
         tid = self.team_fields["TeamID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Team WHERE TeamID=%s", (tid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Team deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_teams()
-            try: conn.close()
-            except: pass
+        # Project (and through it Grade) is ON DELETE CASCADE
+        self.write_row(self.team_pager, lambda: services.delete_team(tid),
+                       "Team deleted", ["TeamID"], [tid], delta=-1,
+                       cascade=["project_pager", "grade_pager"], queue=("team", "delete", tid))
 
     def show_teams(self):
-        self.team_tree.delete(*self.team_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Team")
-            for row in cursor.fetchall():
-                self.team_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.team_pager.reload()
 
 
     # ============================================================
     # [RUBRIC] PROJECTS — CRUD (WITH GUI)
     # ============================================================
-    def init_projects_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Projects")
-
+    def init_projects_tab(self, tab):
         columns=["ProjectID","Title","Domain","Technology","Duration","TeamID"]
         self.project_tree = ttk.Treeview(tab, columns=columns, show='headings', height=18)
 
@@ -258,6 +677,7 @@ class ProjectEvalApp(tk.Tk):
             self.project_tree.heading(c, text=c)
             self.project_tree.column(c, width=140 if c in ("Title","Technology") else 110, anchor="center")
         self.project_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.project_pager = self.make_pager(tab, self.project_tree, "Project", columns)
 
         self.project_fields = {c: tk.Entry(tab, width=18) for c in columns}
         for i, c in enumerate(columns):
@@ -269,85 +689,60 @@ class ProjectEvalApp(tk.Tk):
         tk.Button(tab, text="Update", command=self.update_project).grid(row=8, column=0, pady=6, sticky="ew")
         tk.Button(tab, text="Delete", command=self.delete_project).grid(row=8, column=1, pady=6, sticky="ew")
 
+        self.make_batch_bar(tab, "project", self.project_pager, self.project_fields)
+
         self.show_projects()
 
     def add_project(self):
         vals = [self.project_fields[c].get() for c in self.project_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("INSERT INTO Project VALUES (%s,%s,%s,%s,%s,%s)", vals)
-            conn.commit()
-            messagebox.showinfo("OK", "Project added")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_projects()
-            try: conn.close()
-            except: pass
+        self.write_row(self.project_pager, lambda: services.add_project(vals),
+                       "Project added", ["ProjectID"], [vals[0]], delta=1, queue=("project", "add", vals))
 
     def update_project(self):
         v = [self.project_fields[c].get() for c in self.project_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Project 
-                SET Title=%s, Domain=%s, Technology=%s, Duration=%s, TeamID=%s
-                WHERE ProjectID=%s
-            """, (v[1], v[2], v[3], v[4], v[5], v[0]))
-            conn.commit()
-            messagebox.showinfo("OK", "Project updated")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_projects()
-            try: conn.close()
-            except: pass
+        self.write_row(self.project_pager, lambda: services.update_project(v),
+                       "Project updated", ["ProjectID"], [v[0]], queue=("project", "update", v))
 
     def delete_project(self):
         pid = self.project_fields["ProjectID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Project WHERE ProjectID=%s", (pid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Project deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_projects()
-            try: conn.close()
-            except: pass
+        # Grade is ON DELETE CASCADE
+        self.write_row(self.project_pager, lambda: services.delete_project(pid),
+                       "Project deleted", ["ProjectID"], [pid], delta=-1, cascade=["grade_pager"],
+                       queue=("project", "delete", pid))
 
     def show_projects(self):
-        self.project_tree.delete(*self.project_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Project")
-            for row in cursor.fetchall():
-                self.project_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.project_pager.reload()
 
 
     # ============================================================
     # [RUBRIC] MARKS — CRUD (WITH GUI)
     #   + uses Trigger/Procedure (from DB Tools tab) to keep Percentage in sync
     # ============================================================
-    def init_marks_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Marks")
-
-        columns=["MarksObtained","MaxMarks","Percentage","EvaluationID"]
+    def _schema_keys_done(self, keyed):
+        self.marks_keyed = keyed
+        tab, self._marks_tab_waiting = self._marks_tab_waiting, None
+        if tab is not None:
+            for child in tab.winfo_children():
+                child.destroy()
+            self.init_marks_tab(tab)
+
+    def init_marks_tab(self, tab):
+        if self.marks_keyed is None:
+            # Opened before the background key lookup returned: built (and loaded) when it does
+            self._marks_tab_waiting = tab
+            tk.Label(tab, text="Loading…").grid(row=0, column=0, padx=10, pady=10)
+            return
+        form_columns = ["MarksObtained","MaxMarks","Percentage","EvaluationID"]
+        columns = form_columns + (["MarkID"] if self.marks_keyed else [])
         self.marks_tree = ttk.Treeview(tab, columns=columns, show="headings", height=18)
         for c in columns:
             self.marks_tree.heading(c, text=c)
             self.marks_tree.column(c, width=130, anchor="center")
         self.marks_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.marks_pager = self.make_pager(tab, self.marks_tree, "Marks", columns)
 
-        self.marks_fields = {c: tk.Entry(tab, width=18) for c in columns}
-        for i, c in enumerate(columns):
+        self.marks_fields = {c: tk.Entry(tab, width=18) for c in form_columns}
+        for i, c in enumerate(form_columns):
             tk.Label(tab, text=c).grid(row=i, column=0, sticky="w", padx=6, pady=4)
             self.marks_fields[c].grid(row=i, column=1, padx=6, pady=4)
 
@@ -358,68 +753,54 @@ class ProjectEvalApp(tk.Tk):
 
         # Optional: call stored procedure to recompute a single EvaluationID
         tk.Button(tab, text="Recalculate % (CALL proc)", command=self.recalc_percentage_for_eid).grid(row=8, column=0, columnspan=2, pady=6, sticky="ew")
+        tk.Button(tab, text="Bulk Import CSV/Excel", command=lambda: self.bulk_import("Marks", self.marks_pager)).grid(row=9, column=0, columnspan=2, pady=6, sticky="ew")
+        tk.Button(tab, text="Bulk Recalculate % (all / range / dates)", command=self.open_bulk_recalc).grid(row=10, column=0, columnspan=2, pady=6, sticky="ew")
+
+        self.make_batch_bar(tab, "marks", self.marks_pager, self.marks_fields)
 
         self.show_marks()
 
     def add_marks(self):
         v = [self.marks_fields[c].get() for c in self.marks_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            # Percentage is NULL; trigger will compute it automatically IF created
-            cursor.execute("INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) VALUES (%s,%s,NULL,%s)", (v[0], v[1], v[3]))
-            conn.commit()
-            messagebox.showinfo("OK", "Marks added (Percentage auto via trigger if enabled)")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_marks()
-            try: conn.close()
-            except: pass
+        # Marks has no primary key, so rows are matched on EvaluationID.
+        self.write_row(self.marks_pager, lambda: services.add_marks(v),
+                       "Marks added (Percentage auto via trigger if enabled)", ["EvaluationID"], [v[3]], delta=1,
+                       queue=("marks", "add", v))
+
+    def picked_mark_id(self, eid):
+        """MarkID of the one selected Marks row if it belongs to EvaluationID eid, else None
+        (then Update / Delete apply to every row of the evaluation)."""
+        if not self.marks_keyed:
+            return None
+        picked = self.marks_pager.selected_rows()
+        columns = self.marks_pager.pager.columns
+        if len(picked) != 1 or str(picked[0][1][columns.index("EvaluationID")]).strip() != eid.strip():
+            return None
+        return picked[0][1][columns.index("MarkID")]
 
     def update_marks(self):
         v = [self.marks_fields[c].get() for c in self.marks_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Marks 
-                SET MarksObtained=%s, MaxMarks=%s, Percentage=NULL
-                WHERE EvaluationID=%s
-            """, (v[0], v[1], v[3]))
-            conn.commit()
-            messagebox.showinfo("OK", "Marks updated (Percentage will refresh via trigger on UPDATE if enabled)")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_marks()
-            try: conn.close()
-            except: pass
+        mark_id = self.picked_mark_id(v[3])
+        if mark_id is not None:
+            v.append(mark_id)
+        match = (["MarkID"], [mark_id]) if mark_id is not None else (["EvaluationID"], [v[3]])
+        self.write_row(self.marks_pager, lambda: services.update_marks(v),
+            "Marks updated (Percentage will refresh via trigger on UPDATE if enabled)", *match,
+            queue=("marks", "update", v))
 
     def delete_marks(self):
         eid = self.marks_fields["EvaluationID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Marks WHERE EvaluationID=%s", (eid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Marks deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_marks()
-            try: conn.close()
-            except: pass
+        mark_id = self.picked_mark_id(eid)
+        if mark_id is None:
+            self.write_row(self.marks_pager, lambda: services.delete_marks(eid),
+                           "Marks deleted", ["EvaluationID"], [eid], delta=-1, queue=("marks", "delete", eid))
+            return
+        row = [self.marks_fields[c].get() for c in self.marks_fields] + [mark_id]
+        self.write_row(self.marks_pager, lambda: services.delete_marks(eid, mark_id),
+                       "Marks deleted", ["MarkID"], [mark_id], delta=-1, queue=("marks", "delete", row))
 
     def show_marks(self):
-        self.marks_tree.delete(*self.marks_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Marks")
-            for row in cursor.fetchall():
-                self.marks_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.marks_pager.reload()
 
     def recalc_percentage_for_eid(self):
         """[RUBRIC] PROCEDURE CALL WITH GUI:
@@ -429,26 +810,81 @@ class ProjectEvalApp(tk.Tk):
         if not eid:
             messagebox.showerror("Error", "Enter EvaluationID to recalculate")
             return
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.callproc("sp_recalc_percentage", [int(eid)])
-            conn.commit()
-            messagebox.showinfo("OK", f"Recalculated Percentage for EvaluationID={eid}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Procedure call failed: {e}")
-        finally:
-            self.show_marks()
-            try: conn.close()
-            except: pass
+        self.write_db(lambda: services.recalc_percentage(eid),
+                      f"Recalculated Percentage for EvaluationID={eid}", self.show_marks,
+                      error_prefix="Procedure call failed: ")
+
+    def open_bulk_recalc(self):
+        """Recalculate Percentage for many evaluations in batches (resumable, stoppable)."""
+        win = tk.Toplevel(self)
+        win.title("Bulk Percentage Recalculation")
+        fields = {}
+        for i, (key, label) in enumerate([("first_id", "From EvaluationID"), ("last_id", "To EvaluationID"),
+                                          ("date_from", "EvalDate from (YYYY-MM-DD)"),
+                                          ("date_to", "EvalDate to (YYYY-MM-DD)")]):
+            tk.Label(win, text=label).grid(row=i, column=0, sticky="w", padx=6, pady=4)
+            fields[key] = tk.Entry(win, width=16)
+            fields[key].grid(row=i, column=1, padx=6, pady=4)
+        tk.Label(win, text="Leave everything blank for all evaluations").grid(row=4, column=0, columnspan=2, sticky="w", padx=6)
+
+        bar = ttk.Progressbar(win, mode="determinate", maximum=1.0, length=320)
+        bar.grid(row=5, column=0, columnspan=2, padx=6, pady=6)
+        info = tk.Label(win, text="", justify="left")
+        info.grid(row=6, column=0, columnspan=2, sticky="w", padx=6)
+        state = {"progress": None, "stop": False}
+
+        def start(resume=True):
+            try:
+                scope = recalc.scope_of(**{k: e.get().strip() for k, e in fields.items()})
+            except ValueError as e:
+                messagebox.showerror("Error", f"EvaluationID must be a number: {e}", parent=win)
+                return
+            state.update(progress={}, stop=False)
+
+            def work():
+                return services.write_through(["Marks"], recalc.recalc_percentages, get_conn_cursor, scope,
+                                              resume=resume, on_progress=lambda st: state.update(progress=st),
+                                              should_stop=lambda: state["stop"])
+
+            def done(stats):
+                state["progress"] = None
+                bar["value"] = stats["fraction"]
+                info.config(text=recalc.format_stats(stats))
+                self.marks_pager.reload_if_loaded()
+
+            def failed(e):
+                state["progress"] = None
+                if isinstance(e, recalc.CheckpointMismatch):
+                    info.config(text="")
+                    if messagebox.askyesno("Bulk Percentage Recalculation",
+                                           f"{e}\n\nStart over? The saved progress of that run is discarded.",
+                                           parent=win):
+                        start(resume=False)
+                    return
+                self.show_db_error(e, "Recalculation failed: ")
+
+            def poll():
+                st = state["progress"]
+                if st is None:
+                    return
+                if st:
+                    bar["value"] = st["fraction"]
+                    info.config(text=f"{st['evaluations']:,} / {st['total']:,} evaluations — "
+                                     f"{st['rows']:,} rows ({st['rows_per_sec']:,.0f} rows/s)")
+                win.after(200, poll)
+
+            info.config(text="Starting…")
+            self.worker.submit("bulk_recalc", work, done, failed)
+            win.after(200, poll)
+
+        tk.Button(win, text="Start / Resume", command=start).grid(row=7, column=0, padx=6, pady=6, sticky="ew")
+        tk.Button(win, text="Stop", command=lambda: state.update(stop=True)).grid(row=7, column=1, padx=6, pady=6, sticky="ew")
 
 
     # ============================================================
     # [RUBRIC] EVALUATIONS — CRUD (WITH GUI)
     # ============================================================
-    def init_evaluations_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Evaluations")
-
+    def init_evaluations_tab(self, tab):
         columns=["EvaluationID","TotalMarks","Rounds","EvalDate","Comments"]
         self.eval_tree = ttk.Treeview(tab, columns=columns, show="headings", height=18)
 
@@ -456,6 +892,7 @@ class ProjectEvalApp(tk.Tk):
             self.eval_tree.heading(c, text=c)
             self.eval_tree.column(c, width=130, anchor="center")
         self.eval_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.eval_pager = self.make_pager(tab, self.eval_tree, "Evaluation", columns)
 
         self.eval_fields = {c: tk.Entry(tab, width=18) for c in columns}
         for i, c in enumerate(columns):
@@ -466,82 +903,44 @@ class ProjectEvalApp(tk.Tk):
         tk.Button(tab, text="Show All", command=self.show_evaluations).grid(row=6, column=1, pady=6, sticky="ew")
         tk.Button(tab, text="Update", command=self.update_evaluation).grid(row=7, column=0, pady=6, sticky="ew")
         tk.Button(tab, text="Delete", command=self.delete_evaluation).grid(row=7, column=1, pady=6, sticky="ew")
+        tk.Button(tab, text="Bulk Import CSV/Excel", command=lambda: self.bulk_import("Evaluation", self.eval_pager)).grid(row=8, column=0, columnspan=2, pady=6, sticky="ew")
+
+        self.make_batch_bar(tab, "evaluation", self.eval_pager, self.eval_fields)
 
         self.show_evaluations()
 
     def add_evaluation(self):
         v = [self.eval_fields[c].get() for c in self.eval_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("INSERT INTO Evaluation VALUES (%s,%s,%s,%s,%s)", v)
-            conn.commit()
-            messagebox.showinfo("OK", "Evaluation added")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_evaluations()
-            try: conn.close()
-            except: pass
+        self.write_row(self.eval_pager, lambda: services.add_evaluation(v),
+                       "Evaluation added", ["EvaluationID"], [v[0]], delta=1, queue=("evaluation", "add", v))
 
     def update_evaluation(self):
         v = [self.eval_fields[c].get() for c in self.eval_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Evaluation 
-                SET TotalMarks=%s, Rounds=%s, EvalDate=%s, Comments=%s
-                WHERE EvaluationID=%s
-            """, (v[1], v[2], v[3], v[4], v[0]))
-            conn.commit()
-            messagebox.showinfo("OK", "Evaluation updated")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_evaluations()
-            try: conn.close()
-            except: pass
+        self.write_row(self.eval_pager, lambda: services.update_evaluation(v),
+                       "Evaluation updated", ["EvaluationID"], [v[0]], queue=("evaluation", "update", v))
 
     def delete_evaluation(self):
         eid = self.eval_fields["EvaluationID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Evaluation WHERE EvaluationID=%s", (eid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Evaluation deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_evaluations()
-            try: conn.close()
-            except: pass
+        # Marks is ON DELETE CASCADE
+        self.write_row(self.eval_pager, lambda: services.delete_evaluation(eid),
+                       "Evaluation deleted", ["EvaluationID"], [eid], delta=-1, cascade=["marks_pager"],
+                       queue=("evaluation", "delete", eid))
 
     def show_evaluations(self):
-        self.eval_tree.delete(*self.eval_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Evaluation")
-            for row in cursor.fetchall():
-                self.eval_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.eval_pager.reload()
 
 
     # ============================================================
     # [RUBRIC] GRADES — CRUD (WITH GUI)
     # ============================================================
-    def init_grades_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Grades")
-
+    def init_grades_tab(self, tab):
         columns=["Grade","FinalScore","ProjectID"]
         self.grade_tree = ttk.Treeview(tab, columns=columns, show="headings", height=18)
         for c in columns:
             self.grade_tree.heading(c, text=c)
             self.grade_tree.column(c, width=130, anchor="center")
         self.grade_tree.grid(row=0, column=3, rowspan=12, sticky="nsew", padx=10, pady=10)
+        self.grade_pager = self.make_pager(tab, self.grade_tree, "Grade", columns)
 
         self.grade_fields = {c: tk.Entry(tab, width=18) for c in columns}
         for i, c in enumerate(columns):
@@ -552,76 +951,48 @@ class ProjectEvalApp(tk.Tk):
         tk.Button(tab, text="Show All", command=self.show_grades).grid(row=4, column=1, pady=6, sticky="ew")
         tk.Button(tab, text="Update", command=self.update_grade).grid(row=5, column=0, pady=6, sticky="ew")
         tk.Button(tab, text="Delete", command=self.delete_grade).grid(row=5, column=1, pady=6, sticky="ew")
+        tk.Button(tab, text="Recompute All Grades (batch)", command=self.recompute_all_grades).grid(row=6, column=0, columnspan=2, pady=6, sticky="ew")
+
+        self.make_batch_bar(tab, "grade", self.grade_pager, self.grade_fields)
 
         self.show_grades()
 
     def add_grade(self):
         v = [self.grade_fields[c].get() for c in self.grade_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("INSERT INTO Grade VALUES (%s,%s,%s)", v)
-            conn.commit()
-            messagebox.showinfo("OK", "Grade added")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_grades()
-            try: conn.close()
-            except: pass
+        # Read back: the grade trigger may rewrite the Grade letter
+        self.write_row(self.grade_pager, lambda: services.add_grade(v),
+                       "Grade added", ["ProjectID"], [v[2]], delta=1, queue=("grade", "add", v))
 
     def update_grade(self):
         v = [self.grade_fields[c].get() for c in self.grade_fields]
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                UPDATE Grade 
-                SET Grade=%s, FinalScore=%s 
-                WHERE ProjectID=%s
-            """, (v[0], v[1], v[2]))
-            conn.commit()
-            messagebox.showinfo("OK", "Grade updated")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_grades()
-            try: conn.close()
-            except: pass
+        self.write_row(self.grade_pager, lambda: services.update_grade(v),
+                       "Grade updated", ["ProjectID"], [v[2]], queue=("grade", "update", v))
 
     def delete_grade(self):
         pid = self.grade_fields["ProjectID"].get()
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DELETE FROM Grade WHERE ProjectID=%s", (pid,))
-            conn.commit()
-            messagebox.showinfo("OK", "Grade deleted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            self.show_grades()
-            try: conn.close()
-            except: pass
+        self.write_row(self.grade_pager, lambda: services.delete_grade(pid),
+                       "Grade deleted", ["ProjectID"], [pid], delta=-1, queue=("grade", "delete", pid))
 
     def show_grades(self):
-        self.grade_tree.delete(*self.grade_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM Grade")
-            for row in cursor.fetchall():
-                self.grade_tree.insert('', tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.grade_pager.reload()
+
+    def recompute_all_grades(self):
+        """Dry run first, show the diff, then write only if confirmed."""
+        def preview(stats):
+            if not stats["inserted"] and not stats["updated"]:
+                messagebox.showinfo("Recompute Grades", grading.format_stats(stats))
+                return
+            if messagebox.askyesno("Recompute Grades", grading.format_stats(stats) + "\n\nApply these changes?"):
+                self.write_db(lambda: services.write_through(["Grade"], grading.recompute_grades, get_conn_cursor),
+                              "Grades recomputed", self.show_grades, error_prefix="Grade batch failed: ")
+        self.run_db("recompute_grades", lambda: grading.recompute_grades(get_conn_cursor, dry_run=True),
+                    preview, error_prefix="Grade batch failed: ")
 
 
     # ============================================================
     # [RUBRIC] REPORTS (VIEWS) — WITH GUI
     # ============================================================
-    def init_reports_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Reports (Views)")
-
+    def init_reports_tab(self, tab):
         # Create (or recreate) sample views from GUI via DB Tools tab
         tk.Label(tab, text="Project Summary View").grid(row=0, column=0, sticky="w", padx=6, pady=6)
         tk.Button(tab, text="Load Summary", command=self.show_project_summary).grid(row=0, column=1, padx=6, pady=6)
@@ -632,6 +1003,7 @@ class ProjectEvalApp(tk.Tk):
             self.report_tree.heading(c, text=c)
             self.report_tree.column(c, width=120, anchor="center")
         self.report_tree.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10, pady=6)
+        self.make_sortable(self.report_tree)
 
         tk.Label(tab, text="Top Projects").grid(row=2, column=0, sticky="w", padx=6, pady=6)
         self.top_tree = ttk.Treeview(tab, columns=["ProjectID","Title","FinalScore"], show='headings', height=8)
@@ -639,43 +1011,210 @@ class ProjectEvalApp(tk.Tk):
             self.top_tree.heading(c, text=c)
             self.top_tree.column(c, width=150 if c == "Title" else 120, anchor="center")
         self.top_tree.grid(row=3, column=0, columnspan=3, sticky="nsew", padx=10, pady=6)
+        self.make_sortable(self.top_tree)
 
         tk.Button(tab, text="Load Top Projects", command=self.show_top_projects).grid(row=2, column=1, padx=6, pady=6)
 
+        # ---- Export any table / view to disk (streams; works for millions of rows) ----
+        tk.Label(tab, text="Export table/view").grid(row=4, column=0, sticky="w", padx=6, pady=6)
+        self.export_choice = ttk.Combobox(tab, width=24, values=[
+            "vw_project_summary", "vw_top_projects", "Student", "Team", "TeamMember", "Project",
+            "Evaluation", "Marks", "Grade", "Faculty"])
+        self.export_choice.set("vw_project_summary")
+        self.export_choice.grid(row=4, column=1, padx=6, pady=6)
+        tk.Button(tab, text="Export (CSV / .pecol)", command=lambda: self.export_source(self.export_choice.get())).grid(row=4, column=2, padx=6, pady=6)
+
+        # ---- Materialized summary (optional): kept current by triggers, views used when stale ----
+        tk.Label(tab, text="Summary table").grid(row=5, column=0, sticky="w", padx=6, pady=6)
+        mv_buttons = tk.Frame(tab)
+        mv_buttons.grid(row=5, column=1, columnspan=2, sticky="w")
+        tk.Button(mv_buttons, text="Enable", command=lambda: self.summary_table("enable")).pack(side="left", padx=3)
+        tk.Button(mv_buttons, text="Rebuild", command=lambda: self.summary_table("rebuild")).pack(side="left", padx=3)
+        tk.Button(mv_buttons, text="Disable", command=lambda: self.summary_table("disable")).pack(side="left", padx=3)
+        self.report_source = tk.Label(tab, text="Source: —")
+        self.report_source.grid(row=6, column=0, columnspan=3, sticky="w", padx=6)
+
+        # ---- Score analytics: distributions per group, cached until the data changes ----
+        tk.Label(tab, text="Score analytics by").grid(row=7, column=0, sticky="w", padx=6, pady=6)
+        self.analytics_dim = ttk.Combobox(tab, width=24, state="readonly", values=list(analytics.DIMENSIONS))
+        self.analytics_dim.set("domain")
+        self.analytics_dim.grid(row=7, column=1, padx=6, pady=6)
+        self.analytics_dim.bind("<<ComboboxSelected>>", lambda _: self.show_analytics())
+        an_buttons = tk.Frame(tab)
+        an_buttons.grid(row=7, column=2, sticky="w")
+        tk.Button(an_buttons, text="Analyze", command=self.show_analytics).pack(side="left", padx=3)
+        tk.Button(an_buttons, text="Reload Data", command=lambda: self.show_analytics(refresh=True)).pack(side="left", padx=3)
+        tk.Button(an_buttons, text="Histogram", command=self.show_analytics_histogram).pack(side="left", padx=3)
+
+        columns, _ = analytics.stat_rows({"rows": [], "overall": None})
+        self.analytics_tree = ttk.Treeview(tab, columns=columns, show='headings', height=8)
+        for c in columns:
+            self.analytics_tree.heading(c, text=c)
+            self.analytics_tree.column(c, width=130 if c == "Group" else 62, anchor="center")
+        self.analytics_tree.grid(row=8, column=0, columnspan=3, sticky="nsew", padx=10, pady=6)
+        self.make_sortable(self.analytics_tree)
+        self.analytics_info = tk.Label(tab, text="")
+        self.analytics_info.grid(row=9, column=0, columnspan=3, sticky="w", padx=6)
+        self.analytics_result = None
+
+    def export_source(self, source, default_name=None):
+        """Ask for a file name, then stream source (table, view or SELECT) to it on the worker."""
+        path = filedialog.asksaveasfilename(
+            title="Export", initialfile=(default_name or source),
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Columnar (.pecol)", "*.pecol")])
+        if not path:
+            return
+        self.write_db(lambda: export_query(get_conn_cursor, source, path),
+                      f"Exported to {path}", ok_title="Export", error_prefix="Export failed: ")
+
     def show_project_summary(self):
-        self.report_tree.delete(*self.report_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM vw_project_summary")
-            for row in cursor.fetchall():
-                self.report_tree.insert("", tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", f"Load view failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.load_tree("show_project_summary", self.report_tree, services.project_summary,
+                       error_prefix="Load view failed: ", on_loaded=self.show_report_source)
 
     def show_top_projects(self):
-        self.top_tree.delete(*self.top_tree.get_children())
+        self.load_tree("show_top_projects", self.top_tree, services.top_projects,
+                       error_prefix="Load view failed: ", on_loaded=self.show_report_source)
+
+    def show_report_source(self, result):
+        source = result[2]
+        self.report_source.config(text="Source: summary table (current)" if source == "materialized"
+                                  else "Source: live views (summary table disabled or stale)")
+
+    def show_analytics(self, refresh=False):
+        dimension = self.analytics_dim.get()
+
+        def on_done(result):
+            self.analytics_result = result
+            self.fill_tree(self.analytics_tree, analytics.stat_rows(result)[1])
+            self.analytics_info.config(text=analytics.format_summary(result))
+        self.run_db("show_analytics", lambda: analytics.ANALYTICS.analyze(dimension, refresh=refresh), on_done,
+                    error_prefix="Analytics failed: ")
+
+    def show_analytics_histogram(self):
+        result = self.analytics_result
+        if not result or not result["overall"]:
+            messagebox.showerror("Error", "Run analytics first (on a database with scores)")
+            return
+        sel = self.analytics_tree.selection()
+        # By group label: the tree may be sorted differently from result["rows"]
+        groups = {str(r["group"]): r for r in result["rows"] + [result["overall"]]}
+        row = groups.get(self.analytics_tree.set(sel[0], "Group"), result["overall"]) if sel else result["overall"]
+        self.show_text(f"{result['measure']} histogram: {row['group']}",
+                       f"{result['measure']} of {row['group']} ({row['count']:,} rows)\n\n"
+                       + analytics.histogram_text(row))
+
+    def summary_table(self, action):
+        work = {"enable": services.enable_summary_table, "rebuild": services.rebuild_summary_table,
+                "disable": services.disable_summary_table}[action]
+        self.write_db(work, f"Summary table: {action} done", ok_title="Summary table",
+                      error_prefix=f"Summary table {action} failed: ")
+
+
+    # ============================================================
+    # RANKINGS — LEADERBOARDS AND "WHERE DOES IT STAND" (REPORTS PANEL)
+    # ============================================================
+    def init_rankings_tab(self, tab):
+        tk.Label(tab, text="Board").grid(row=0, column=0, sticky="w", padx=6, pady=6)
+        self.rank_board = ttk.Combobox(tab, width=20, state="readonly", values=list(rankings.BOARDS))
+        self.rank_board.set("overall")
+        self.rank_board.grid(row=0, column=1, padx=6, pady=6)
+        self.rank_board.bind("<<ComboboxSelected>>", lambda _: self.load_rank_groups())
+        tk.Label(tab, text="Group").grid(row=0, column=2, sticky="w", padx=6)
+        self.rank_group = ttk.Combobox(tab, width=20, state="disabled")
+        self.rank_group.grid(row=0, column=3, padx=6, pady=6)
+        self.rank_group.bind("<<ComboboxSelected>>", lambda _: self.show_leaderboard())
+        tk.Label(tab, text="Top").grid(row=0, column=4, sticky="w", padx=6)
+        self.rank_k = tk.Entry(tab, width=6)
+        self.rank_k.insert(0, str(rankings.TOP_K))
+        self.rank_k.grid(row=0, column=5, padx=6)
+        tk.Button(tab, text="Show Leaderboard", command=self.show_leaderboard).grid(row=0, column=6, padx=6)
+        tk.Button(tab, text="Reload Data", command=lambda: self.show_leaderboard(refresh=True)).grid(row=0, column=7, padx=6)
+
+        self.rank_tree = ttk.Treeview(tab, columns=rankings.COLUMNS["projects"], show='headings', height=16)
+        self.rank_tree.grid(row=1, column=0, columnspan=8, sticky="nsew", padx=10, pady=6)
+        self.make_sortable(self.rank_tree)
+        self.set_rank_columns(rankings.COLUMNS["projects"])
+
+        tk.Label(tab, text="Where does").grid(row=2, column=0, sticky="w", padx=6, pady=6)
+        self.rank_entity = ttk.Combobox(tab, width=10, state="readonly", values=list(rankings.DATASETS))
+        self.rank_entity.set("project")
+        self.rank_entity.grid(row=2, column=1, padx=6, pady=6, sticky="w")
+        self.rank_id = tk.Entry(tab, width=12)
+        self.rank_id.grid(row=2, column=2, padx=6, sticky="w")
+        tk.Button(tab, text="Stand?", command=self.show_standing).grid(row=2, column=3, padx=6, sticky="w")
+
+        stand_columns, _ = rankings.stand_rows({"boards": []})
+        self.stand_tree = ttk.Treeview(tab, columns=stand_columns, show='headings', height=4)
+        for c in stand_columns:
+            self.stand_tree.heading(c, text=c)
+            self.stand_tree.column(c, width=140 if c in ("Board", "Group") else 90, anchor="center")
+        self.stand_tree.grid(row=3, column=0, columnspan=8, sticky="nsew", padx=10, pady=6)
+        self.rank_info = tk.Label(tab, text="")
+        self.rank_info.grid(row=4, column=0, columnspan=8, sticky="w", padx=6)
+
+        self.show_leaderboard()
+
+    def set_rank_columns(self, columns):
+        """Projects and students boards have different columns; the sort starts over when they change."""
+        if list(self.rank_tree["columns"]) != list(columns):
+            self.rank_tree.configure(columns=columns)
+            self._tree_sort[str(self.rank_tree)] = []
+        for c in columns:
+            self.rank_tree.column(c, width=220 if c in ("Title", "Name") else 100, anchor="center")
+        show_sort(self.rank_tree, self._tree_sort[str(self.rank_tree)])
+
+    def load_rank_groups(self):
+        board = self.rank_board.get()
+        if not rankings.BOARDS[board][1]:
+            self.rank_group.set("")
+            self.rank_group.configure(state="disabled", values=[])
+            self.show_leaderboard()
+            return
+
+        def done(groups):
+            self.rank_group.configure(state="readonly", values=groups)
+            if self.rank_group.get() not in groups:
+                self.rank_group.set(groups[0] if groups else "")
+            self.show_leaderboard()
+        self.run_db("rank_groups", lambda: rankings.RANKINGS.groups(board), done, error_prefix="Rankings failed: ")
+
+    def show_leaderboard(self, refresh=False):
+        board, group = self.rank_board.get(), self.rank_group.get() or None
+        if rankings.BOARDS[board][1] and group is None:
+            return   # groups still loading
         try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT * FROM vw_top_projects LIMIT 10")
-            for row in cursor.fetchall():
-                self.top_tree.insert("", tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", f"Load view failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+            k = int(self.rank_k.get())
+        except ValueError:
+            messagebox.showerror("Error", "Top must be a whole number")
+            return
+
+        def done(result):
+            columns, rows, meta = result
+            self.set_rank_columns(columns)
+            self.fill_tree(self.rank_tree, rows)
+            self.rank_info.config(text=f"{board}{' ' + group if group else ''}: top {len(rows)} of {meta['of']:,} "
+                                       f"({meta['seconds'] * 1000:.2f} ms; boards built in "
+                                       f"{rankings.RANKINGS.load_seconds:.2f}s)")
+        self.run_db("leaderboard", lambda: rankings.RANKINGS.top(board, group, k, refresh=refresh), done,
+                    error_prefix="Rankings failed: ")
+
+    def show_standing(self):
+        entity, key = self.rank_entity.get(), self.rank_id.get().strip()
+        if not key:
+            messagebox.showerror("Error", f"Enter a {entity} ID")
+            return
+
+        def done(result):
+            self.fill_tree(self.stand_tree, rankings.stand_rows(result)[1])
+            self.rank_info.config(text=rankings.format_stand(result))
+        self.run_db("standing", lambda: rankings.RANKINGS.rank_of(entity, key), done, error_prefix="Rankings: ")
 
 
     # ============================================================
     # [RUBRIC] QUERIES — NESTED / JOIN / AGGREGATE (WITH GUI)
     # ============================================================
-    def init_queries_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="Queries")
-
+    def init_queries_tab(self, tab):
         # Buttons for each rubric query type
         tk.Button(tab, text="Nested Query (FinalScore > AVG)", command=self.run_nested_query).grid(row=0, column=0, padx=6, pady=6, sticky="ew")
         tk.Button(tab, text="Join Query (Student ↔ Team)", command=self.run_join_query).grid(row=1, column=0, padx=6, pady=6, sticky="ew")
@@ -687,78 +1226,49 @@ class ProjectEvalApp(tk.Tk):
             self.query_tree.heading(c, text=c)
             self.query_tree.column(c, width=160, anchor="center")
         self.query_tree.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=10, pady=10)
+        self.make_sortable(self.query_tree)
+
+        self.last_query_result = None
+        tk.Button(tab, text="Export Result (CSV / .pecol)", command=self.export_query_result).grid(row=5, column=0, padx=6, pady=6, sticky="ew")
+
+    # All three rubric queries share one key: clicking another query supersedes the running one
+    def run_query_tab(self, name, empty_msg):
+        self._tree_sort[str(self.query_tree)] = []   # another query's columns: start unsorted
+        show_sort(self.query_tree, [])
+        self.load_tree("query_tab", self.query_tree, lambda: services.run_rubric_query(name),
+                       width=5, empty_msg=empty_msg,
+                       on_loaded=lambda result: setattr(self, "last_query_result", result))
+
+    def export_query_result(self):
+        """Writes the rows on screen (kept in a RowStore), without running the query again."""
+        if not self.last_query_result:
+            messagebox.showerror("Error", "Run a query first")
+            return
+        columns, rows = self.last_query_result
+        path = filedialog.asksaveasfilename(
+            title="Export", initialfile="query_result", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Columnar (.pecol)", "*.pecol")])
+        if path:
+            self.write_db(lambda: export_rows(columns, rows, path),
+                          f"Exported {len(rows):,} rows to {path}", ok_title="Export", error_prefix="Export failed: ")
 
     def run_nested_query(self):
         """[RUBRIC] Nested Query with GUI"""
-        self.query_tree.delete(*self.query_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                SELECT ProjectID, FinalScore 
-                FROM Grade 
-                WHERE FinalScore > (SELECT AVG(FinalScore) FROM Grade)
-            """)
-            rows = cursor.fetchall()
-            for r in rows:
-                self.query_tree.insert('', tk.END, values=(r[0], r[1], "", "", ""))
-            if not rows:
-                messagebox.showinfo("Info", "No rows matched the nested query.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.run_query_tab("nested", "No rows matched the nested query.")
 
     def run_join_query(self):
         """[RUBRIC] Join Query with GUI"""
-        self.query_tree.delete(*self.query_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                SELECT s.StudentID, s.Fname, t.TeamName
-                FROM Student s 
-                JOIN Team t ON s.StudentID = t.StudentID
-            """)
-            rows = cursor.fetchall()
-            for r in rows:
-                self.query_tree.insert('', tk.END, values=(r[0], r[1], r[2], "", ""))
-            if not rows:
-                messagebox.showinfo("Info", "No rows found for join result.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.run_query_tab("join", "No rows found for join result.")
 
     def run_aggregate_query(self):
         """[RUBRIC] Aggregate Query with GUI"""
-        self.query_tree.delete(*self.query_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("""
-                SELECT Domain, COUNT(*) AS TotalProjects 
-                FROM Project 
-                GROUP BY Domain
-            """)
-            rows = cursor.fetchall()
-            for r in rows:
-                self.query_tree.insert('', tk.END, values=(r[0], r[1], "", "", ""))
-            if not rows:
-                messagebox.showinfo("Info", "No projects grouped by domain.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.run_query_tab("aggregate", "No projects grouped by domain.")
 
 
     # ============================================================
     # [RUBRIC] USERS CREATION / VARIED PRIVILEGES — WITH GUI
     # ============================================================
-    def init_user_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="User Creation")
-
+    def init_user_tab(self, tab):
         # --- Create user form ---
         tk.Label(tab, text="MySQL Username:").grid(row=0, column=0, padx=6, pady=6, sticky="w")
         tk.Label(tab, text="Password:").grid(row=1, column=0, padx=6, pady=6, sticky="w")
@@ -770,7 +1280,7 @@ class ProjectEvalApp(tk.Tk):
 
         tk.Label(tab, text="Privileges:").grid(row=2, column=0, padx=6, pady=6, sticky="w")
         self.priv_select = tk.Listbox(tab, selectmode="multiple", height=6, exportselection=False)
-        for p in ["SELECT", "INSERT", "UPDATE", "DELETE", "ALL PRIVILEGES"]:
+        for p in services.ALLOWED_PRIVILEGES:
             self.priv_select.insert(tk.END, p)
         self.priv_select.grid(row=2, column=1, padx=6, pady=6, sticky="ew")
 
@@ -785,6 +1295,7 @@ class ProjectEvalApp(tk.Tk):
             self.user_tree.heading(col, text=col)
             self.user_tree.column(col, width=160, anchor="center")
         self.user_tree.grid(row=5, column=0, columnspan=3, sticky="nsew", padx=10, pady=6)
+        self.make_sortable(self.user_tree)
 
         tk.Button(tab, text="Refresh Users", command=self.load_users).grid(row=6, column=0, padx=6, pady=6, sticky="ew")
         tk.Button(tab, text="Delete User",   command=self.delete_user).grid(row=6, column=1, padx=6, pady=6, sticky="ew")
@@ -797,17 +1308,8 @@ class ProjectEvalApp(tk.Tk):
         if not username or not password:
             messagebox.showerror("Error", "Enter username and password")
             return
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute(f"CREATE USER %s@'localhost' IDENTIFIED BY %s", (username, password))
-            conn.commit()
-            messagebox.showinfo("Success", f"User '{username}' created")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
-            self.load_users()
+        self.write_db(lambda: services.create_user(username, password),
+                      f"User '{username}' created", self.load_users, ok_title="Success")
 
     def grant_privileges(self):
         username = self.user_entry.get().strip()
@@ -820,32 +1322,11 @@ class ProjectEvalApp(tk.Tk):
             return
 
         chosen = [self.priv_select.get(i) for i in selections]
-        privilege_sql = "ALL PRIVILEGES" if "ALL PRIVILEGES" in chosen else ", ".join(chosen)
-
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute(f"GRANT {privilege_sql} ON project_eval.* TO %s@'localhost'", (username,))
-            cursor.execute("FLUSH PRIVILEGES")
-            conn.commit()
-            messagebox.showinfo("Success", "Privileges granted")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(lambda: services.grant_privileges(username, chosen),
+                      "Privileges granted", ok_title="Success")
 
     def load_users(self):
-        self.user_tree.delete(*self.user_tree.get_children())
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("SELECT User, Host FROM mysql.user")
-            for row in cursor.fetchall():
-                self.user_tree.insert("", tk.END, values=row)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+        self.load_tree("load_users", self.user_tree, services.list_users)
 
     def delete_user(self):
         selected = self.user_tree.selection()
@@ -855,22 +1336,12 @@ class ProjectEvalApp(tk.Tk):
         user, host = self.user_tree.item(selected[0])["values"]
 
         # Avoid accidental removal of system accounts
-        if user in {"root", "mysql.session", "mysql.sys", "debian-sys-maint"}:
+        if user in services.SYSTEM_USERS:
             messagebox.showerror("Error", "Cannot delete system users")
             return
 
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute(f"DROP USER %s@%s", (user, host))
-            cursor.execute("FLUSH PRIVILEGES")
-            conn.commit()
-            messagebox.showinfo("Deleted", f"User '{user}'@'{host}' removed")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            try: conn.close()
-            except: pass
-            self.load_users()
+        self.write_db(lambda: services.delete_user(user, host),
+                      f"User '{user}'@'{host}' removed", self.load_users, ok_title="Deleted")
 
 
     # ============================================================
@@ -880,10 +1351,7 @@ class ProjectEvalApp(tk.Tk):
     #     - Create/Drop stored procedure: sp_recalc_percentage(eid)
     #     - Create/Drop views used by Reports
     # ============================================================
-    def init_dbtools_tab(self):
-        tab = ttk.Frame(self.tabs)
-        self.tabs.add(tab, text="DB Tools (Triggers/Procedures/Views)")
-
+    def init_dbtools_tab(self, tab):
         # ---- TRIGGER CONTROLS ----
         ttk.Label(tab, text="Trigger: Auto-calc Percentage before INSERT/UPDATE on Marks").grid(row=0, column=0, sticky="w", padx=8, pady=8)
         ttk.Button(tab, text="Create Trigger", command=self.create_trigger).grid(row=0, column=1, padx=6, pady=6, sticky="ew")
@@ -901,63 +1369,37 @@ class ProjectEvalApp(tk.Tk):
 
         ttk.Label(tab, text="Use these buttons to demo rubric points for Triggers / Procedures / Views with GUI.").grid(row=3, column=0, columnspan=3, padx=8, pady=10, sticky="w")
 
+        # ---- CONNECTION POOL ----
+        ttk.Label(tab, text="Connection pool statistics (use to size DB_POOL max_size)").grid(row=4, column=0, sticky="w", padx=8, pady=8)
+        ttk.Button(tab, text="Show Pool Stats", command=self.show_pool_stats).grid(row=4, column=1, padx=6, pady=6, sticky="ew")
+
+        # ---- READ CACHE ----
+        ttk.Label(tab, text="Read cache (Team / Project / Evaluation pages, report views)").grid(row=5, column=0, sticky="w", padx=8, pady=8)
+        ttk.Button(tab, text="Show Cache Stats", command=self.show_cache_stats).grid(row=5, column=1, padx=6, pady=6, sticky="ew")
+        ttk.Button(tab, text="Clear Cache", command=self.clear_cache).grid(row=5, column=2, padx=6, pady=6, sticky="ew")
+
+        # ---- SCHEMA MIGRATIONS / INDEX ADVISOR ----
+        ttk.Label(tab, text="Schema: Marks primary key + indexes for hot joins/filters").grid(row=6, column=0, sticky="w", padx=8, pady=8)
+        ttk.Button(tab, text="Run Migrations", command=self.run_migrations).grid(row=6, column=1, padx=6, pady=6, sticky="ew")
+        ttk.Button(tab, text="Index Report (EXPLAIN)", command=self.show_index_report).grid(row=6, column=2, padx=6, pady=6, sticky="ew")
+
+        # ---- STARTUP TIMING ----
+        ttk.Label(tab, text="Startup: time to first paint / first data, lazy tab build times").grid(row=7, column=0, sticky="w", padx=8, pady=8)
+        ttk.Button(tab, text="Startup Timing", command=lambda: self.show_text("Startup Timing", self.startup.report())).grid(row=7, column=1, padx=6, pady=6, sticky="ew")
+
     # ---------- Trigger DDL ----------
+    # SQL for all of these lives in services.py (TRIGGER_DDL / PROCEDURE_DDL / VIEWS_DDL)
     def create_trigger(self):
         """
         Trigger: trg_marks_set_percentage
         BEFORE INSERT/UPDATE on Marks to compute Percentage = (MarksObtained / MaxMarks) * 100
         """
-        ddl_drop = "DROP TRIGGER IF EXISTS trg_marks_set_percentage"
-        ddl_create = """
-            CREATE TRIGGER trg_marks_set_percentage
-            BEFORE INSERT ON Marks
-            FOR EACH ROW
-            BEGIN
-                IF NEW.MaxMarks IS NOT NULL AND NEW.MaxMarks <> 0 AND NEW.MarksObtained IS NOT NULL THEN
-                    SET NEW.Percentage = (NEW.MarksObtained / NEW.MaxMarks) * 100;
-                ELSE
-                    SET NEW.Percentage = NULL;
-                END IF;
-            END
-        """
-        # Also cover UPDATE case with a second trigger
-        ddl_drop2 = "DROP TRIGGER IF EXISTS trg_marks_set_percentage_upd"
-        ddl_create2 = """
-            CREATE TRIGGER trg_marks_set_percentage_upd
-            BEFORE UPDATE ON Marks
-            FOR EACH ROW
-            BEGIN
-                IF NEW.MaxMarks IS NOT NULL AND NEW.MaxMarks <> 0 AND NEW.MarksObtained IS NOT NULL THEN
-                    SET NEW.Percentage = (NEW.MarksObtained / NEW.MaxMarks) * 100;
-                ELSE
-                    SET NEW.Percentage = NULL;
-                END IF;
-            END
-        """
-        try:
-            conn, cursor = get_conn_cursor()
-            for stmt in (ddl_drop, ddl_create, ddl_drop2, ddl_create2):
-                cursor.execute(stmt)
-            conn.commit()
-            messagebox.showinfo("Success", "Trigger(s) created")
-        except Exception as e:
-            messagebox.showerror("Error", f"Trigger creation failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(services.create_trigger,
+                      "Trigger(s) created", ok_title="Success", error_prefix="Trigger creation failed: ")
 
     def drop_trigger(self):
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DROP TRIGGER IF EXISTS trg_marks_set_percentage")
-            cursor.execute("DROP TRIGGER IF EXISTS trg_marks_set_percentage_upd")
-            conn.commit()
-            messagebox.showinfo("Success", "Trigger(s) dropped")
-        except Exception as e:
-            messagebox.showerror("Error", f"Dropping trigger failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(services.drop_trigger,
+                      "Trigger(s) dropped", ok_title="Success", error_prefix="Dropping trigger failed: ")
 
     # ---------- Procedure DDL ----------
     def create_procedure(self):
@@ -965,42 +1407,12 @@ class ProjectEvalApp(tk.Tk):
         Procedure: sp_recalc_percentage(eid INT)
         Recomputes Percentage for a given EvaluationID in Marks table.
         """
-        ddl_drop = "DROP PROCEDURE IF EXISTS sp_recalc_percentage"
-        ddl_create = """
-            CREATE PROCEDURE sp_recalc_percentage(IN p_eid INT)
-            BEGIN
-                UPDATE Marks
-                SET Percentage = CASE 
-                                   WHEN MaxMarks IS NOT NULL AND MaxMarks <> 0 AND MarksObtained IS NOT NULL
-                                   THEN (MarksObtained / MaxMarks) * 100
-                                   ELSE NULL
-                                 END
-                WHERE EvaluationID = p_eid;
-            END
-        """
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute(ddl_drop)
-            cursor.execute(ddl_create)
-            conn.commit()
-            messagebox.showinfo("Success", "Procedure created")
-        except Exception as e:
-            messagebox.showerror("Error", f"Procedure creation failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(services.create_procedure,
+                      "Procedure created", ok_title="Success", error_prefix="Procedure creation failed: ")
 
     def drop_procedure(self):
-        try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DROP PROCEDURE IF EXISTS sp_recalc_percentage")
-            conn.commit()
-            messagebox.showinfo("Success", "Procedure dropped")
-        except Exception as e:
-            messagebox.showerror("Error", f"Dropping procedure failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(services.drop_procedure,
+                      "Procedure dropped", ok_title="Success", error_prefix="Dropping procedure failed: ")
 
     # ---------- Views DDL ----------
     def create_views(self):
@@ -1008,53 +1420,133 @@ class ProjectEvalApp(tk.Tk):
         Views used by Reports tab:
           1) vw_project_summary: join Project, Team, Grade to show a summary
           2) vw_top_projects: top projects ordered by FinalScore desc
-        Adjust field names if your schema differs.
         """
-        stmts = [
-            "DROP VIEW IF EXISTS vw_project_summary",
-            """CREATE VIEW vw_project_summary AS
-               SELECT 
-                 p.ProjectID, p.Title, p.Domain, p.Technology, p.Duration,
-                 t.TeamName, t.Members,
-                 g.Grade, g.FinalScore
-               FROM Project p
-               LEFT JOIN Team t ON p.TeamID = t.TeamID
-               LEFT JOIN Grade g ON p.ProjectID = g.ProjectID""",
-            "DROP VIEW IF EXISTS vw_top_projects",
-            """CREATE VIEW vw_top_projects AS
-               SELECT p.ProjectID, p.Title, g.FinalScore
-               FROM Project p
-               JOIN Grade g ON p.ProjectID = g.ProjectID
-               ORDER BY g.FinalScore DESC"""
-        ]
-        try:
-            conn, cursor = get_conn_cursor()
-            for s in stmts:
-                cursor.execute(s)
-            conn.commit()
-            messagebox.showinfo("Success", "Views created/replaced")
-        except Exception as e:
-            messagebox.showerror("Error", f"Creating views failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+        self.write_db(services.create_views,
+                      "Views created/replaced", ok_title="Success", error_prefix="Creating views failed: ")
 
     def drop_views(self):
+        self.write_db(services.drop_views,
+                      "Views dropped", ok_title="Success", error_prefix="Dropping views failed: ")
+
+    # ---------- Pool stats ----------
+    def show_pool_stats(self):
+        stats = services.pool_stats()
+        messagebox.showinfo("Connection Pool", "\n".join(f"{k}: {v}" for k, v in stats.items()))
+
+    # ---------- Cache stats ----------
+    def show_cache_stats(self):
+        stats = services.cache_stats()
+        per_table = stats.pop("per_table")
+        lines = [f"{k}: {v}" for k, v in stats.items()]
+        if per_table:
+            lines.append("")
+            lines += [f"{name}: {c['hits']} hits / {c['misses']} misses" for name, c in per_table.items()]
+        messagebox.showinfo("Read Cache", "\n".join(lines))
+
+    # ---------- Migrations ----------
+    def run_migrations(self):
+        def work():
+            log = []
+            migrations.migrate(get_conn_cursor, log=log.append)
+            return log, migrations.marks_has_key(get_conn_cursor)
+
+        def done(result):
+            log, keyed = result
+            text = "\n".join(log) or f"Schema already at version {migrations.LATEST}"
+            if keyed and not self.marks_keyed:
+                text += "\n\nRestart the app to page Marks by MarkID."
+            self.show_text("Migrations", text)
+        self.run_db("migrations", work, done, error_prefix="Migration failed: ")
+
+    def show_index_report(self):
+        self.run_db("index_report", lambda: migrations.format_explain(migrations.explain_report(get_conn_cursor)),
+                    lambda text: self.show_text("Index Report (EXPLAIN)", text), error_prefix="EXPLAIN failed: ")
+
+    def show_text(self, title, text):
+        """Scrollable read-only text window for reports too long for a messagebox."""
+        win = tk.Toplevel(self)
+        win.title(title)
+        box = tk.Text(win, width=120, height=30, wrap="none")
+        scroll = ttk.Scrollbar(win, orient="vertical", command=box.yview)
+        box.configure(yscrollcommand=scroll.set)
+        box.insert("1.0", text)
+        box.config(state="disabled")
+        box.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+
+    def clear_cache(self):
+        services.READ_CACHE.clear()
+        messagebox.showinfo("Read Cache", "Cache cleared")
+
+
+    # ============================================================
+    # PERFORMANCE — per-operation timings (see perf_metrics.py)
+    #   One row per calling method: connect / execute / fetch / render
+    #   percentiles and rows fetched, refreshed while the tab is open.
+    # ============================================================
+    PERF_COLUMNS = ["Operation", "Count", "Errors", "Total p50", "Total p90", "Total p99", "Total max",
+                    "Connect p90", "Execute p90", "Fetch p90", "Render p50", "Render p90", "Rows avg", "Rows max"]
+
+    def init_performance_tab(self, tab):
+        self.perf_tab = tab
+        self.perf_tree = ttk.Treeview(tab, columns=self.PERF_COLUMNS, show="headings", height=22)
+        for c in self.PERF_COLUMNS:
+            self.perf_tree.heading(c, text=c)
+            self.perf_tree.column(c, width=230 if c == "Operation" else 80, anchor="w" if c == "Operation" else "e")
+        self.perf_tree.grid(row=0, column=0, columnspan=5, sticky="nsew", padx=10, pady=10)
+        tab.rowconfigure(0, weight=1)
+        tab.columnconfigure(4, weight=1)
+
+        ttk.Button(tab, text="Refresh", command=self.refresh_performance).grid(row=1, column=0, padx=6, pady=6, sticky="ew")
+        ttk.Button(tab, text="Export JSON Log", command=lambda: self.export_metrics("jsonl")).grid(row=1, column=1, padx=6, pady=6, sticky="ew")
+        ttk.Button(tab, text="Export Prometheus", command=lambda: self.export_metrics("prom")).grid(row=1, column=2, padx=6, pady=6, sticky="ew")
+        ttk.Button(tab, text="Reset", command=lambda: (METRICS.clear(), self.refresh_performance())).grid(row=1, column=3, padx=6, pady=6, sticky="ew")
+        self.perf_info = ttk.Label(tab, text="")
+        self.perf_info.grid(row=1, column=4, sticky="w", padx=8)
+        self.refresh_performance()
+        self.after(2000, self._performance_tick)
+
+    def _performance_tick(self):
+        # Keep the table live while the tab is showing
+        if self.tabs.select() == str(self.perf_tab):
+            self.refresh_performance()
+        self.after(2000, self._performance_tick)
+
+    def refresh_performance(self):
+        """Slowest operations (by p90) first; times in ms."""
+        summary = METRICS.summary()
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        for tag, s in sorted(summary.items(), key=lambda kv: kv[1]["total"]["p90"], reverse=True):
+            self.perf_tree.insert('', tk.END, values=(
+                tag, s["count"], s["errors"], s["total"]["p50"], s["total"]["p90"], s["total"]["p99"],
+                s["total"]["max"], s["connect"]["p90"], s["execute"]["p90"], s["fetch"]["p90"],
+                s["render"]["p50"], s["render"]["p90"], s["rows_avg"], s["rows_max"]))
+        self.perf_info.config(text=f"{sum(s['count'] for s in summary.values())} operations "
+                                   f"(last {METRICS.samples.maxlen} kept)")
+
+    def export_metrics(self, fmt):
+        path = filedialog.asksaveasfilename(
+            title="Export DB timings", initialfile="projecteval_metrics." + fmt,
+            defaultextension="." + fmt,
+            filetypes=[("JSON lines", "*.jsonl")] if fmt == "jsonl" else [("Prometheus text", "*.prom")])
+        if not path:
+            return
         try:
-            conn, cursor = get_conn_cursor()
-            cursor.execute("DROP VIEW IF EXISTS vw_project_summary")
-            cursor.execute("DROP VIEW IF EXISTS vw_top_projects")
-            conn.commit()
-            messagebox.showinfo("Success", "Views dropped")
-        except Exception as e:
-            messagebox.showerror("Error", f"Dropping views failed: {e}")
-        finally:
-            try: conn.close()
-            except: pass
+            if fmt == "jsonl":
+                n = METRICS.write_jsonl(path)
+                messagebox.showinfo("Export", f"{n} operations written to {path}")
+            else:
+                METRICS.write_prometheus(path)
+                messagebox.showinfo("Export", f"Metrics written to {path}")
+        except OSError as e:
+            messagebox.showerror("Error", f"Export failed: {e}")
 
 
 # ==============================
 # RUN APPLICATION
 # ==============================
 if __name__ == "__main__":
-    ProjectEvalApp().mainloop()
+    try:
+        ProjectEvalApp().mainloop()
+    finally:
+        DB_POOL.close_all()
@@ -0,0 +1,507 @@
+# ==============================
+# HEADLESS CLI / BATCH MODE
+#   Same data-access layer as the GUI (services.py) without importing Tk,
+#   so it runs on servers, over SSH and from cron.
+#
+#   python projecteval_cli.py list Student --limit 20
+#   python projecteval_cli.py add student 1 CSE 3 Asha Rao 20 9876543210
+#   python projecteval_cli.py query aggregate --format csv
+#   python projecteval_cli.py import Marks marks.csv
+#   python projecteval_cli.py export vw_project_summary summary.pecol
+#   python projecteval_cli.py grade --dry-run --diff grades_diff.csv
+#   python projecteval_cli.py generate --projects 50000 && python projecteval_cli.py migrate up --compare
+#   python projecteval_cli.py analytics department --histogram
+#   python projecteval_cli.py rank top domain --group AI -k 5 && python projecteval_cli.py rank project 42
+#   python projecteval_cli.py --backend sqlite --sqlite-path grading.db list Grade
+#   python projecteval_cli.py queue sync && python projecteval_cli.py queue list --status conflict
+#   python projecteval_cli.py --backend sqlite --sqlite-path scratch.db async-check
+#   python projecteval_cli.py generate --projects 1M && python projecteval_cli.py benchmark --out after.json --compare before.json
+#
+#   Exit code: 0 ok, 1 database / input error, 2 bad arguments.
+# ==============================
+import argparse
+import csv
+import datetime
+import json
+import sys
+from decimal import Decimal
+
+import services
+from bulk_import import import_file, format_stats, IMPORT_SPECS
+from export_data import export_query
+import grading
+import recalc
+import migrations
+# datagen, benchmark, analytics, async_api, rankings, write_queue, change_feed
+# and row_store are imported by the subcommands that use them, so a plain
+# list / import / --help does not load (or start) any of that.
+
+
+# ---------- output ----------
+def _plain(v):
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, (datetime.date, datetime.datetime)):
+        return v.isoformat()
+    return v
+
+
+def print_rows(columns, rows, fmt="table", out=sys.stdout):
+    if fmt == "csv":
+        w = csv.writer(out)
+        w.writerow(columns)
+        w.writerows(["" if v is None else v for v in row] for row in rows)
+    elif fmt == "json":
+        json.dump([{c: _plain(v) for c, v in zip(columns, row)} for row in rows], out, indent=2)
+        out.write("\n")
+    else:
+        text = [["" if v is None else str(v) for v in row] for row in rows]
+        widths = [max([len(c)] + [len(r[i]) for r in text]) for i, c in enumerate(columns)]
+        out.write("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip() + "\n")
+        out.write("  ".join("-" * w for w in widths) + "\n")
+        for r in text:
+            out.write("  ".join(v.ljust(w) for v, w in zip(r, widths)).rstrip() + "\n")
+        out.write(f"({len(rows)} row{'s' if len(rows) != 1 else ''})\n")
+
+
+# ---------- commands ----------
+def parse_filters(pairs):
+    """["Name=asha", "Year=2..3"] -> filter bar values; ranges are FROM..TO (either side optional)."""
+    values = {}
+    for pair in pairs or ():
+        label, sep, text = pair.partition("=")
+        if not sep:
+            raise services.ServiceError(f"--filter takes FIELD=VALUE, got {pair!r}")
+        values[label] = tuple(text.split("..", 1)) if ".." in text else text
+    return values
+
+
+def cmd_list(args):
+    print_rows(*services.list_table(args.table, args.limit, parse_filters(args.filter)), fmt=args.format)
+
+
+def cmd_write(args):
+    spec = services.ENTITIES[args.entity]
+    if args.action == "delete":
+        if len(args.values) != 1:
+            raise services.ServiceError(f"delete {args.entity} takes one {spec['key'][0]}")
+    elif len(args.values) != len(spec["columns"]):
+        raise services.ServiceError(f"{args.action} {args.entity} takes {len(spec['columns'])} values: "
+                                    f"{' '.join(spec['columns'])}")
+    values = [None if v == "NULL" else v for v in args.values]
+    fn = getattr(services, f"{args.action}_{args.entity}")
+    affected, rows, total, is_estimate = fn(values[0] if args.action == "delete" else values)
+    print(f"{args.action}: {affected} row(s) affected; {spec['table']} now has "
+          f"{'~' if is_estimate else ''}{total:,} rows", file=sys.stderr)
+    if rows:
+        print_rows(spec["columns"], rows, fmt=args.format)
+
+
+def cmd_report(args):
+    if args.name == "summary":
+        columns, rows, source = services.project_summary()
+    else:
+        columns, rows, source = services.top_projects(args.limit)
+    print(f"source: {source}", file=sys.stderr)
+    print_rows(columns, rows, fmt=args.format)
+
+
+def cmd_summary_table(args):
+    if args.action == "enable":
+        stats = services.enable_summary_table()
+        print(f"Summary table enabled: {stats['rows']:,} rows in {stats['seconds']:.2f}s")
+    elif args.action == "rebuild":
+        stats = services.rebuild_summary_table()
+        print(f"Summary table rebuilt: {stats['rows']:,} rows in {stats['seconds']:.2f}s")
+    else:
+        services.disable_summary_table()
+        print("Summary table disabled; reports use the live views")
+
+
+def cmd_query(args):
+    print_rows(*services.run_rubric_query(args.name), fmt=args.format)
+
+
+def cmd_users(args):
+    if args.action == "list":
+        print_rows(*services.list_users(), fmt=args.format)
+    elif args.action == "create":
+        services.create_user(args.username, args.password)
+        print(f"User '{args.username}' created")
+    elif args.action == "grant":
+        services.grant_privileges(args.username, args.privileges)
+        print("Privileges granted")
+    else:
+        services.delete_user(args.username, args.host)
+        print(f"User '{args.username}'@'{args.host}' removed")
+
+
+def cmd_ddl(args):
+    services.DDL_ACTIONS[args.action]()
+    print(f"{args.action}: done")
+
+
+def cmd_recalc(args):
+    services.recalc_percentage(args.evaluation_id)
+    print(f"Recalculated Percentage for EvaluationID={args.evaluation_id}")
+
+
+def cmd_recalc_all(args):
+    scope = recalc.scope_of(args.from_id, args.to_id, args.date_from, args.date_to)
+
+    def progress(st):
+        print(f"\r{st['fraction']:.0%}  {st['evaluations']:,}/{st['total']:,} evaluations  "
+              f"{st['rows']:,} rows  ({st['rows_per_sec']:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+    try:
+        stats = recalc.recalc_percentages(services.get_conn_cursor, scope, batch_size=args.batch,
+                                          checkpoint_path=args.checkpoint, resume=not args.restart,
+                                          pause=args.pause, on_progress=None if args.quiet else progress)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted — run the same command again to resume from {args.checkpoint}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(recalc.format_stats(stats))
+
+
+def cmd_migrate(args):
+    conn_fn = services.get_conn_cursor
+    if args.action == "status":
+        rows = [(v, name, applied or "pending", secs if secs is not None else "")
+                for v, name, applied, secs in migrations.status(conn_fn)]
+        print_rows(["version", "name", "applied_at", "seconds"], rows)
+    elif args.action == "up":
+        before = migrations.time_queries(conn_fn, args.repeat) if args.compare else None
+        if args.compare:
+            print(migrations.format_explain(migrations.explain_report(conn_fn)) + "\n")
+        touched = migrations.migrate(conn_fn, args.to)
+        print(f"Applied: {', '.join(map(str, touched)) or 'nothing (already up to date)'}")
+        if args.compare:
+            print("\n" + migrations.format_explain(migrations.explain_report(conn_fn)))
+            print("\n" + migrations.format_timings(before, migrations.time_queries(conn_fn, args.repeat)))
+    elif args.action == "down":
+        touched = migrations.migrate(conn_fn, args.to if args.to is not None else 0)
+        print(f"Rolled back: {', '.join(map(str, touched)) or 'nothing'}")
+    elif args.action == "explain":
+        print(migrations.format_explain(migrations.explain_report(conn_fn)))
+    else:
+        print(migrations.format_timings(migrations.time_queries(conn_fn, args.repeat)))
+
+
+def cmd_generate(args):
+    import datagen
+
+    def progress(counts):
+        print("\r" + "  ".join(f"{t} {n:,}" for t, n in counts.items()), end="", file=sys.stderr, flush=True)
+    counts = datagen.generate(services.get_conn_cursor, projects=args.projects,
+                              evals_per_project=args.evals, seed=args.seed, on_progress=progress)
+    print(file=sys.stderr)
+    services.READ_CACHE.clear()
+    print(f"Generated in {counts.pop('seconds'):.1f}s: " + ", ".join(f"{n:,} {t}" for t, n in counts.items()))
+
+
+def cmd_benchmark(args):
+    import benchmark
+
+    def progress(name, r):
+        if not args.quiet:
+            done = f"{r['median_ms']:.2f} ms" if r["runs"] else f"failed: {r['error']}"
+            print(f"  {name}: {done}", file=sys.stderr, flush=True)
+    result = benchmark.run_benchmark(services.get_conn_cursor, args.repeat, args.only, progress)
+    path = args.out or f"benchmark_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    benchmark.write_results(result, path)
+    print(benchmark.format_results(result))
+    if args.compare:
+        print("\n" + benchmark.format_comparison(benchmark.load_results(args.compare), result))
+    print(f"\nResults written to {path}")
+
+
+def cmd_async_check(args):
+    import async_api
+
+    def show(r):
+        print(f"  {'ok  ' if r['ok'] else 'FAIL'} {r['check']}: {r['detail']}", flush=True)
+    print(f"Async API against {services.backend_label()}")
+    results = async_api.self_check(args.size, args.max_waiting, args.burst, show)
+    failed = [r["check"] for r in results if not r["ok"]]
+    print(f"{len(results) - len(failed)}/{len(results)} checks passed" + (f" (failed: {', '.join(failed)})" if failed else ""))
+    return 1 if failed else 0
+
+
+def cmd_analytics(args):
+    import analytics
+
+    for dimension in args.dimension or list(analytics.DIMENSIONS):
+        result = analytics.ANALYTICS.analyze(dimension)
+        print(analytics.format_summary(result), file=sys.stderr)
+        print_rows(*analytics.stat_rows(result), fmt=args.format)
+        if args.histogram and result["overall"]:
+            for row in result["rows"] + [result["overall"]]:
+                print(f"\n{row['group']} ({row['count']:,})\n{analytics.histogram_text(row)}")
+        print()
+
+
+def cmd_rank(args):
+    import rankings
+
+    ranks = rankings.RANKINGS
+    if args.action == "top":
+        board = args.target or "overall"
+        columns, rows, meta = ranks.top(board, args.group, rankings.TOP_K if args.k is None else args.k)
+        print(f"{board}{' ' + args.group if args.group else ''}: top {len(rows)} of {meta['of']:,}",
+              file=sys.stderr)
+        print_rows(columns, rows, fmt=args.format)
+    elif args.action == "groups":
+        for group in ranks.groups(args.target or "domain"):
+            print(group)
+    else:
+        if args.target is None:
+            raise services.ServiceError(f"rank {args.action} needs an ID")
+        result = ranks.rank_of(args.action, args.target)
+        print(rankings.format_stand(result), file=sys.stderr)
+        print_rows(*rankings.stand_rows(result), fmt=args.format)
+
+
+def cmd_queue(args):
+    import write_queue
+
+    queue = write_queue.QUEUE
+    if args.action == "sync":
+        result = write_queue.replay(queue, batch_size=write_queue.REPLAY_BATCH if args.batch is None else args.batch)
+        print(write_queue.format_replay(result))
+        return 1 if result["offline"] or result["conflicts"] or result["failed"] else 0
+    if args.action == "retry":
+        print(f"{queue.retry(args.ids)} write(s) back to pending")
+    elif args.action == "discard":
+        print(f"{queue.discard(args.ids)} write(s) discarded")
+    elif args.action == "list":
+        columns = ["ID", "Status", "Action", "Entity", "Key", "Values", "Error", "Attempts", "QueuedAt"]
+        print_rows(columns, [[e["id"], e["status"], e["action"], e["entity"], e["key"], json.dumps(e["values"]),
+                              e["error"], e["attempts"], e["queued_at"]] for e in queue.entries(args.status)],
+                   fmt=args.format)
+        return 0
+    print(f"{queue.path}: {write_queue.format_counts(queue.counts())}")
+
+
+def cmd_changes(args):
+    import change_feed
+
+    if args.action == "tail":
+        print_rows(*change_feed.tail(services.get_conn_cursor, args.limit), fmt=args.format)
+    elif args.action == "prune":
+        keep = change_feed.KEEP_VERSIONS if args.keep is None else args.keep
+        print(f"{change_feed.prune(services.get_conn_cursor, keep):,} change_log row(s) deleted")
+    else:
+        st = change_feed.status(services.get_conn_cursor)
+        print(f"change_log: {st['rows']:,} rows, versions {st['oldest']}..{st['newest']}")
+
+
+def cmd_memory(args):
+    import row_store
+
+    print(row_store.format_measure(row_store.measure_table(services.get_conn_cursor, args.table, args.limit)))
+
+
+def cmd_import(args):
+    def progress(st):
+        print(f"\r{st['fraction']:.0%}  {st['read']:,} read  {st['inserted']:,} inserted  "
+              f"{st['rejected']:,} rejected  ({st['rows_per_sec']:,.0f} rows/s)",
+              end="", file=sys.stderr, flush=True)
+    stats = import_file(args.file, args.table, services.get_conn_cursor, chunk_rows=args.chunk,
+                        on_progress=None if args.quiet else progress, dry_run=args.dry_run)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(format_stats(stats))
+    return 1 if stats["rejected"] and args.strict else 0
+
+
+def cmd_grade(args):
+    stats = grading.recompute_grades(services.get_conn_cursor, chunk_rows=args.chunk, dry_run=args.dry_run,
+                                     include_unmarked=args.include_unmarked, diff_path=args.diff)
+    print(grading.format_stats(stats))
+
+
+def cmd_export(args):
+    stats = export_query(services.get_conn_cursor, args.source, args.file)
+    print(f"Exported {stats['rows']:,} rows to {stats['path']} in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s)")
+
+
+# ---------- argument parsing ----------
+def _count(text):
+    import datagen
+    return datagen.parse_count(text)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="projecteval_cli",
+                                     description="ProjectEval headless CLI (shares services.py with the GUI)")
+    parser.add_argument("--backend", choices=list(services.BACKENDS),
+                        help="database backend (default: $PROJECTEVAL_BACKEND or mysql)")
+    parser.add_argument("--sqlite-path", help="SQLite file (implies --backend sqlite; created on first use)")
+    fmt = argparse.ArgumentParser(add_help=False)
+    fmt.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", parents=[fmt], help="print a table or view")
+    p.add_argument("table")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--filter", action="append", metavar="FIELD=VALUE",
+                   help="filter bar field, e.g. Name=asha, Year=2..3, EvalDate=2025-03-01.. (repeatable)")
+    p.set_defaults(func=cmd_list)
+
+    for action in ("add", "update", "delete"):
+        what = "key value" if action == "delete" else "values in GUI column order; NULL for null"
+        p = sub.add_parser(action, parents=[fmt], help=f"{action} a row ({what})")
+        p.add_argument("entity", choices=list(services.ENTITIES))
+        p.add_argument("values", nargs="+")
+        p.set_defaults(func=cmd_write, action=action)
+
+    p = sub.add_parser("report", parents=[fmt], help="Reports tab views")
+    p.add_argument("name", choices=["summary", "top"])
+    p.add_argument("--limit", type=int, default=10, help="rows for 'top' (default 10)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("summary-table", help="materialized project summary used by the reports")
+    p.add_argument("action", choices=["enable", "rebuild", "disable"])
+    p.set_defaults(func=cmd_summary_table)
+
+    p = sub.add_parser("query", parents=[fmt], help="rubric queries")
+    p.add_argument("name", choices=list(services.RUBRIC_QUERIES))
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("users", parents=[fmt], help="MySQL users / privileges")
+    users = p.add_subparsers(dest="action", required=True)
+    users.add_parser("list", parents=[fmt])
+    u = users.add_parser("create")
+    u.add_argument("username")
+    u.add_argument("password")
+    u = users.add_parser("grant")
+    u.add_argument("username")
+    u.add_argument("privileges", nargs="+", help=", ".join(services.ALLOWED_PRIVILEGES))
+    u = users.add_parser("delete")
+    u.add_argument("username")
+    u.add_argument("--host", default="localhost")
+    p.set_defaults(func=cmd_users)
+
+    p = sub.add_parser("ddl", help="DB Tools: triggers / procedure / views")
+    p.add_argument("action", choices=list(services.DDL_ACTIONS))
+    p.set_defaults(func=cmd_ddl)
+
+    p = sub.add_parser("recalc", help="CALL sp_recalc_percentage(EvaluationID)")
+    p.add_argument("evaluation_id")
+    p.set_defaults(func=cmd_recalc)
+
+    p = sub.add_parser("recalc-all", help="recalculate Percentage for many evaluations (batched, resumable)")
+    p.add_argument("--from-id", type=int)
+    p.add_argument("--to-id", type=int)
+    p.add_argument("--date-from", metavar="YYYY-MM-DD")
+    p.add_argument("--date-to", metavar="YYYY-MM-DD")
+    p.add_argument("--batch", type=int, default=recalc.BATCH_EVALUATIONS, help="evaluations per UPDATE/commit")
+    p.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    p.add_argument("--checkpoint", default=recalc.CHECKPOINT_FILE,
+                   help="progress file (default: next to recalc.py, or $PROJECTEVAL_RECALC_CHECKPOINT)")
+    p.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    p.add_argument("--quiet", action="store_true", help="no progress line")
+    p.set_defaults(func=cmd_recalc_all)
+
+    p = sub.add_parser("migrate", help="versioned schema migrations + EXPLAIN index report")
+    p.add_argument("action", choices=["status", "up", "down", "explain", "timings"])
+    p.add_argument("--to", type=int, help="target version (default: latest for up, 0 for down)")
+    p.add_argument("--compare", action="store_true", help="with up: EXPLAIN + timings before and after")
+    p.add_argument("--repeat", type=int, default=3, help="timing runs per query (best is kept)")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("generate", help="insert a large seeded synthetic dataset")
+    p.add_argument("--projects", type=_count, default=10000,
+                   help="projects (and teams); ~3x as many students. Accepts 10k, 1M, ...")
+    p.add_argument("--evals", type=int, default=3, help="evaluations (and marks) per project")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("benchmark", help="time the app's operations and write JSON results")
+    p.add_argument("--repeat", type=int, default=5, help="runs per operation")
+    p.add_argument("--only", help="group (crud, read, query, report, grading) or part of an operation name")
+    p.add_argument("--out", help="results file (default benchmark_<timestamp>.json)")
+    p.add_argument("--compare", metavar="OLD_JSON", help="print medians against an earlier results file")
+    p.add_argument("--quiet", action="store_true", help="no per-operation progress")
+    p.set_defaults(func=cmd_benchmark)
+
+    p = sub.add_parser("async-check", help="exercise the asyncio data API (async_api.py); use a scratch database")
+    p.add_argument("--size", type=int, help="concurrent calls (default: the connection pool size)")
+    p.add_argument("--max-waiting", type=int, default=20, help="queued calls before new ones are refused")
+    p.add_argument("--burst", type=int, default=60, help="calls fired at once for the backpressure check")
+    p.set_defaults(func=cmd_async_check)
+
+    p = sub.add_parser("analytics", parents=[fmt], help="score distributions per domain / technology / dept / round")
+    p.add_argument("dimension", nargs="*", help="domain, technology, department, round (default: all of them)")
+    p.add_argument("--histogram", action="store_true", help="also print a text histogram per group")
+    p.set_defaults(func=cmd_analytics)
+
+    p = sub.add_parser("queue", parents=[fmt], help="offline write queue: status, list, sync to the database")
+    p.add_argument("action", choices=["status", "list", "sync", "retry", "discard"])
+    p.add_argument("ids", nargs="*", type=int, help="retry / discard only these (default: all failed / conflict)")
+    p.add_argument("--status", choices=["pending", "failed", "conflict"], help="list only writes with this status")
+    p.add_argument("--batch", type=int, help="writes per transaction (default 200)")
+    p.set_defaults(func=cmd_queue)
+
+    p = sub.add_parser("rank", parents=[fmt], help="leaderboards: top-k per board, where a project / student stands")
+    p.add_argument("action", choices=["top", "groups", "project", "student"])
+    p.add_argument("target", nargs="?",
+                   help="top / groups: the board (overall, domain, department, students, student department); "
+                        "project / student: the ID")
+    p.add_argument("--group", help="domain or department for the per-group boards")
+    p.add_argument("-k", type=int, help="rows for top (default 10)")
+    p.set_defaults(func=cmd_rank)
+
+    p = sub.add_parser("changes", parents=[fmt], help="change_log feed that open clients poll (migration 4)")
+    p.add_argument("action", choices=["status", "tail", "prune"])
+    p.add_argument("--limit", type=int, default=20, help="rows for tail")
+    p.add_argument("--keep", type=int, help="newest versions prune keeps (default 100000)")
+    p.set_defaults(func=cmd_changes)
+
+    p = sub.add_parser("memory", help="memory of a table as fetched tuples vs the compact RowStore the tabs use")
+    p.add_argument("table", choices=[spec["table"] for spec in services.ENTITIES.values()])
+    p.add_argument("--limit", type=_count, help="rows to load (default: all). Accepts 100k, 1M, ...")
+    p.set_defaults(func=cmd_memory)
+
+    p = sub.add_parser("import", help="bulk import CSV/Excel")
+    p.add_argument("table", choices=list(IMPORT_SPECS))
+    p.add_argument("file")
+    p.add_argument("--chunk", type=int, default=1000, help="rows per batch/commit")
+    p.add_argument("--dry-run", action="store_true", help="validate only, insert nothing")
+    p.add_argument("--strict", action="store_true", help="exit 1 if any row was rejected")
+    p.add_argument("--quiet", action="store_true", help="no progress line")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("grade", help="recompute every project's FinalScore / Grade from Marks")
+    p.add_argument("--dry-run", action="store_true", help="show the diff, write nothing")
+    p.add_argument("--diff", metavar="CSV", help="write every changed row to this file")
+    p.add_argument("--chunk", type=int, default=grading.CHUNK_ROWS, help="rows per upsert/commit")
+    p.add_argument("--include-unmarked", action="store_true",
+                   help="also grade projects without marks (score 0, like fn_project_avg_percentage)")
+    p.set_defaults(func=cmd_grade)
+
+    p = sub.add_parser("export", help="stream a table, view or SELECT to .csv / .pecol")
+    p.add_argument("source")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.backend or args.sqlite_path:
+            services.use_backend(args.backend or ("sqlite" if args.sqlite_path else services.BACKEND),
+                                 args.sqlite_path)
+        return args.func(args) or 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        services.DB_POOL.close_all()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# ==============================
+# RANKINGS / LEADERBOARDS
+#   Ranks of graded projects overall, per domain and per department (team
+#   leader's), and of students (best FinalScore of the teams they are
+#   members of, via TeamMember; team leaders when that table is missing)
+#   overall and per department.
+#   Each board is an ordered index, best first: scores as array('d') of
+#   -FinalScore with the ids alongside, plus the distinct scores. Built once
+#   per data version (the read cache's write generations, as in
+#   analytics.py); after that a rank is two bisections and top-k is a slice:
+#   O(log n) and O(k log n) instead of sorting Grade on every read.
+#   rank = RANK(), dense = DENSE_RANK(), percentile = 100 * PERCENT_RANK()
+#   over ascending FinalScore (share of the board scoring lower).
+# ==============================
+import bisect
+import threading
+import time
+from array import array
+
+import services
+
+RANKINGS_TTL = 300.0
+FETCH_ROWS = 10000
+TOP_K = 10
+SOURCE_TABLES = ("Project", "Grade", "Team", "Student", "TeamMember")
+NO_GROUP = "(none)"
+
+PROJECTS_SQL = """
+    SELECT p.ProjectID, p.Title, p.Domain, s.Dept, g.FinalScore
+    FROM Grade g
+    JOIN Project p ON p.ProjectID = g.ProjectID
+    LEFT JOIN Team t ON t.TeamID = p.TeamID
+    LEFT JOIN Student s ON s.StudentID = t.StudentID
+    WHERE g.FinalScore IS NOT NULL
+"""
+# {members}: TeamMember, or the leader only (Team.StudentID) without it
+STUDENTS_SQL = """
+    SELECT s.StudentID, s.Fname, s.Lname, s.Dept, MAX(g.FinalScore)
+    FROM {members} m
+    JOIN Student s ON s.StudentID = m.StudentID
+    JOIN Project p ON p.TeamID = m.TeamID
+    JOIN Grade g ON g.ProjectID = p.ProjectID
+    WHERE g.FinalScore IS NOT NULL
+    GROUP BY s.StudentID, s.Fname, s.Lname, s.Dept
+"""
+
+# board -> (dataset, group field or None); entity -> its boards for rank_of
+BOARDS = {
+    "overall":            ("projects", None),
+    "domain":             ("projects", "domain"),
+    "department":         ("projects", "dept"),
+    "students":           ("students", None),
+    "student department": ("students", "dept"),
+}
+ENTITY_BOARDS = {"project": ["overall", "domain", "department"], "student": ["students", "student department"]}
+DATASETS = {"project": "projects", "student": "students"}
+COLUMNS = {
+    "projects": ["Rank", "Dense", "Percentile", "ProjectID", "Title", "Domain", "Dept", "FinalScore"],
+    "students": ["Rank", "Dense", "Percentile", "StudentID", "Name", "Dept", "FinalScore"],
+}
+
+
+class Board:
+    """Entries of one board in rank order (best first, ties by id)."""
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda e: (-e[0], e[1]))   # (score, id)
+        self.keys = array("d", [-score for score, _ in entries])
+        self.ids = array("q", [i for _, i in entries])
+        self.distinct = array("d", sorted(set(self.keys)))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rank(self, score):
+        """{"rank", "dense", "percentile", "of"} of a score on this board (it need not be on it)."""
+        key, n = -float(score), len(self.keys)
+        lower = n - bisect.bisect_right(self.keys, key)
+        return {"rank": bisect.bisect_left(self.keys, key) + 1,
+                "dense": bisect.bisect_left(self.distinct, key) + 1,
+                "percentile": round(100.0 * lower / (n - 1), 2) if n > 1 else 0.0, "of": n}
+
+    def top(self, k=TOP_K):
+        """[(id, rank info)] of the k best entries."""
+        return [(self.ids[i], self.rank(-self.keys[i])) for i in range(min(k, len(self.keys)))]
+
+
+def _has_table(cursor, table):
+    cursor.execute("SELECT 1 FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1", (table,))
+    return cursor.fetchone() is not None
+
+
+def _rows(cursor, sql):
+    cursor.execute(sql)
+    while True:
+        rows = cursor.fetchmany(FETCH_ROWS)
+        if not rows:
+            return
+        yield from rows
+
+
+def load_boards(conn_fn):
+    """Read the scores once and build every board.
+
+    Returns {"projects": {id: info}, "students": {id: info}, "boards": {(board, group): Board},
+    "groups": {board: [labels]}, "members": "TeamMember" or "Team"}.
+    """
+    info = {"projects": {}, "students": {}}
+    conn, cursor = conn_fn()
+    try:
+        for pid, title, domain, dept, score in _rows(cursor, PROJECTS_SQL):
+            info["projects"][pid] = {"id": pid, "name": title, "domain": domain or NO_GROUP,
+                                     "dept": dept or NO_GROUP, "score": float(score)}
+        members = "TeamMember" if _has_table(cursor, "TeamMember") else "Team"
+        for sid, fname, lname, dept, score in _rows(cursor, STUDENTS_SQL.format(members=members)):
+            name = " ".join(p for p in (fname, lname) if p)
+            info["students"][sid] = {"id": sid, "name": name, "dept": dept or NO_GROUP, "score": float(score)}
+    finally:
+        conn.close()
+
+    boards, groups = {}, {}
+    for board, (dataset, field) in BOARDS.items():
+        entries = {}
+        for item in info[dataset].values():
+            entries.setdefault(item[field] if field else None, []).append((item["score"], item["id"]))
+        for group, scored in entries.items():
+            boards[(board, group)] = Board(scored)
+        groups[board] = sorted(g for g in entries if g is not None)
+    return dict(info, boards=boards, groups=groups, members=members)
+
+
+class Rankings:
+    """Boards cached per data version, like analytics.Analytics (queries run on a worker thread)."""
+
+    def __init__(self, conn_fn=None, version_fn=None, ttl=RANKINGS_TTL, clock=time.monotonic):
+        self.conn_fn = conn_fn or services.get_conn_cursor
+        self.version_fn = version_fn or (lambda: services.READ_CACHE.generation(*SOURCE_TABLES))
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._loaded_at = 0.0
+        self.load_seconds = 0.0
+
+    def data(self, refresh=False):
+        version = self.version_fn()
+        with self._lock:
+            if (not refresh and self._data is not None and self._version == version
+                    and self.clock() - self._loaded_at < self.ttl):
+                return self._data
+        started = time.perf_counter()
+        data = load_boards(self.conn_fn)
+        with self._lock:
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            # A write during the load: use the boards once, build them again next time
+            if self.version_fn() == version:
+                self._data, self._version, self._loaded_at = data, version, self.clock()
+        return data
+
+    def groups(self, board):
+        """Group labels of a board ([] for overall / students)."""
+        return self.data()["groups"][_board(board)]
+
+    def top(self, board="overall", group=None, k=TOP_K, refresh=False):
+        """(columns, rows, {"of", "seconds"}) of the k best on a board: rank, dense rank, percentile, the entry."""
+        started = time.perf_counter()
+        dataset, field = BOARDS[_board(board)]
+        data = self.data(refresh)
+        if field and group is None:
+            raise services.ServiceError(f"Pick a {board.split()[-1]} for the {board} board")
+        found = data["boards"].get((board, group if field else None))
+        rows = [_row(dataset, data[dataset][i], r) for i, r in (found.top(int(k)) if found else [])]
+        return COLUMNS[dataset], rows, {"of": len(found) if found else 0,
+                                        "seconds": round(time.perf_counter() - started, 4)}
+
+    def rank_of(self, entity, key, refresh=False):
+        """Where a project / student stands on each of its boards.
+
+        Returns {"entity", "id", "name", "score", "boards": [{"board", "group", "rank", "dense",
+        "percentile", "of"}]}; ServiceError if it has no FinalScore.
+        """
+        if entity not in DATASETS:
+            raise services.ServiceError(f"Unknown entity {entity!r}; use project or student")
+        data = self.data(refresh)
+        try:
+            item = data[DATASETS[entity]][int(key)]
+        except (KeyError, ValueError):
+            raise services.ServiceError(f"No graded {entity} with ID {key}") from None
+        out = []
+        for board in ENTITY_BOARDS[entity]:
+            field = BOARDS[board][1]
+            group = item[field] if field else None
+            out.append(dict(board=board, group=group, **data["boards"][(board, group)].rank(item["score"])))
+        return {"entity": entity, "id": item["id"], "name": item["name"], "score": item["score"], "boards": out}
+
+    def clear(self):
+        with self._lock:
+            self._data, self._version = None, None
+
+
+def _board(board):
+    if board not in BOARDS:
+        raise services.ServiceError(f"Unknown board {board!r}; use one of {', '.join(BOARDS)}")
+    return board
+
+
+def _row(dataset, item, r):
+    if dataset == "projects":
+        return [r["rank"], r["dense"], r["percentile"], item["id"], item["name"], item["domain"], item["dept"],
+                item["score"]]
+    return [r["rank"], r["dense"], r["percentile"], item["id"], item["name"], item["dept"], item["score"]]
+
+
+RANKINGS = Rankings()
+
+
+# ---------- output ----------
+def stand_rows(result):
+    """(columns, rows) of a rank_of result, one row per board."""
+    return (["Board", "Group", "Rank", "Dense", "Percentile", "Of"],
+            [[b["board"], b["group"] or "All", b["rank"], b["dense"], b["percentile"], b["of"]]
+             for b in result["boards"]])
+
+
+def format_stand(result):
+    best = min(result["boards"], key=lambda b: b["rank"] / b["of"])
+    return (f"{result['entity'].title()} {result['id']} ({result['name']}), FinalScore {result['score']:.2f}: "
+            f"#{best['rank']} of {best['of']:,} on {best['board']}"
+            + (f" {best['group']}" if best["group"] else ""))
@@ -0,0 +1,92 @@
+# ==============================
+# IN-PROCESS READ CACHE (LRU + TTL)
+#   Results of SELECTs on slow-changing tables / views, keyed by
+#   (sql, params). Every entry remembers which tables it was read from so a
+#   write to one table drops exactly the entries that could now be stale.
+#   Thread-safe: loads happen on DbWorker threads.
+# ==============================
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    def __init__(self, max_entries=256, default_ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (value, expires_at, tables); oldest first
+        self._generation = {}           # table -> bumped on every invalidation
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidated": 0}
+        self._per_table = {}            # label -> [hits, misses]
+
+    def get_or_load(self, key, tables, loader, ttl=None, label=None):
+        """Cached value for key, or loader() stored under the given tables.
+
+        A result loaded while one of its tables was invalidated is returned but
+        not stored, so a slow read can't put pre-write rows back in the cache.
+        """
+        tables = frozenset(tables)
+        label = label or ",".join(sorted(tables))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self._count(label, hit=True)
+                    return value
+                del self._entries[key]
+                self._counts["expired"] += 1
+            self._count(label, hit=False)
+            before = {t: self._generation.get(t, 0) for t in tables}
+
+        value = loader()
+
+        with self._lock:
+            if all(self._generation.get(t, 0) == g for t, g in before.items()):
+                self._entries[key] = (value, self.clock() + (self.default_ttl if ttl is None else ttl), tables)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counts["evictions"] += 1
+        return value
+
+    def invalidate(self, *tables):
+        """Drop every entry read from any of tables."""
+        tables = set(tables)
+        with self._lock:
+            for t in tables:
+                self._generation[t] = self._generation.get(t, 0) + 1
+            stale = [k for k, (_, _, deps) in self._entries.items() if deps & tables]
+            for k in stale:
+                del self._entries[k]
+            self._counts["invalidated"] += len(stale)
+
+    def generation(self, *tables):
+        """Write generations of tables; changes whenever one of them is invalidated."""
+        with self._lock:
+            return tuple(self._generation.get(t, 0) for t in tables)
+
+    def clear(self):
+        with self._lock:
+            for t in {t for _, _, deps in self._entries.values() for t in deps}:
+                self._generation[t] = self._generation.get(t, 0) + 1
+            self._counts["invalidated"] += len(self._entries)
+            self._entries.clear()
+
+    def _count(self, label, hit):
+        self._counts["hits" if hit else "misses"] += 1
+        per = self._per_table.setdefault(label, [0, 0])
+        per[0 if hit else 1] += 1
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counts)
+            lookups = out["hits"] + out["misses"]
+            out["hit_ratio"] = round(out["hits"] / lookups, 3) if lookups else 0.0
+            out["entries"] = len(self._entries)
+            out["max_entries"] = self.max_entries
+            out["per_table"] = {k: {"hits": h, "misses": m} for k, (h, m) in sorted(self._per_table.items())}
+            return out
@@ -0,0 +1,176 @@
+# ==============================
+# BULK PERCENTAGE RECALCULATION
+#   sp_recalc_percentage for many evaluations at once: all of them, an
+#   EvaluationID range and/or an EvalDate window. Evaluations are walked in
+#   EvaluationID order, a bounded batch per UPDATE / COMMIT, so locks stay
+#   short. A checkpoint file records the last finished EvaluationID, so an
+#   interrupted run picks up where it stopped. It lives next to the app
+#   (PROJECTEVAL_RECALC_CHECKPOINT overrides), not in whatever the cwd is.
+# ==============================
+import json
+import os
+import time
+
+BATCH_EVALUATIONS = 500    # evaluations per UPDATE / COMMIT
+CHECKPOINT_FILE = os.environ.get(
+    "PROJECTEVAL_RECALC_CHECKPOINT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "recalc_percentage.checkpoint.json"))
+
+# Same value as sp_recalc_percentage stores in DECIMAL(5,2); "* 100.0 /" also keeps SQLite
+# (integer division) from truncating
+RECALC_SQL = """
+    UPDATE Marks
+    SET Percentage = CASE
+                       WHEN MaxMarks IS NOT NULL AND MaxMarks <> 0 AND MarksObtained IS NOT NULL
+                       THEN ROUND(MarksObtained * 100.0 / MaxMarks, 2)
+                       ELSE NULL
+                     END
+    WHERE EvaluationID IN ({ids})
+"""
+
+
+class RecalcError(Exception):
+    pass
+
+
+class CheckpointMismatch(RecalcError):
+    """The checkpoint belongs to a run over a different scope (resume=False starts over)."""
+
+
+def scope_of(first_id=None, last_id=None, date_from=None, date_to=None):
+    """Normalised description of which evaluations a run covers (also the checkpoint key)."""
+    return {"first_id": None if first_id in (None, "") else int(first_id),
+            "last_id": None if last_id in (None, "") else int(last_id),
+            "date_from": str(date_from) if date_from else None,
+            "date_to": str(date_to) if date_to else None}
+
+
+def _where(scope, after):
+    clauses, params = ["EvaluationID > %s"], [after]
+    if scope["first_id"] is not None:
+        clauses.append("EvaluationID >= %s")
+        params.append(scope["first_id"])
+    if scope["last_id"] is not None:
+        clauses.append("EvaluationID <= %s")
+        params.append(scope["last_id"])
+    if scope["date_from"]:
+        clauses.append("EvalDate >= %s")
+        params.append(scope["date_from"])
+    if scope["date_to"]:
+        clauses.append("EvalDate <= %s")
+        params.append(scope["date_to"])
+    return " AND ".join(clauses), params
+
+
+def describe(scope):
+    parts = []
+    if scope["first_id"] is not None or scope["last_id"] is not None:
+        parts.append(f"EvaluationID {scope['first_id'] or 'min'}–{scope['last_id'] or 'max'}")
+    if scope["date_from"] or scope["date_to"]:
+        parts.append(f"EvalDate {scope['date_from'] or '…'} to {scope['date_to'] or '…'}")
+    return ", ".join(parts) or "all evaluations"
+
+
+# ---------- checkpoint ----------
+def load_checkpoint(path, scope):
+    """Last finished EvaluationID for this scope, or None. A different scope is an error."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    if saved.get("scope") != scope:
+        raise CheckpointMismatch(f"Checkpoint {path} is for {describe(saved.get('scope') or {})}; "
+                          "finish that run or delete the file")
+    return saved
+
+
+def _save_checkpoint(path, scope, stats):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"scope": scope, "after_id": stats["after_id"],
+                   "evaluations": stats["evaluations"], "rows": stats["rows"]}, f)
+    os.replace(tmp, path)   # never leaves a half-written checkpoint behind
+
+
+# ---------- main entry ----------
+def recalc_percentages(conn_fn, scope=None, batch_size=BATCH_EVALUATIONS, checkpoint_path=CHECKPOINT_FILE,
+                       resume=True, pause=0.0, on_progress=None, should_stop=None):
+    """Recompute Marks.Percentage for every evaluation in scope. conn_fn() -> (conn, cursor).
+
+    pause = seconds to sleep between batches (gives other writers the locks).
+    should_stop() is checked between batches; a stopped run keeps its checkpoint.
+    Returns stats: evaluations / rows / batches / seconds / rows_per_sec / stopped ...
+    """
+    scope = scope or scope_of()
+    saved = load_checkpoint(checkpoint_path, scope) if resume else None
+    stats = {"scope": describe(scope), "evaluations": 0, "rows": 0, "batches": 0, "total": 0,
+             "fraction": 0.0, "seconds": 0.0, "rows_per_sec": 0.0, "after_id": -2 ** 31,
+             "resumed": saved is not None, "stopped": False}
+    if saved:
+        stats.update(after_id=saved["after_id"], evaluations=saved["evaluations"], rows=saved["rows"])
+    started = time.perf_counter()
+    run_rows = 0
+
+    conn, cursor = conn_fn()
+    try:
+        where, params = _where(scope, stats["after_id"])
+        cursor.execute(f"SELECT COUNT(*) FROM Evaluation WHERE {where}", params)
+        stats["total"] = stats["evaluations"] + int(cursor.fetchone()[0])
+
+        while True:
+            if should_stop and should_stop():
+                stats["stopped"] = True
+                break
+            where, params = _where(scope, stats["after_id"])
+            cursor.execute(f"SELECT EvaluationID FROM Evaluation WHERE {where} "
+                           f"ORDER BY EvaluationID LIMIT {int(batch_size)}", params)
+            ids = [r[0] for r in cursor.fetchall()]
+            if not ids:
+                break
+            cursor.execute(RECALC_SQL.format(ids=",".join(["%s"] * len(ids))), ids)
+            changed = max(cursor.rowcount, 0)
+            conn.commit()
+
+            run_rows += changed
+            stats["rows"] += changed
+            stats["evaluations"] += len(ids)
+            stats["batches"] += 1
+            stats["after_id"] = ids[-1]
+            elapsed = time.perf_counter() - started
+            stats["seconds"] = round(elapsed, 3)
+            stats["rows_per_sec"] = round(run_rows / elapsed, 1) if elapsed else 0.0
+            stats["fraction"] = round(stats["evaluations"] / stats["total"], 4) if stats["total"] else 1.0
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, scope, stats)
+            if on_progress:
+                on_progress(dict(stats))
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if not stats["stopped"]:
+        stats["fraction"] = 1.0
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(run_rows / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def format_stats(stats):
+    lines = [
+        f"Scope: {stats['scope']}" + (" (resumed)" if stats["resumed"] else ""),
+        f"Evaluations: {stats['evaluations']:,} of {stats['total']:,}",
+        f"Marks rows changed: {stats['rows']:,}",
+        f"Time: {stats['seconds']:.1f}s in {stats['batches']} batch(es) ({stats['rows_per_sec']:,.0f} rows/s)",
+    ]
+    if stats["stopped"]:
+        lines.append(f"Stopped after EvaluationID {stats['after_id']} — run again to resume")
+    return "\n".join(lines)
@@ -0,0 +1,345 @@
+# ==============================
+# COMPACT ROW STORE
+#   Fetched rows kept column by column instead of one tuple of Python
+#   objects per row: ints in array('q'), DECIMALs as scaled ints (exact, and
+#   str() gives the same text), floats in array('d'), dates as day numbers,
+#   repeated strings (Dept, Domain, Technology, TeamName, ...) dictionary-coded
+#   so each distinct value is stored once, other strings in one list per
+#   column. NULLs are a per-column bytearray made on the first NULL.
+#   Rows are rebuilt as tuples when read, so code that indexes / iterates
+#   rows works unchanged. Type codes follow the .pecol export (export_data.py).
+# ==============================
+import datetime
+import gc
+import sys
+import time
+import tracemalloc
+from array import array
+from decimal import Decimal
+
+# Always dictionary-coded; other text columns are while few of their values are distinct
+INTERNED = {"Dept", "Domain", "Technology", "TeamName", "Grade", "Duration"}
+DICT_MAX_DISTINCT = 0.5     # share of distinct values above which a text column is stored plainly
+DICT_MIN_ROWS = 256         # ... checked once a column has this many rows
+FETCH_ROWS = 10000
+
+
+class _Column:
+    """One column: kind is None (all NULL so far), i, n (decimal), f, D, s (dictionary), t (text) or o."""
+
+    def __init__(self, interned=False):
+        self.kind = None
+        self.data = []
+        self.nulls = None
+        self.scale = 0
+        self.labels = None
+        self.index = None
+        self.interned = interned
+        self.n = 0
+
+    # ---------- writing ----------
+    @staticmethod
+    def _kind_of(v):
+        if isinstance(v, bool):
+            return "o"
+        if isinstance(v, int):
+            return "i"
+        if isinstance(v, Decimal):
+            return "n"
+        if isinstance(v, float):
+            return "f"
+        if isinstance(v, datetime.date) and not isinstance(v, datetime.datetime):
+            return "D"
+        if isinstance(v, str):
+            return "s"
+        return "o"
+
+    def _start(self, kind, sample):
+        self.kind = kind
+        if kind in ("i", "n"):
+            self.data = array("q", bytes(8 * self.n))
+            self.scale = -sample.as_tuple().exponent if kind == "n" else 0
+        elif kind == "f":
+            self.data = array("d", bytes(8 * self.n))
+        elif kind == "D":
+            self.data = array("i", bytes(4 * self.n))
+        elif kind == "s":
+            self.data = array("i", bytes(4 * self.n))
+            self.labels, self.index = [""], {"": 0}
+        else:
+            self.data = [None] * self.n
+
+    def _fits(self, v):
+        kind = self._kind_of(v)
+        if kind != self.kind and not (self.kind == "t" and kind == "s"):
+            return False
+        if kind == "i":
+            return -(1 << 63) <= v < (1 << 63)
+        if kind == "n":
+            t = v.as_tuple()
+            return isinstance(t.exponent, int) and -t.exponent == self.scale and abs(v) < 10 ** (18 - self.scale)
+        return True
+
+    def _to_objects(self):
+        """Fall back to a plain list (mixed types, values that don't fit)."""
+        values = [self.get(i) for i in range(self.n)]
+        self.kind, self.data, self.nulls, self.labels, self.index = "o", values, None, None, None
+
+    def _to_text(self):
+        values = [self.labels[c] for c in self.data]
+        self.kind, self.data, self.labels, self.index = "t", values, None, None
+
+    def _extend_fast(self, values):
+        """Whole batch without NULLs in one go; False if a value doesn't fit the column."""
+        kind = self.kind
+        try:
+            if kind == "i":
+                self.data.extend(array("q", values))
+            elif kind == "f":
+                if any(type(v) is not float for v in values):
+                    return False
+                self.data.extend(array("d", values))
+            elif kind == "n":
+                if any(type(v) is not Decimal or v.as_tuple().exponent != -self.scale for v in values):
+                    return False
+                self.data.extend(array("q", [int(v.scaleb(self.scale)) for v in values]))
+            elif kind == "D":
+                if any(type(v) is not datetime.date for v in values):
+                    return False
+                self.data.extend(array("i", [v.toordinal() for v in values]))
+            elif kind in ("t", "o") and (kind == "o" or all(type(v) is str for v in values)):
+                self.data.extend(values)
+            else:
+                return False
+        except (TypeError, OverflowError):
+            return False
+        if self.nulls is not None:
+            self.nulls.extend(bytes(len(values)))
+        self.n += len(values)
+        return True
+
+    def _extend_codes(self, values):
+        """Dictionary-code a batch of strings / NULLs; False if something else is in it."""
+        if not all(type(v) is str or v is None for v in values):
+            return False
+        index = self.index
+        self.data.extend(array("i", [0 if v is None else index.setdefault(v, len(index)) for v in values]))
+        if len(index) != len(self.labels):
+            self.labels = list(index)
+        if self.nulls is not None or None in values:
+            if self.nulls is None:
+                self.nulls = bytearray(self.n)
+            self.nulls.extend(bytes(v is None for v in values))
+        self.n += len(values)
+        if (not self.interned and self.n >= DICT_MIN_ROWS
+                and len(self.labels) > DICT_MAX_DISTINCT * self.n):
+            self._to_text()
+        return True
+
+    def extend(self, values):
+        start = self.n
+        if self.kind is None:
+            first = next((v for v in values if v is not None), None)
+            if first is not None:
+                self._start(self._kind_of(first), first)
+        if self.kind == "s":
+            if self._extend_codes(values):
+                return
+        elif None not in values and self._extend_fast(values):
+            return
+        for v in values:
+            if v is None:
+                if self.nulls is None:
+                    self.nulls = bytearray(self.n)
+                self.nulls.append(1)
+                self._put(None)
+            else:
+                if self.kind is None:
+                    self._start(self._kind_of(v), v)
+                elif self.kind != "o" and not self._fits(v):
+                    self._to_objects()
+                if self.nulls is not None:
+                    self.nulls.append(0)
+                self._put(v)
+            self.n += 1
+        if (self.kind == "s" and not self.interned and self.n >= DICT_MIN_ROWS
+                and len(self.labels) > DICT_MAX_DISTINCT * self.n and start < self.n):
+            self._to_text()
+
+    def _put(self, v):
+        kind = self.kind
+        if kind is None:
+            return
+        if kind == "i":
+            self.data.append(0 if v is None else v)
+        elif kind == "n":
+            self.data.append(0 if v is None else int(v.scaleb(self.scale)))
+        elif kind == "f":
+            self.data.append(0.0 if v is None else v)
+        elif kind == "D":
+            self.data.append(0 if v is None else v.toordinal())
+        elif kind == "s":
+            code = 0 if v is None else self.index.get(v)
+            if code is None:
+                code = self.index[v] = len(self.labels)
+                self.labels.append(v)
+            self.data.append(code)
+        else:
+            self.data.append(v)
+
+    # ---------- reading ----------
+    def get(self, i):
+        if self.kind is None or (self.nulls is not None and self.nulls[i]):
+            return None
+        v = self.data[i]
+        kind = self.kind
+        if kind == "n":
+            return Decimal(v).scaleb(-self.scale)
+        if kind == "D":
+            return datetime.date.fromordinal(v)
+        if kind == "s":
+            return self.labels[v]
+        return v
+
+    def nbytes(self):
+        """Approximate bytes held by this column."""
+        size = sys.getsizeof(self.nulls) if self.nulls is not None else 0
+        if isinstance(self.data, array):
+            size += sys.getsizeof(self.data)
+        else:
+            size += sys.getsizeof(self.data) + sum(sys.getsizeof(v) for v in self.data if v is not None)
+        if self.labels is not None:
+            size += sys.getsizeof(self.labels) + sys.getsizeof(self.index) + sum(map(sys.getsizeof, self.labels))
+        return size
+
+
+class RowStore:
+    """Column-oriented rows with the read interface of a list of tuples (len, [i], [a:b], iteration)."""
+
+    def __init__(self, names=None, width=None):
+        self.names = list(names) if names else None
+        self.width = width if width is not None else len(self.names or ())
+        self._cols = [_Column(self._interned(j)) for j in range(self.width)]
+        self._n = 0
+
+    def _interned(self, j):
+        return bool(self.names) and j < len(self.names) and self.names[j] in INTERNED
+
+    @classmethod
+    def from_rows(cls, rows, names=None):
+        if isinstance(rows, RowStore):
+            return rows
+        rows = rows if isinstance(rows, list) else list(rows)
+        store = cls(names, len(rows[0]) if rows else len(names or ()))
+        store.extend(rows)
+        return store
+
+    def extend(self, rows):
+        """Add rows (sequences of width values)."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return
+        if not self._cols:
+            self.width = len(rows[0])
+            self._cols = [_Column(self._interned(j)) for j in range(self.width)]
+        for col, values in zip(self._cols, zip(*rows)):
+            col.extend(values)
+        self._n += len(rows)
+
+    def append(self, row):
+        self.extend([row])
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(k) for k in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("row index out of range")
+        return self.row(i)
+
+    def row(self, i):
+        return tuple(col.get(i) for col in self._cols)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self.row(i)
+
+    def column(self, j):
+        """Values of column j (by index or name) as a list."""
+        if isinstance(j, str):
+            j = self.names.index(j)
+        col = self._cols[j]
+        return [col.get(i) for i in range(self._n)]
+
+    def kinds(self):
+        return [col.kind or "-" for col in self._cols]
+
+    def nbytes(self):
+        """Approximate bytes held by the store (what tracemalloc would attribute to it)."""
+        return sys.getsizeof(self) + sum(col.nbytes() for col in self._cols)
+
+
+def fetch_store(cursor, names=None, fetch_rows=FETCH_ROWS):
+    """The rest of cursor's result as a RowStore, fetched a chunk at a time
+    (the full list of tuples never exists). names default to the cursor's columns."""
+    store = RowStore(names or [d[0] for d in cursor.description])
+    while True:
+        rows = cursor.fetchmany(fetch_rows)
+        if not rows:
+            return store
+        store.extend(rows)
+
+
+# ---------- measurement ----------
+def measure_table(conn_fn, table, limit=None, fetch_rows=FETCH_ROWS):
+    """Memory of a table held as fetched (list of tuples) vs as a RowStore, via tracemalloc.
+
+    Returns {"table", "rows", "tuple_bytes", "store_bytes", "reduction", "kinds", "convert_seconds"}.
+    """
+    sql = f"SELECT * FROM {table}" + (f" LIMIT {int(limit)}" if limit else "")
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        conn, cursor = conn_fn()
+        try:
+            cursor.execute(sql)
+            names = [d[0] for d in cursor.description]
+            base = tracemalloc.get_traced_memory()[0]
+            rows = []
+            while True:
+                batch = cursor.fetchmany(fetch_rows)
+                if not batch:
+                    break
+                rows.extend(batch)
+        finally:
+            conn.close()
+        gc.collect()
+        tuple_bytes = tracemalloc.get_traced_memory()[0] - base
+        started = time.perf_counter()
+        store = RowStore.from_rows(rows, names)
+        convert_seconds = time.perf_counter() - started
+        n = len(rows)
+        del rows, batch
+        gc.collect()
+        store_bytes = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {"table": table, "rows": n, "tuple_bytes": tuple_bytes, "store_bytes": store_bytes,
+            "reduction": round(1 - store_bytes / tuple_bytes, 3) if tuple_bytes else 0.0,
+            "kinds": dict(zip(names, store.kinds())), "convert_seconds": round(convert_seconds, 3)}
+
+
+def format_measure(m):
+    mb = 1024 * 1024
+    return (f"{m['table']}: {m['rows']:,} rows\n"
+            f"  list of tuples: {m['tuple_bytes'] / mb:10.1f} MB\n"
+            f"  RowStore:       {m['store_bytes'] / mb:10.1f} MB  ({m['reduction']:.0%} less, "
+            f"built in {m['convert_seconds']:.2f}s)\n"
+            f"  column kinds:   {', '.join(f'{c}={k}' for c, k in m['kinds'].items())}")
@@ -0,0 +1,733 @@
+# ==============================
+# SERVICE LAYER (no Tk imports)
+#   Every SQL operation the app performs lives here, so the GUI, the CLI
+#   (projecteval_cli.py) and batch jobs share one data-access path.
+#   Functions raise exceptions; showing them is the caller's job.
+# ==============================
+import os
+import re
+import time
+
+from db_pool import ConnectionPool
+from paging import build_where, count_rows
+from perf_metrics import METRICS, TimedConnection, TimedCursor, caller_tag
+from read_cache import ReadCache
+from row_store import fetch_store
+import summary_mv
+
+
+# ==============================
+# DATABASE CONFIG
+#   Environment variables override the defaults (handy for cron / servers).
+# ==============================
+DB_CONFIG = {
+    'host': os.environ.get('PROJECTEVAL_DB_HOST', 'localhost'),
+    'user': os.environ.get('PROJECTEVAL_DB_USER', 'root'),
+    'password': os.environ.get('PROJECTEVAL_DB_PASSWORD', 'kavya@0108'),
+    'database': os.environ.get('PROJECTEVAL_DB_NAME', 'project_eval')
+}
+
+
+# PROJECTEVAL_BACKEND=sqlite: local file instead of the server (see sqlite_backend.py)
+BACKEND = os.environ.get('PROJECTEVAL_BACKEND', 'mysql').strip().lower()
+SQLITE_PATH = os.environ.get('PROJECTEVAL_SQLITE_PATH', 'project_eval.sqlite3')
+
+
+def _mysql_connect():
+    # Imported on first use so CLI start-up (e.g. --help) doesn't pay for it
+    import mysql.connector
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def _sqlite_connect():
+    import sqlite_backend
+    return sqlite_backend.connect(SQLITE_PATH)
+
+
+BACKENDS = {"mysql": _mysql_connect, "sqlite": _sqlite_connect}
+
+
+class ServiceError(Exception):
+    """Invalid input caught before it reaches MySQL."""
+
+
+if BACKEND not in BACKENDS:
+    raise ServiceError(f"PROJECTEVAL_BACKEND={BACKEND!r}: use one of {', '.join(BACKENDS)}")
+
+# Shared connection pool: connections are opened lazily and reused between calls.
+# conn.close() returns the connection to the pool.
+DB_POOL = ConnectionPool(BACKENDS[BACKEND], max_size=5, timeout=10.0)
+
+
+def use_backend(name, sqlite_path=None):
+    """Switch backend (and SQLite file) for everything that uses DB_POOL from now on."""
+    global BACKEND, SQLITE_PATH
+    if name not in BACKENDS:
+        raise ServiceError(f"Unknown backend {name!r}: use one of {', '.join(BACKENDS)}")
+    BACKEND = name
+    SQLITE_PATH = sqlite_path or SQLITE_PATH
+    DB_POOL.close_all()
+    DB_POOL.connect_fn = BACKENDS[name]
+    READ_CACHE.clear()
+
+
+def backend_label():
+    return f"SQLite ({SQLITE_PATH})" if BACKEND == "sqlite" else f"MySQL ({DB_CONFIG['host']}/{DB_CONFIG['database']})"
+
+
+def _mysql_only(what):
+    if BACKEND != "mysql":
+        raise ServiceError(f"{what} needs the MySQL backend")
+
+
+# Small helper: borrow pooled connection + cursor (timed, see perf_metrics)
+def get_conn_cursor():
+    op = METRICS.begin(caller_tag())   # None inside a DbWorker job (already being timed)
+    started = time.perf_counter()
+    try:
+        conn = DB_POOL.acquire()
+    except Exception as e:
+        if op is not None:
+            METRICS.end(op, type(e).__name__)
+        raise
+    METRICS.add("connect", (time.perf_counter() - started) * 1000)
+    if op is not None:
+        conn = TimedConnection(conn, METRICS, op)
+    return conn, TimedCursor(conn.cursor(), METRICS)
+
+
+# ==============================
+# READ CACHE
+#   Slow-changing tables and the report views are served from memory
+#   (LRU + TTL). Writes through this module invalidate what they touch.
+# ==============================
+CACHE_TTL = {                      # seconds; tables not listed are never cached
+    "Team": 300, "Project": 300, "Evaluation": 300,
+    "vw_project_summary": 60, "vw_top_projects": 60,
+}
+VIEW_TABLES = {
+    "vw_project_summary": {"Project", "Team", "Grade"},
+    "vw_top_projects": {"Project", "Grade"},
+}
+# Writes that reach other tables through ON DELETE CASCADE / SET NULL
+WRITE_CASCADES = {
+    "Student": {"Team", "TeamMember"},
+    "Team": {"Project", "TeamMember"},
+    "Project": {"Grade", "Faculty"},
+    "Evaluation": {"Marks", "Faculty"},
+}
+READ_CACHE = ReadCache(max_entries=256)
+
+
+def cached_read(name, key, loader):
+    """loader() through the cache if name (table or view) is cacheable."""
+    if name not in CACHE_TTL:
+        return loader()
+    return READ_CACHE.get_or_load(key, {name} | VIEW_TABLES.get(name, set()), loader,
+                                  ttl=CACHE_TTL[name], label=name)
+
+
+def invalidate(*tables):
+    """Drop cached reads of tables and of everything their cascades reach."""
+    todo, seen = list(tables), set()
+    while todo:
+        t = todo.pop()
+        if t not in seen:
+            seen.add(t)
+            todo.extend(WRITE_CASCADES.get(t, ()))
+    READ_CACHE.invalidate(*seen)
+
+
+def write_through(tables, fn, *args, **kwargs):
+    """Run a write helper from another module (import, grading, ...) and invalidate tables."""
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        invalidate(*tables)
+
+
+def cache_stats():
+    return READ_CACHE.stats()
+
+
+# Results come back as RowStores (row_store.py): column arrays, not a tuple per row
+def fetch_rows(sql, params=None):
+    conn, cursor = get_conn_cursor()
+    try:
+        cursor.execute(sql, params or ())
+        return fetch_store(cursor)
+    finally:
+        conn.close()
+
+
+def fetch_with_columns(sql, params=None):
+    conn, cursor = get_conn_cursor()
+    try:
+        cursor.execute(sql, params or ())
+        rows = fetch_store(cursor)
+        return rows.names, rows
+    finally:
+        conn.close()
+
+
+def fetch_page(table, sql, params):
+    """One page of a paged tab (see paging.Pager)."""
+    return cached_read(table, ("page", sql, tuple(params)), lambda: fetch_rows(sql, params))
+
+
+def fetch_first_page(table, sql, params, where="", where_params=()):
+    """First page plus the (filtered) row count, in one round of the worker."""
+    def load():
+        conn, cursor = get_conn_cursor()
+        try:
+            total, is_estimate = count_rows(cursor, table, where, where_params)
+            cursor.execute(sql, params)
+            return fetch_store(cursor), total, is_estimate
+        finally:
+            conn.close()
+    return cached_read(table, ("first", sql, tuple(params)), load)
+
+
+def run_statements(*stmts):
+    """Run statements in one transaction. Each stmt is "SQL" or ("SQL", params)."""
+    conn, cursor = get_conn_cursor()
+    try:
+        for stmt in stmts:
+            sql, params = (stmt, ()) if isinstance(stmt, str) else stmt
+            cursor.execute(sql, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def write_and_refetch(stmts, table, match_cols, match_vals):
+    """Apply a write, then read back only the affected rows plus the table's row count.
+
+    Returns (rows_affected, fresh_rows, total, total_is_estimate).
+    """
+    conn, cursor = get_conn_cursor()
+    try:
+        for stmt in stmts:
+            sql, params = (stmt, ()) if isinstance(stmt, str) else stmt
+            cursor.execute(sql, params)
+        affected = cursor.rowcount
+        conn.commit()
+        invalidate(table)
+        where = " AND ".join(f"{c}=%s" for c in match_cols)
+        cursor.execute(f"SELECT * FROM {table} WHERE {where}", tuple(match_vals))
+        rows = cursor.fetchall()
+        total, is_estimate = count_rows(cursor, table)
+        return affected, rows, total, is_estimate
+    finally:
+        conn.close()
+
+
+def fetch_by_keys(table, key_col, keys):
+    """Current rows whose key_col is one of keys, plus the table's row count (change feed patches).
+
+    Returns (rows, total, total_is_estimate).
+    """
+    keys = list(keys)
+    conn, cursor = get_conn_cursor()
+    try:
+        cursor.execute(f"SELECT * FROM {table} WHERE {key_col} IN ({', '.join(['%s'] * len(keys))})", tuple(keys))
+        rows = cursor.fetchall()
+        total, is_estimate = count_rows(cursor, table)
+        return rows, total, is_estimate
+    finally:
+        conn.close()
+
+
+def call_procedure(name, args):
+    conn, cursor = get_conn_cursor()
+    try:
+        cursor.callproc(name, args)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def pool_stats():
+    return DB_POOL.stats()
+
+
+# ============================================================
+# ENTITIES — column order matches SELECT * / the GUI forms
+#   key = columns that identify the affected rows after a write
+#   (Marks has no primary key; its rows are matched on EvaluationID)
+# ============================================================
+ENTITIES = {
+    "student":    {"table": "Student",    "key": ["StudentID"],
+                   "columns": ["StudentID", "Dept", "Year", "Fname", "Lname", "Age", "PhoneNo"]},
+    "team":       {"table": "Team",       "key": ["TeamID"],
+                   "columns": ["TeamID", "TeamName", "Members", "StudentID"]},
+    "project":    {"table": "Project",    "key": ["ProjectID"],
+                   "columns": ["ProjectID", "Title", "Domain", "Technology", "Duration", "TeamID"]},
+    "marks":      {"table": "Marks",      "key": ["EvaluationID"],
+                   "columns": ["MarksObtained", "MaxMarks", "Percentage", "EvaluationID"]},
+    "evaluation": {"table": "Evaluation", "key": ["EvaluationID"],
+                   "columns": ["EvaluationID", "TotalMarks", "Rounds", "EvalDate", "Comments"]},
+    "grade":      {"table": "Grade",      "key": ["ProjectID"],
+                   "columns": ["Grade", "FinalScore", "ProjectID"]},
+}
+
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")   # a bare table / view name, as in export_data
+
+
+def list_table(table, limit=None, filters=None):
+    """filters: filter bar values for the table (see paging.build_where)."""
+    if not _IDENT.match(str(table)):
+        raise ServiceError(f"Not a table or view name: {table!r}")
+    sql, params = f"SELECT * FROM {table}", ()
+    if filters:
+        where, params, errors = build_where(table, filters)
+        if errors:
+            raise ServiceError("; ".join(errors))
+        if where:
+            sql += f" WHERE {where}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return fetch_with_columns(sql, params)
+
+
+# ---------- Students ----------
+def add_student(v):
+    return write_and_refetch([("INSERT INTO Student VALUES (%s,%s,%s,%s,%s,%s,%s)", tuple(v))],
+                             "Student", ["StudentID"], [v[0]])
+
+
+def update_student(v):
+    return write_and_refetch([("""
+        UPDATE Student
+        SET Dept=%s, Year=%s, Fname=%s, Lname=%s, Age=%s, PhoneNo=%s
+        WHERE StudentID=%s
+    """, (v[1], v[2], v[3], v[4], v[5], v[6], v[0]))], "Student", ["StudentID"], [v[0]])
+
+
+def delete_student(sid):
+    return write_and_refetch([("DELETE FROM Student WHERE StudentID=%s", (sid,))],
+                             "Student", ["StudentID"], [sid])
+
+
+# ---------- Teams ----------
+def add_team(v):
+    return write_and_refetch([("INSERT INTO Team VALUES (%s,%s,%s,%s)", tuple(v))],
+                             "Team", ["TeamID"], [v[0]])
+
+
+def update_team(v):
+    return write_and_refetch([("""
+        UPDATE Team SET TeamName=%s, Members=%s, StudentID=%s
+        WHERE TeamID=%s
+    """, (v[1], v[2], v[3], v[0]))], "Team", ["TeamID"], [v[0]])
+
+
+def delete_team(tid):
+    return write_and_refetch([("DELETE FROM Team WHERE TeamID=%s", (tid,))],
+                             "Team", ["TeamID"], [tid])
+
+
+# ---------- Projects ----------
+def add_project(v):
+    return write_and_refetch([("INSERT INTO Project VALUES (%s,%s,%s,%s,%s,%s)", tuple(v))],
+                             "Project", ["ProjectID"], [v[0]])
+
+
+def update_project(v):
+    return write_and_refetch([("""
+        UPDATE Project
+        SET Title=%s, Domain=%s, Technology=%s, Duration=%s, TeamID=%s
+        WHERE ProjectID=%s
+    """, (v[1], v[2], v[3], v[4], v[5], v[0]))], "Project", ["ProjectID"], [v[0]])
+
+
+def delete_project(pid):
+    return write_and_refetch([("DELETE FROM Project WHERE ProjectID=%s", (pid,))],
+                             "Project", ["ProjectID"], [pid])
+
+
+# ---------- Marks (v = MarksObtained, MaxMarks, Percentage, EvaluationID) ----------
+def add_marks(v):
+    # Percentage is NULL; trigger will compute it automatically IF created
+    return write_and_refetch([("INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) "
+                               "VALUES (%s,%s,NULL,%s)", (v[0], v[1], v[3]))],
+                             "Marks", ["EvaluationID"], [v[3]])
+
+
+def update_marks(v):
+    # v[4] = MarkID (schema with migration 1): that row only, else every row of the evaluation
+    if len(v) > 4 and v[4] not in (None, ""):
+        return write_and_refetch([("UPDATE Marks SET MarksObtained=%s, MaxMarks=%s, Percentage=NULL "
+                                   "WHERE MarkID=%s", (v[0], v[1], v[4]))], "Marks", ["MarkID"], [v[4]])
+    return write_and_refetch([("""
+        UPDATE Marks
+        SET MarksObtained=%s, MaxMarks=%s, Percentage=NULL
+        WHERE EvaluationID=%s
+    """, (v[0], v[1], v[3]))], "Marks", ["EvaluationID"], [v[3]])
+
+
+def delete_marks(eid, mark_id=None):
+    if mark_id not in (None, ""):
+        return write_and_refetch([("DELETE FROM Marks WHERE MarkID=%s", (mark_id,))],
+                                 "Marks", ["MarkID"], [mark_id])
+    return write_and_refetch([("DELETE FROM Marks WHERE EvaluationID=%s", (eid,))],
+                             "Marks", ["EvaluationID"], [eid])
+
+
+def recalc_percentage(eid):
+    """Calls stored procedure sp_recalc_percentage(eid) created in DB Tools."""
+    try:
+        eid = int(eid)
+    except (TypeError, ValueError):
+        raise ServiceError(f"EvaluationID must be a number (got {eid!r})")
+    write_through(["Marks"], call_procedure, "sp_recalc_percentage", [eid])
+
+
+# ---------- Evaluations ----------
+def add_evaluation(v):
+    return write_and_refetch([("INSERT INTO Evaluation VALUES (%s,%s,%s,%s,%s)", tuple(v))],
+                             "Evaluation", ["EvaluationID"], [v[0]])
+
+
+def update_evaluation(v):
+    return write_and_refetch([("""
+        UPDATE Evaluation
+        SET TotalMarks=%s, Rounds=%s, EvalDate=%s, Comments=%s
+        WHERE EvaluationID=%s
+    """, (v[1], v[2], v[3], v[4], v[0]))], "Evaluation", ["EvaluationID"], [v[0]])
+
+
+def delete_evaluation(eid):
+    return write_and_refetch([("DELETE FROM Evaluation WHERE EvaluationID=%s", (eid,))],
+                             "Evaluation", ["EvaluationID"], [eid])
+
+
+# ---------- Grades (v = Grade, FinalScore, ProjectID) ----------
+def add_grade(v):
+    return write_and_refetch([("INSERT INTO Grade VALUES (%s,%s,%s)", tuple(v))],
+                             "Grade", ["ProjectID"], [v[2]])
+
+
+def update_grade(v):
+    return write_and_refetch([("""
+        UPDATE Grade
+        SET Grade=%s, FinalScore=%s
+        WHERE ProjectID=%s
+    """, (v[0], v[1], v[2]))], "Grade", ["ProjectID"], [v[2]])
+
+
+def delete_grade(pid):
+    return write_and_refetch([("DELETE FROM Grade WHERE ProjectID=%s", (pid,))],
+                             "Grade", ["ProjectID"], [pid])
+
+
+# ---------- Batched edits ----------
+# Same statements as the single-row functions above, as (sql, values -> params);
+# deletes take the key value.
+BATCH_SQL = {
+    "student": {
+        "insert": ("INSERT INTO Student VALUES (%s,%s,%s,%s,%s,%s,%s)", lambda v: tuple(v[:7])),
+        "update": ("UPDATE Student SET Dept=%s, Year=%s, Fname=%s, Lname=%s, Age=%s, PhoneNo=%s "
+                   "WHERE StudentID=%s", lambda v: (v[1], v[2], v[3], v[4], v[5], v[6], v[0])),
+        "delete": ("DELETE FROM Student WHERE StudentID=%s", lambda k: (k,)),
+    },
+    "team": {
+        "insert": ("INSERT INTO Team VALUES (%s,%s,%s,%s)", lambda v: tuple(v[:4])),
+        "update": ("UPDATE Team SET TeamName=%s, Members=%s, StudentID=%s WHERE TeamID=%s",
+                   lambda v: (v[1], v[2], v[3], v[0])),
+        "delete": ("DELETE FROM Team WHERE TeamID=%s", lambda k: (k,)),
+    },
+    "project": {
+        "insert": ("INSERT INTO Project VALUES (%s,%s,%s,%s,%s,%s)", lambda v: tuple(v[:6])),
+        "update": ("UPDATE Project SET Title=%s, Domain=%s, Technology=%s, Duration=%s, TeamID=%s "
+                   "WHERE ProjectID=%s", lambda v: (v[1], v[2], v[3], v[4], v[5], v[0])),
+        "delete": ("DELETE FROM Project WHERE ProjectID=%s", lambda k: (k,)),
+    },
+    "marks": {
+        "insert": ("INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) VALUES (%s,%s,NULL,%s)",
+                   lambda v: (v[0], v[1], v[3])),
+        "update": ("UPDATE Marks SET MarksObtained=%s, MaxMarks=%s, Percentage=NULL WHERE EvaluationID=%s",
+                   lambda v: (v[0], v[1], v[3])),
+        "delete": ("DELETE FROM Marks WHERE EvaluationID=%s", lambda k: (k,)),
+    },
+    "evaluation": {
+        "insert": ("INSERT INTO Evaluation VALUES (%s,%s,%s,%s,%s)", lambda v: tuple(v[:5])),
+        "update": ("UPDATE Evaluation SET TotalMarks=%s, Rounds=%s, EvalDate=%s, Comments=%s "
+                   "WHERE EvaluationID=%s", lambda v: (v[1], v[2], v[3], v[4], v[0])),
+        "delete": ("DELETE FROM Evaluation WHERE EvaluationID=%s", lambda k: (k,)),
+    },
+    "grade": {
+        "insert": ("INSERT INTO Grade VALUES (%s,%s,%s)", lambda v: tuple(v[:3])),
+        "update": ("UPDATE Grade SET Grade=%s, FinalScore=%s WHERE ProjectID=%s", lambda v: (v[0], v[1], v[2])),
+        "delete": ("DELETE FROM Grade WHERE ProjectID=%s", lambda k: (k,)),
+    },
+}
+# Marks one row at a time once migration 1 added MarkID (values: the tab's columns, MarkID last);
+# BATCH_SQL["marks"] is the fallback for older schemas and hits every row of an EvaluationID
+MARK_ROW_SQL = {
+    "update": ("UPDATE Marks SET MarksObtained=%s, MaxMarks=%s, Percentage=NULL WHERE MarkID=%s",
+               lambda v: (v[0], v[1], v[4])),
+    "delete": ("DELETE FROM Marks WHERE MarkID=%s", lambda k: (k,)),
+}
+
+
+def batch_key(entity):
+    """Columns staged edits of an entity are keyed by: MarkID for Marks once
+    migrations.use_schema_keys found it, else the entity's key."""
+    if entity == "marks" and "MarkID" in ENTITIES["marks"]["columns"]:
+        return ["MarkID"]
+    return ENTITIES[entity]["key"]
+
+
+def batch_sql(entity):
+    """BATCH_SQL of an entity, with Marks updates / deletes by MarkID when batch_key() says so."""
+    if batch_key(entity) == ["MarkID"]:
+        return dict(BATCH_SQL[entity], **MARK_ROW_SQL)
+    return BATCH_SQL[entity]
+
+
+def apply_batch(entity, inserts=(), updates=(), deletes=()):
+    """Apply staged edits in one transaction: deletes, then updates, then inserts,
+    one executemany each. Any error rolls the whole batch back (ServiceError).
+
+    Returns {"deleted", "updated", "inserted", "requested", "seconds"}; updated
+    counts rows whose values actually changed.
+    """
+    spec = batch_sql(entity)
+    table = ENTITIES[entity]["table"]
+    started = time.perf_counter()
+    out = {"requested": len(inserts) + len(updates) + len(deletes)}
+    conn, cursor = get_conn_cursor()
+    try:
+        for kind, done, items in (("delete", "deleted", deletes), ("update", "updated", updates),
+                                  ("insert", "inserted", inserts)):
+            out[done] = 0
+            if items:
+                sql, to_params = spec[kind]
+                cursor.executemany(sql, [to_params(v) for v in items])
+                out[done] = max(cursor.rowcount, 0)
+        conn.commit()
+        invalidate(table)
+    except Exception as e:
+        conn.rollback()
+        raise ServiceError(f"Batch rolled back, nothing was saved: {e}")
+    finally:
+        conn.close()
+    out["seconds"] = round(time.perf_counter() - started, 3)
+    return out
+
+
+# ============================================================
+# REPORTS (VIEWS) + RUBRIC QUERIES
+# ============================================================
+# Both return (columns, rows, source): source is "materialized" when project_summary_mv
+# is enabled and current (see summary_mv.py), otherwise "view".
+def project_summary():
+    return cached_read("vw_project_summary", "summary", lambda: summary_mv.read_summary(get_conn_cursor))
+
+
+def top_projects(limit=10):
+    return cached_read("vw_top_projects", ("top", int(limit)),
+                       lambda: summary_mv.read_top(get_conn_cursor, limit))
+
+
+def enable_summary_table():
+    _mysql_only("The summary table")   # on SQLite the reports read the views
+    return write_through(list(VIEW_TABLES), summary_mv.enable, get_conn_cursor)
+
+
+def rebuild_summary_table():
+    _mysql_only("The summary table")
+    return write_through(list(VIEW_TABLES), summary_mv.rebuild, get_conn_cursor)
+
+
+def disable_summary_table():
+    write_through(list(VIEW_TABLES), summary_mv.disable, get_conn_cursor)
+
+
+NESTED_QUERY_SQL = """
+    SELECT ProjectID, FinalScore
+    FROM Grade
+    WHERE FinalScore > (SELECT AVG(FinalScore) FROM Grade)
+"""
+
+JOIN_QUERY_SQL = """
+    SELECT s.StudentID, s.Fname, t.TeamName
+    FROM Student s
+    JOIN Team t ON s.StudentID = t.StudentID
+"""
+
+AGGREGATE_QUERY_SQL = """
+    SELECT Domain, COUNT(*) AS TotalProjects
+    FROM Project
+    GROUP BY Domain
+"""
+
+RUBRIC_QUERIES = {
+    "nested": NESTED_QUERY_SQL,
+    "join": JOIN_QUERY_SQL,
+    "aggregate": AGGREGATE_QUERY_SQL,
+}
+
+
+def run_rubric_query(name):
+    if name not in RUBRIC_QUERIES:
+        raise ServiceError(f"Unknown query {name!r} (choose {', '.join(RUBRIC_QUERIES)})")
+    return fetch_with_columns(RUBRIC_QUERIES[name])
+
+
+# ============================================================
+# USERS / PRIVILEGES
+# ============================================================
+ALLOWED_PRIVILEGES = ["SELECT", "INSERT", "UPDATE", "DELETE", "ALL PRIVILEGES"]
+SYSTEM_USERS = {"root", "mysql.session", "mysql.sys", "debian-sys-maint"}
+
+
+def list_users():
+    _mysql_only("User management")
+    return fetch_with_columns("SELECT User, Host FROM mysql.user")
+
+
+def create_user(username, password):
+    _mysql_only("User management")
+    username, password = (username or "").strip(), (password or "").strip()
+    if not username or not password:
+        raise ServiceError("Enter username and password")
+    run_statements(("CREATE USER %s@'localhost' IDENTIFIED BY %s", (username, password)))
+
+
+def grant_privileges(username, privileges):
+    _mysql_only("User management")
+    username = (username or "").strip()
+    if not username:
+        raise ServiceError("Enter username to grant privileges")
+    chosen = [p.strip().upper() for p in privileges if p.strip()]
+    if not chosen:
+        raise ServiceError("Choose at least one privilege")
+    bad = [p for p in chosen if p not in ALLOWED_PRIVILEGES]
+    if bad:
+        # Privileges are spliced into the GRANT text, so only known words are allowed
+        raise ServiceError(f"Unknown privilege(s): {', '.join(bad)}")
+    privilege_sql = "ALL PRIVILEGES" if "ALL PRIVILEGES" in chosen else ", ".join(chosen)
+    run_statements((f"GRANT {privilege_sql} ON project_eval.* TO %s@'localhost'", (username,)),
+                   "FLUSH PRIVILEGES")
+
+
+def delete_user(user, host):
+    _mysql_only("User management")
+    # Avoid accidental removal of system accounts
+    if user in SYSTEM_USERS:
+        raise ServiceError("Cannot delete system users")
+    run_statements(("DROP USER %s@%s", (user, host)), "FLUSH PRIVILEGES")
+
+
+# ============================================================
+# DB TOOLS — TRIGGERS / PROCEDURES / VIEWS DDL
+# ============================================================
+TRIGGER_DDL = [
+    "DROP TRIGGER IF EXISTS trg_marks_set_percentage",
+    """
+    CREATE TRIGGER trg_marks_set_percentage
+    BEFORE INSERT ON Marks
+    FOR EACH ROW
+    BEGIN
+        IF NEW.MaxMarks IS NOT NULL AND NEW.MaxMarks <> 0 AND NEW.MarksObtained IS NOT NULL THEN
+            SET NEW.Percentage = (NEW.MarksObtained / NEW.MaxMarks) * 100;
+        ELSE
+            SET NEW.Percentage = NULL;
+        END IF;
+    END
+    """,
+    # Also cover UPDATE case with a second trigger
+    "DROP TRIGGER IF EXISTS trg_marks_set_percentage_upd",
+    """
+    CREATE TRIGGER trg_marks_set_percentage_upd
+    BEFORE UPDATE ON Marks
+    FOR EACH ROW
+    BEGIN
+        IF NEW.MaxMarks IS NOT NULL AND NEW.MaxMarks <> 0 AND NEW.MarksObtained IS NOT NULL THEN
+            SET NEW.Percentage = (NEW.MarksObtained / NEW.MaxMarks) * 100;
+        ELSE
+            SET NEW.Percentage = NULL;
+        END IF;
+    END
+    """,
+]
+
+PROCEDURE_DDL = [
+    "DROP PROCEDURE IF EXISTS sp_recalc_percentage",
+    """
+    CREATE PROCEDURE sp_recalc_percentage(IN p_eid INT)
+    BEGIN
+        UPDATE Marks
+        SET Percentage = CASE
+                           WHEN MaxMarks IS NOT NULL AND MaxMarks <> 0 AND MarksObtained IS NOT NULL
+                           THEN (MarksObtained / MaxMarks) * 100
+                           ELSE NULL
+                         END
+        WHERE EvaluationID = p_eid;
+    END
+    """,
+]
+
+# Views used by Reports tab. Adjust field names if your schema differs.
+VIEWS_DDL = [
+    "DROP VIEW IF EXISTS vw_project_summary",
+    """CREATE VIEW vw_project_summary AS
+       SELECT
+         p.ProjectID, p.Title, p.Domain, p.Technology, p.Duration,
+         t.TeamName, t.Members,
+         g.Grade, g.FinalScore
+       FROM Project p
+       LEFT JOIN Team t ON p.TeamID = t.TeamID
+       LEFT JOIN Grade g ON p.ProjectID = g.ProjectID""",
+    "DROP VIEW IF EXISTS vw_top_projects",
+    """CREATE VIEW vw_top_projects AS
+       SELECT p.ProjectID, p.Title, g.FinalScore
+       FROM Project p
+       JOIN Grade g ON p.ProjectID = g.ProjectID
+       ORDER BY g.FinalScore DESC""",
+]
+
+
+def create_trigger():
+    ddl = TRIGGER_DDL
+    if BACKEND == "sqlite":
+        import sqlite_backend
+        ddl = sqlite_backend.TRIGGER_DDL   # AFTER triggers (SQLite can't SET NEW.x)
+    run_statements(*ddl)   # only affects future writes: nothing cached goes stale
+
+
+def drop_trigger():
+    run_statements("DROP TRIGGER IF EXISTS trg_marks_set_percentage",
+                   "DROP TRIGGER IF EXISTS trg_marks_set_percentage_upd")
+
+
+def create_procedure():
+    run_statements(*PROCEDURE_DDL)
+
+
+def drop_procedure():
+    run_statements("DROP PROCEDURE IF EXISTS sp_recalc_percentage")
+
+
+def create_views():
+    write_through(list(VIEW_TABLES), run_statements, *VIEWS_DDL)
+
+
+def drop_views():
+    write_through(list(VIEW_TABLES), run_statements,
+                  "DROP VIEW IF EXISTS vw_project_summary",
+                  "DROP VIEW IF EXISTS vw_top_projects")
+
+
+DDL_ACTIONS = {
+    "create-trigger": create_trigger,
+    "drop-trigger": drop_trigger,
+    "create-procedure": create_procedure,
+    "drop-procedure": drop_procedure,
+    "create-views": create_views,
+    "drop-views": drop_views,
+}
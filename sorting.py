@@ -0,0 +1,96 @@
+# ==============================
+# COLUMN SORTING (no Tk imports)
+#   A sort order is a list of (column, descending) pairs, first = primary.
+#   Clicking a heading makes it the only key (again: flips it, a third
+#   time: unsorted); shift-click adds it as the next tie-breaker.
+#   Loaded rows sort here with type-aware keys (numbers as numbers, dates
+#   as dates, text case-insensitively, NULLs first ascending like MySQL);
+#   paged tables turn the same order into ORDER BY (paging.keyset_sql).
+# ==============================
+import datetime
+import functools
+from decimal import Decimal
+
+ARROWS = {False: "▲", True: "▼"}
+
+
+def sort_key(v):
+    """Key that orders values of one column; types never get compared with each other."""
+    if v is None or v == "":
+        return (0, 0, 0)
+    if isinstance(v, (int, float, Decimal)) and not isinstance(v, bool):
+        return (1, 0, v)
+    if isinstance(v, datetime.datetime):
+        return (1, 1, v.date().toordinal(), v.time())
+    if isinstance(v, datetime.date):
+        return (1, 1, v.toordinal())
+    if isinstance(v, str):
+        return (1, 2, v.casefold())
+    return (1, 3, str(v))
+
+
+def _value(row, j):
+    return row[j] if j < len(row) else None
+
+
+def sort_rows(rows, order, key=sort_key):
+    """rows (list of tuples or a RowStore) as a new list in the given order.
+
+    order: [(column_index, descending)], first = primary. One stable sort per
+    key, last key first, so each pass only computes that column's keys.
+    """
+    rows = list(rows)
+    positions = list(range(len(rows)))
+    for j, descending in reversed(order):
+        keys = [key(_value(r, j)) for r in rows]
+        positions.sort(key=keys.__getitem__, reverse=descending)
+    return [rows[i] for i in positions]
+
+
+def compare_rows(a, b, order, key=sort_key):
+    """-1 / 0 / 1 like a cmp function, for rows in the given order."""
+    for j, descending in order:
+        ka, kb = key(_value(a, j)), key(_value(b, j))
+        if ka != kb:
+            return (1 if ka > kb else -1) * (-1 if descending else 1)
+    return 0
+
+
+def insert_position(rows, row, order, key=sort_key):
+    """Index at which row belongs among rows already in that order (after equal ones)."""
+    cmp = functools.partial(compare_rows, order=order, key=key)
+    for i, other in enumerate(rows):
+        if cmp(row, other) < 0:
+            return i
+    return len(rows)
+
+
+def next_order(order, column, add=False):
+    """Order after clicking column's heading (add = shift-click: tie-breaker)."""
+    current = dict(order)
+    if not add:
+        if order and order[0][0] == column:
+            return [] if order[0][1] else [(column, True)]
+        return [(column, False)]
+    if column not in current:
+        return list(order) + [(column, False)]
+    if not current[column]:
+        return [(c, True if c == column else d) for c, d in order]
+    return [(c, d) for c, d in order if c != column]
+
+
+def heading_text(column, order):
+    """Heading label: the column name plus ▲/▼ (and its position when there are several keys)."""
+    for n, (c, descending) in enumerate(order, 1):
+        if c == column:
+            return f"{column} {ARROWS[descending]}" + (str(n) if len(order) > 1 else "")
+    return column
+
+
+def describe(order):
+    return ", ".join(f"{c} {'desc' if d else 'asc'}" for c, d in order) or "unsorted"
+
+
+def by_index(order, columns):
+    """[(column_index, descending)] for an order of column names."""
+    return [(list(columns).index(c), d) for c, d in order]
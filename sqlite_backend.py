@@ -0,0 +1,341 @@
+# ==============================
+# EMBEDDED SQLITE BACKEND
+#   PROJECTEVAL_BACKEND=sqlite runs the app, the CLI and the benchmark on a
+#   local file instead of MySQL (offline grading, tests). Connections look
+#   like mysql.connector ones to the rest of the code:
+#     - %s placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE, DROP INDEX .. ON, AUTO_INCREMENT,
+#       EXPLAIN and information_schema lookups are rewritten to SQLite
+#     - get_grade_label(), VERSION(), DATABASE() and NOW() are SQL functions
+#     - callproc() / CALL run Python versions of the stored procedures
+#   A new file gets the schema, the sample rows of schema_tables.sql, the
+#   trigger / view equivalents of review_queries.sql and every migration.
+#   SQLite triggers can't assign NEW.x, so the BEFORE triggers become AFTER
+#   triggers that update the row they fired for.
+# ==============================
+import ast
+import datetime
+import os
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+from functools import lru_cache
+
+from grading import grade_label
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_tables.sql")
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+
+# schema_tables.sql + TeamMember (review_queries.sql); Marks has migration 1's MarkID already
+SCHEMA_SQL = [
+    """CREATE TABLE IF NOT EXISTS Student (
+        StudentID INT PRIMARY KEY,
+        Dept VARCHAR(50) NOT NULL,
+        Year INT NOT NULL,
+        Fname VARCHAR(50),
+        Lname VARCHAR(50),
+        Age INT CHECK (Age > 15),
+        PhoneNo VARCHAR(15) UNIQUE
+    )""",
+    """CREATE TABLE IF NOT EXISTS Team (
+        TeamID INT PRIMARY KEY,
+        TeamName VARCHAR(100) NOT NULL,
+        Members INT CHECK (Members > 0),
+        StudentID INT REFERENCES Student(StudentID) ON DELETE SET NULL ON UPDATE CASCADE
+    )""",
+    """CREATE TABLE IF NOT EXISTS Project (
+        ProjectID INT PRIMARY KEY,
+        Title VARCHAR(100) NOT NULL,
+        Domain VARCHAR(50),
+        Technology VARCHAR(50),
+        Duration VARCHAR(30),
+        TeamID INT REFERENCES Team(TeamID) ON DELETE CASCADE ON UPDATE CASCADE
+    )""",
+    # NULL Grade becomes 'C' here and the grade trigger sets the real letter
+    """CREATE TABLE IF NOT EXISTS Grade (
+        Grade CHAR(2) NOT NULL ON CONFLICT REPLACE DEFAULT 'C',
+        FinalScore DECIMAL(5,2),
+        ProjectID INT PRIMARY KEY REFERENCES Project(ProjectID) ON DELETE CASCADE ON UPDATE CASCADE
+    )""",
+    """CREATE TABLE IF NOT EXISTS Evaluation (
+        EvaluationID INT PRIMARY KEY,
+        TotalMarks INT,
+        Rounds INT DEFAULT 1,
+        EvalDate DATE DEFAULT (CURRENT_DATE),
+        Comments VARCHAR(255)
+    )""",
+    """CREATE TABLE IF NOT EXISTS Marks (
+        MarksObtained INT,
+        MaxMarks INT NOT NULL,
+        Percentage DECIMAL(5,2),
+        EvaluationID INT REFERENCES Evaluation(EvaluationID) ON DELETE CASCADE ON UPDATE CASCADE,
+        MarkID INTEGER PRIMARY KEY
+    )""",
+    """CREATE TABLE IF NOT EXISTS Faculty (
+        FacultyID INT PRIMARY KEY,
+        Name VARCHAR(50),
+        Email VARCHAR(100) UNIQUE,
+        PhoneNo VARCHAR(15),
+        ProjectID INT REFERENCES Project(ProjectID) ON DELETE SET NULL ON UPDATE CASCADE,
+        EvaluationID INT REFERENCES Evaluation(EvaluationID) ON DELETE SET NULL ON UPDATE CASCADE
+    )""",
+    """CREATE TABLE IF NOT EXISTS TeamMember (
+        TeamID INT NOT NULL REFERENCES Team(TeamID) ON DELETE CASCADE ON UPDATE CASCADE,
+        StudentID INT NOT NULL REFERENCES Student(StudentID) ON DELETE CASCADE ON UPDATE CASCADE,
+        Role VARCHAR(50),
+        PRIMARY KEY (TeamID, StudentID)
+    )""",
+]
+
+# Percentage as MySQL stores it: the trigger's value rounded into DECIMAL(5,2)
+PERCENTAGE_SQL = ("CASE WHEN {p}MaxMarks IS NOT NULL AND {p}MaxMarks <> 0 AND {p}MarksObtained IS NOT NULL "
+                  "THEN ROUND({p}MarksObtained * 100.0 / {p}MaxMarks, 2) END")
+
+# trg_marks_set_percentage(_upd) from DB Tools (services.TRIGGER_DDL)
+TRIGGER_DDL = [
+    "DROP TRIGGER IF EXISTS trg_marks_set_percentage",
+    f"""CREATE TRIGGER trg_marks_set_percentage AFTER INSERT ON Marks
+    BEGIN
+        UPDATE Marks SET Percentage = {PERCENTAGE_SQL.format(p="NEW.")} WHERE MarkID = NEW.MarkID;
+    END""",
+    "DROP TRIGGER IF EXISTS trg_marks_set_percentage_upd",
+    f"""CREATE TRIGGER trg_marks_set_percentage_upd AFTER UPDATE OF MarksObtained, MaxMarks, Percentage ON Marks
+    BEGIN
+        UPDATE Marks SET Percentage = {PERCENTAGE_SQL.format(p="NEW.")} WHERE MarkID = NEW.MarkID;
+    END""",
+]
+
+# trg_grade_before_* and trg_teammember_after_* from review_queries.sql
+SETUP_TRIGGER_DDL = [
+    """CREATE TRIGGER IF NOT EXISTS trg_grade_before_insert AFTER INSERT ON Grade
+    BEGIN
+        UPDATE Grade SET Grade = get_grade_label(NEW.FinalScore) WHERE ProjectID = NEW.ProjectID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_grade_before_update AFTER UPDATE OF Grade, FinalScore ON Grade
+    BEGIN
+        UPDATE Grade SET Grade = get_grade_label(NEW.FinalScore) WHERE ProjectID = NEW.ProjectID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_teammember_after_insert AFTER INSERT ON TeamMember
+    BEGIN
+        UPDATE Team SET Members = COALESCE(Members, 0) + 1 WHERE TeamID = NEW.TeamID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_teammember_after_delete AFTER DELETE ON TeamMember
+    BEGIN
+        UPDATE Team SET Members = COALESCE(Members, 0) - 1 WHERE TeamID = OLD.TeamID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_teammember_after_update AFTER UPDATE OF TeamID ON TeamMember
+    WHEN NEW.TeamID <> OLD.TeamID
+    BEGIN
+        UPDATE Team SET Members = COALESCE(Members, 0) + 1 WHERE TeamID = NEW.TeamID;
+        UPDATE Team SET Members = COALESCE(Members, 0) - 1 WHERE TeamID = OLD.TeamID;
+    END""",
+]
+
+# Stored procedures: name -> [(sql, args -> params)], run in one savepoint
+PROCEDURES = {
+    "sp_recalc_percentage": [
+        (f"UPDATE Marks SET Percentage = {PERCENTAGE_SQL.format(p='')} WHERE EvaluationID = %s",
+         lambda a: (a[0],)),
+    ],
+    "sp_add_evaluation_with_marks": [
+        ("INSERT INTO Evaluation (EvaluationID, TotalMarks, Rounds, EvalDate, Comments) VALUES (%s,%s,%s,%s,%s)",
+         lambda a: tuple(a[:5])),
+        ("INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) VALUES (%s,%s,NULL,%s)",
+         lambda a: (a[5], a[6], a[0])),
+    ],
+}
+
+# information_schema tables the app reads, as per-connection TEMP views
+INFO_SCHEMA_VIEWS = {
+    "TABLES": "SELECT 'main' AS TABLE_SCHEMA, name AS TABLE_NAME, NULL AS TABLE_ROWS, NULL AS UPDATE_TIME "
+              "FROM main.sqlite_master WHERE type IN ('table', 'view')",
+    "COLUMNS": "SELECT 'main' AS TABLE_SCHEMA, m.name AS TABLE_NAME, c.name AS COLUMN_NAME "
+               "FROM main.sqlite_master m JOIN pragma_table_info(m.name) c WHERE m.type = 'table'",
+    "STATISTICS": "SELECT 'main' AS TABLE_SCHEMA, tbl_name AS TABLE_NAME, name AS INDEX_NAME "
+                  "FROM main.sqlite_master WHERE type = 'index'",
+    "TRIGGERS": "SELECT 'main' AS TRIGGER_SCHEMA, name AS TRIGGER_NAME, tbl_name AS EVENT_OBJECT_TABLE "
+                "FROM main.sqlite_master WHERE type = 'trigger'",
+}
+
+_CALL_RE = re.compile(r"^\s*CALL\s+(\w+)\s*\((.*)\)\s*;?\s*$", re.I | re.S)
+_UPSERT_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.I | re.S)
+_REWRITES = [
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\b\w*INT\s+(?:NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I),
+     "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bDROP\s+INDEX\s+(\w+)\s+ON\s+\w+", re.I), r"DROP INDEX IF EXISTS \1"),
+    (re.compile(r"^\s*EXPLAIN\s+(?!QUERY\s+PLAN)", re.I), "EXPLAIN QUERY PLAN "),
+    (re.compile(r"\binformation_schema\.(\w+)", re.I), lambda m: f"information_schema_{m.group(1).upper()}"),
+    # Procedures are built in (PROCEDURES): creating / dropping them is a no-op
+    (re.compile(r"^\s*(DROP|CREATE)\s+PROCEDURE\b.*$", re.I | re.S), "SELECT NULL"),
+]
+
+
+@lru_cache(maxsize=512)
+def translate(sql):
+    """MySQL statement text (as the app writes it) -> SQLite text with ? placeholders."""
+    for pattern, repl in _REWRITES:
+        sql = pattern.sub(repl, sql)
+    upsert = _UPSERT_RE.search(sql)
+    if upsert:
+        sets = re.sub(r"\bVALUES\s*\(\s*(\w+)\s*\)", r"excluded.\1", upsert.group(1), flags=re.I)
+        sql = sql[:upsert.start()] + "ON CONFLICT DO UPDATE SET" + sets
+    return sql.replace("%s", "?").replace("%%", "%")
+
+
+class SqliteCursor:
+    """DB-API cursor taking the app's MySQL-flavoured SQL."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.cursor()
+
+    def execute(self, sql, params=()):
+        call = _CALL_RE.match(sql)
+        if call:
+            args = list(params) if params else list(ast.literal_eval(f"({call.group(2)},)"))
+            return self.callproc(call.group(1), args)
+        return self._cursor.execute(translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, seq_of_params):
+        return self._cursor.executemany(translate(sql), (tuple(p) for p in seq_of_params))
+
+    def callproc(self, name, args=()):
+        steps = PROCEDURES.get(name)
+        if steps is None:
+            raise sqlite3.OperationalError(f"PROCEDURE {name} does not exist")
+        self._cursor.execute("SAVEPOINT callproc")
+        try:
+            for sql, to_params in steps:
+                self._cursor.execute(translate(sql), to_params(list(args)))
+        except Exception:
+            self._cursor.execute("ROLLBACK TO callproc")
+            raise
+        finally:
+            self._cursor.execute("RELEASE callproc")
+        return args
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(self._cursor.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)   # description, rowcount, lastrowid, close
+
+
+class SqliteConnection:
+    """sqlite3 connection with the SQL functions and information_schema views the app expects."""
+
+    def __init__(self, path, timeout=10.0):
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._closed = False
+        for pragma in ("foreign_keys = ON", "journal_mode = WAL", "synchronous = NORMAL"):
+            self._conn.execute(f"PRAGMA {pragma}")
+        self._conn.create_function("get_grade_label", 1, _grade_label, deterministic=True)
+        self._conn.create_function("VERSION", 0, lambda: f"SQLite {sqlite3.sqlite_version}")
+        self._conn.create_function("DATABASE", 0, lambda: "main")
+        self._conn.create_function("NOW", 0, lambda: datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        for name, sql in INFO_SCHEMA_VIEWS.items():
+            self._conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS information_schema_{name} AS {sql}")
+
+    def cursor(self):
+        return SqliteCursor(self._conn)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        self._conn.close()
+
+
+def _grade_label(score):
+    return None if score is None else grade_label(score)
+
+
+# ---------- new database ----------
+_INIT_LOCK = threading.Lock()
+_ready = set()   # paths already checked / initialized by this process
+
+
+def connect(path):
+    """Open path, creating and filling the database on first use."""
+    with _INIT_LOCK:
+        if path not in _ready:
+            conn = SqliteConnection(path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Student'")
+                fresh = cursor.fetchone() is None
+            finally:
+                conn.close()
+            if fresh:
+                init_database(path)
+            _ready.add(path)
+    return SqliteConnection(path)
+
+
+def _sample_statements(schema_path):
+    """INSERT / CALL statements of schema_tables.sql (its demo SELECT/UPDATE/DELETEs are skipped)."""
+    with open(schema_path, encoding="utf-8") as f:
+        # (the file has a few non-breaking spaces pasted in)
+        text = "".join(line for line in f if not line.lstrip().startswith("--")).replace("\u00a0", " ")
+    inserts, calls = [], []
+    for stmt in (s.strip() for s in text.split(";")):
+        # The sample Marks rows predate MarkID: name their columns
+        stmt = stmt.replace("INSERT INTO Marks VALUES",
+                            "INSERT INTO Marks (MarksObtained, MaxMarks, Percentage, EvaluationID) VALUES")
+        if stmt.upper().startswith("INSERT"):
+            inserts.append(stmt)
+        elif stmt.upper().startswith("CALL"):
+            calls.append(stmt)
+    return inserts, calls
+
+
+def init_database(path, sample=True, schema_path=SCHEMA_FILE, log=None):
+    """Tables, sample rows, triggers, function, views and all migrations in a new file.
+
+    Same order as a MySQL setup: schema_tables.sql rows go in before the
+    triggers of review_queries.sql exist, its CALL after.
+    """
+    import migrations   # imports services, which imports this module lazily
+    import services
+
+    conn = SqliteConnection(path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")   # SQLite DDL is transactional: a failed setup leaves an empty file
+        for sql in SCHEMA_SQL:
+            cursor.execute(sql)
+        inserts, calls = _sample_statements(schema_path) if sample else ([], [])
+        for sql in inserts:
+            cursor.execute(sql)
+        cursor.execute("INSERT IGNORE INTO TeamMember (TeamID, StudentID, Role) "
+                       "SELECT TeamID, StudentID, NULL FROM Team WHERE StudentID IS NOT NULL")
+        for sql in TRIGGER_DDL + SETUP_TRIGGER_DDL + services.VIEWS_DDL:
+            cursor.execute(sql)
+        for sql in calls:
+            cursor.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+    # Records schema_version and adds the indexes (MarkID is already there)
+    conn = SqliteConnection(path)
+    migrations.migrate(lambda: (conn, conn.cursor()), log=log or (lambda *_: None))
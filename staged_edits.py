@@ -0,0 +1,74 @@
+# ==============================
+# STAGED (BATCHED) EDITS
+#   Inserts / updates / deletes for one entity collected locally and saved
+#   with services.apply_batch in one transaction. Edits to the same key are
+#   folded together, so each row gets at most one statement. Marks rows are
+#   keyed by MarkID once the schema has it (services.batch_key); new rows
+#   have no key yet and are never folded.
+# ==============================
+import services
+
+
+class EditBatch:
+    def __init__(self, entity):
+        spec = services.ENTITIES[entity]
+        self.entity = entity
+        self.key_idx = [spec["columns"].index(c) for c in services.batch_key(entity)]
+        self.clear()
+
+    def clear(self):
+        self.inserts = {}   # key -> values
+        self.updates = {}   # key -> values
+        self.deletes = {}   # key -> key value passed to the DELETE
+
+    def key_of(self, values):
+        """Key of a row, or None when it has none yet (a new Marks row: MarkID is AUTO_INCREMENT)."""
+        if any(i >= len(values) or values[i] in (None, "") for i in self.key_idx):
+            return None
+        return tuple(str(values[i]) for i in self.key_idx)
+
+    def insert(self, values):
+        key = self.key_of(values)
+        if key is None:
+            self.inserts[("new", len(self.inserts))] = list(values)
+        elif self.deletes.pop(key, None) is not None:
+            self.updates[key] = list(values)   # delete + re-add = update
+        else:
+            self.inserts[key] = list(values)
+
+    def update(self, values):
+        key = self.key_of(values)
+        if key is None or key in self.deletes:
+            return False   # no row to update (pick it in the table) / already going away
+        if key in self.inserts:
+            self.inserts[key] = list(values)
+        else:
+            self.updates[key] = list(values)
+        return True
+
+    def delete(self, values):
+        key = self.key_of(values)
+        if key is None:
+            return
+        self.updates.pop(key, None)
+        if self.inserts.pop(key, None) is None:
+            self.deletes[key] = values[self.key_idx[0]]
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def summary(self):
+        return f"{len(self.inserts)} add, {len(self.updates)} update, {len(self.deletes)} delete staged"
+
+    def save(self):
+        """Apply everything in one transaction (runs on the worker). Returns apply_batch's counts."""
+        return services.apply_batch(self.entity, list(self.inserts.values()), list(self.updates.values()),
+                                    list(self.deletes.values()))
+
+
+def format_result(result):
+    lines = [f"Saved {result['requested']} staged edit(s) in one transaction ({result['seconds']:.2f}s):",
+             f"  deleted:  {result['deleted']}",
+             f"  updated:  {result['updated']} (rows whose values changed)",
+             f"  inserted: {result['inserted']}"]
+    return "\n".join(lines)
@@ -0,0 +1,53 @@
+# ==============================
+# STARTUP TIMING
+#   Milestones from process start to "first tab has its data", plus how
+#   long each lazily built tab took. Printed once at startup, shown in the
+#   DB Tools tab, and appended as a JSON line to PROJECTEVAL_STARTUP_LOG
+#   (if set) so time to first paint can be tracked across versions.
+# ==============================
+import json
+import os
+import time
+
+
+class StartupTimer:
+    def __init__(self, started=None, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock() if started is None else started
+        self.marks = []        # (milestone, ms since start), in order
+        self.tabs = {}         # tab title -> ms to build it
+        self.reported = False
+
+    def mark(self, name):
+        """Record a milestone once (later calls with the same name are ignored)."""
+        if all(n != name for n, _ in self.marks):
+            self.marks.append((name, round((self.clock() - self.started) * 1000, 1)))
+
+    def has(self, name):
+        return any(n == name for n, _ in self.marks)
+
+    def tab_built(self, title, ms):
+        self.tabs[title] = round(ms, 1)
+
+    def as_dict(self):
+        return {"at": time.strftime("%Y-%m-%d %H:%M:%S"), "milestones_ms": dict(self.marks),
+                "tab_build_ms": dict(self.tabs)}
+
+    def report(self):
+        lines = [f"{ms:9.1f} ms  {name}" for name, ms in self.marks]
+        if self.tabs:
+            lines.append("")
+            lines.append("Tabs built on first open:")
+            lines += [f"{ms:9.1f} ms  {title}" for title, ms in self.tabs.items()]
+        return "\n".join(lines)
+
+    def log(self, path=None):
+        """Print the milestones and append them to the startup log (once)."""
+        if self.reported:
+            return
+        self.reported = True
+        print("[startup] " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks))
+        path = path or os.environ.get("PROJECTEVAL_STARTUP_LOG")
+        if path:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.as_dict()) + "\n")
@@ -0,0 +1,198 @@
+# ==============================
+# MATERIALIZED PROJECT SUMMARY (optional)
+#   project_summary_mv holds the vw_project_summary rows. AFTER triggers on
+#   Project / Team / Grade re-derive only the affected rows, so reads skip
+#   the 3-way join and "top N" walks the FinalScore index instead of sorting.
+#   FK cascades don't fire triggers in MySQL, so the Team triggers also
+#   cover the Project rows a Team delete/update cascades to.
+#   If the table, a trigger or the state row is missing, it counts as stale
+#   and readers fall back to the live views.
+# ==============================
+import time
+
+from row_store import fetch_store
+
+MV_TABLE = "project_summary_mv"
+MV_COLUMNS = ["ProjectID", "Title", "Domain", "Technology", "Duration", "TeamName", "Members", "Grade", "FinalScore"]
+TOP_COLUMNS = ["ProjectID", "Title", "FinalScore"]
+
+CREATE_SQL = [
+    f"""CREATE TABLE IF NOT EXISTS {MV_TABLE} (
+        ProjectID INT PRIMARY KEY,
+        Title VARCHAR(100),
+        Domain VARCHAR(50),
+        Technology VARCHAR(50),
+        Duration VARCHAR(30),
+        TeamID INT,
+        TeamName VARCHAR(100),
+        Members INT,
+        Grade CHAR(2),
+        FinalScore DECIMAL(5,2),
+        INDEX idx_mv_finalscore (FinalScore),
+        INDEX idx_mv_team (TeamID)
+    )""",
+    """CREATE TABLE IF NOT EXISTS mv_state (
+        name VARCHAR(64) PRIMARY KEY,
+        valid TINYINT NOT NULL DEFAULT 0,
+        rebuilt_at DATETIME,
+        rebuild_seconds DECIMAL(10,3)
+    )""",
+]
+
+# Same rows as vw_project_summary (Members 0 when NULL / no team), plus TeamID for the Team triggers
+_SELECT_ROWS = """
+    SELECT p.ProjectID, p.Title, p.Domain, p.Technology, p.Duration,
+           p.TeamID, t.TeamName, COALESCE(t.Members, 0), g.Grade, g.FinalScore
+    FROM Project p
+    LEFT JOIN Team t ON p.TeamID = t.TeamID
+    LEFT JOIN Grade g ON p.ProjectID = g.ProjectID
+"""
+
+PROCEDURE_SQL = [
+    "DROP PROCEDURE IF EXISTS sp_mv_summary_refresh",
+    f"""CREATE PROCEDURE sp_mv_summary_refresh(IN p_pid INT)
+    BEGIN
+        DELETE FROM {MV_TABLE} WHERE ProjectID = p_pid;
+        INSERT INTO {MV_TABLE} {_SELECT_ROWS} WHERE p.ProjectID = p_pid;
+    END""",
+]
+
+# name -> (table, event, body)
+TRIGGERS = {
+    "trg_mv_summary_project_ai": ("Project", "INSERT", "CALL sp_mv_summary_refresh(NEW.ProjectID);"),
+    "trg_mv_summary_project_au": ("Project", "UPDATE",
+                                  "IF NEW.ProjectID <> OLD.ProjectID THEN "
+                                  f"DELETE FROM {MV_TABLE} WHERE ProjectID = OLD.ProjectID; END IF; "
+                                  "CALL sp_mv_summary_refresh(NEW.ProjectID);"),
+    # Grade rows cascade away with the project
+    "trg_mv_summary_project_ad": ("Project", "DELETE", f"DELETE FROM {MV_TABLE} WHERE ProjectID = OLD.ProjectID;"),
+    # A TeamID change cascades into Project.TeamID
+    "trg_mv_summary_team_au": ("Team", "UPDATE",
+                               f"UPDATE {MV_TABLE} SET TeamID = NEW.TeamID, TeamName = NEW.TeamName, "
+                               "Members = COALESCE(NEW.Members, 0) WHERE TeamID = OLD.TeamID;"),
+    # Deleting a team cascades to its projects (and their grades)
+    "trg_mv_summary_team_ad": ("Team", "DELETE", f"DELETE FROM {MV_TABLE} WHERE TeamID = OLD.TeamID;"),
+    "trg_mv_summary_grade_ai": ("Grade", "INSERT",
+                                f"UPDATE {MV_TABLE} SET Grade = NEW.Grade, FinalScore = NEW.FinalScore "
+                                "WHERE ProjectID = NEW.ProjectID;"),
+    "trg_mv_summary_grade_au": ("Grade", "UPDATE",
+                                "IF NEW.ProjectID <> OLD.ProjectID THEN "
+                                f"UPDATE {MV_TABLE} SET Grade = NULL, FinalScore = NULL WHERE ProjectID = OLD.ProjectID; "
+                                "END IF; "
+                                f"UPDATE {MV_TABLE} SET Grade = NEW.Grade, FinalScore = NEW.FinalScore "
+                                "WHERE ProjectID = NEW.ProjectID;"),
+    "trg_mv_summary_grade_ad": ("Grade", "DELETE",
+                                f"UPDATE {MV_TABLE} SET Grade = NULL, FinalScore = NULL "
+                                "WHERE ProjectID = OLD.ProjectID;"),
+}
+
+FRESH_SQL = """
+    SELECT s.valid,
+           (SELECT COUNT(*) FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME LIKE 'trg\\_mv\\_summary\\_%%')
+    FROM mv_state s WHERE s.name = %s
+"""
+
+
+def _trigger_sql(name):
+    table, event, body = TRIGGERS[name]
+    return f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW BEGIN {body} END"
+
+
+# ---------- maintenance ----------
+def _set_state(cursor, valid, seconds=None):
+    cursor.execute("""
+        INSERT INTO mv_state (name, valid, rebuilt_at, rebuild_seconds) VALUES (%s, %s, NOW(), %s)
+        ON DUPLICATE KEY UPDATE valid = VALUES(valid),
+            rebuilt_at = IF(VALUES(rebuild_seconds) IS NULL, rebuilt_at, VALUES(rebuilt_at)),
+            rebuild_seconds = COALESCE(VALUES(rebuild_seconds), rebuild_seconds)
+    """, (MV_TABLE, int(valid), seconds))
+
+
+def enable(conn_fn):
+    """Create the table, procedure and triggers, then fill it. Returns rebuild stats."""
+    conn, cursor = conn_fn()
+    try:
+        for sql in CREATE_SQL + PROCEDURE_SQL:
+            cursor.execute(sql)
+        for name in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(_trigger_sql(name))
+        conn.commit()
+    finally:
+        conn.close()
+    return rebuild(conn_fn)
+
+
+def rebuild(conn_fn):
+    """Full refresh in one transaction (triggers are already live, so nothing is missed)."""
+    started = time.perf_counter()
+    conn, cursor = conn_fn()
+    try:
+        cursor.execute(f"DELETE FROM {MV_TABLE}")
+        cursor.execute(f"INSERT INTO {MV_TABLE} {_SELECT_ROWS}")
+        rows = cursor.rowcount
+        seconds = round(time.perf_counter() - started, 3)
+        _set_state(cursor, True, seconds)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {"rows": rows, "seconds": seconds}
+
+
+def disable(conn_fn):
+    """Drop the triggers and mark the summary stale (readers go back to the views)."""
+    conn, cursor = conn_fn()
+    try:
+        for name in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute("DROP PROCEDURE IF EXISTS sp_mv_summary_refresh")
+        cursor.execute(CREATE_SQL[1])
+        _set_state(cursor, False)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def is_fresh(cursor):
+    """True when the summary table is filled and every maintenance trigger is installed."""
+    try:
+        cursor.execute(FRESH_SQL, (MV_TABLE,))
+        row = cursor.fetchone()
+    except Exception:
+        return False   # not enabled yet (no mv_state table)
+    return bool(row and row[0] and row[1] == len(TRIGGERS))
+
+
+# ---------- reads (fallback to the live views) ----------
+def read_summary(conn_fn):
+    """(columns, rows, source) with source 'materialized' or 'view'."""
+    conn, cursor = conn_fn()
+    try:
+        if is_fresh(cursor):
+            cursor.execute(f"SELECT {', '.join(MV_COLUMNS)} FROM {MV_TABLE} ORDER BY ProjectID")
+            return MV_COLUMNS, fetch_store(cursor, MV_COLUMNS), "materialized"
+        cursor.execute("SELECT * FROM vw_project_summary")
+        rows = fetch_store(cursor)
+        return rows.names, rows, "view"
+    finally:
+        conn.close()
+
+
+def read_top(conn_fn, limit=10):
+    """Top projects by FinalScore; the materialized path reads `limit` index entries."""
+    conn, cursor = conn_fn()
+    try:
+        if is_fresh(cursor):
+            # Grade is NOT NULL in Grade, so a NULL here means "no Grade row" (the view's inner join)
+            cursor.execute(f"SELECT {', '.join(TOP_COLUMNS)} FROM {MV_TABLE} WHERE Grade IS NOT NULL "
+                           f"ORDER BY FinalScore DESC LIMIT {int(limit)}")
+            return TOP_COLUMNS, fetch_store(cursor, TOP_COLUMNS), "materialized"
+        cursor.execute(f"SELECT * FROM vw_top_projects LIMIT {int(limit)}")
+        rows = fetch_store(cursor)
+        return rows.names, rows, "view"
+    finally:
+        conn.close()
@@ -0,0 +1,369 @@
+# ==============================
+# OFFLINE WRITE QUEUE
+#   Adds / updates / deletes made while the server can't be reached (or
+#   while the app is set to queue writes) are appended to a local SQLite
+#   file and committed there at once, then replayed to the database in the
+#   background, a batch per transaction. Before replaying, each write is
+#   checked against the row's current values by primary key (MarkID for a
+#   Marks row that carries one): a row that was changed by somebody else
+#   since it was read is a conflict and is left in the queue for review
+#   instead of being overwritten. No Tk imports.
+# ==============================
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import services
+from db_pool import PoolTimeout
+
+QUEUE_PATH = os.environ.get("PROJECTEVAL_QUEUE_PATH", "projecteval_queue.sqlite3")
+REPLAY_BATCH = 200   # queued writes per transaction
+
+ACTIONS = {"add": "insert", "update": "update", "delete": "delete"}
+STATUSES = ("pending", "failed", "conflict")
+# Columns filled in by triggers: never compared
+DERIVED = {"marks": {"Percentage"}, "grade": {"Grade"}}
+# Marks values are the tab's columns, MarkID last once migration 1 added it;
+# a row with one is updated / deleted by it (services.MARK_ROW_SQL)
+MARK_ID_INDEX = 4
+# Client errors that mean "server not reachable", not "this write is wrong":
+# can't connect, server gone away, lost connection, too many connections, lock wait
+CONNECTION_ERRNOS = {2002, 2003, 2005, 2006, 2013, 2055, 1040, 1205}
+
+QUEUE_DDL = """
+    CREATE TABLE IF NOT EXISTS pending_writes (
+        id        INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity    TEXT NOT NULL,
+        action    TEXT NOT NULL,
+        key_value TEXT NOT NULL,
+        vals      TEXT NOT NULL,      -- JSON: row values (GUI column order) or [key] for deletes
+        base      TEXT,               -- JSON {column: value} as shown when the write was made
+        status    TEXT NOT NULL DEFAULT 'pending',
+        error     TEXT,
+        attempts  INTEGER NOT NULL DEFAULT 0,
+        queued_at TEXT NOT NULL
+    )
+"""
+
+
+class QueueError(Exception):
+    pass
+
+
+def is_connection_error(e):
+    """True when e says the database is unreachable (so the write should be queued)."""
+    if isinstance(e, (PoolTimeout, OSError)):
+        return True
+    if getattr(e, "errno", None) in CONNECTION_ERRNOS:
+        return True
+    if type(e).__name__ == "InterfaceError":
+        return True
+    return "database is locked" in str(e)
+
+
+def key_column(entity, values):
+    """Column a write is matched on: the entity's key, or MarkID for a Marks row
+    (values, also for deletes) that carries one."""
+    if (entity == "marks" and isinstance(values, (list, tuple)) and len(values) > MARK_ID_INDEX
+            and str(values[MARK_ID_INDEX]).strip() not in ("", "None")):
+        return "MarkID"
+    return services.ENTITIES[entity]["key"][0]
+
+
+def key_of(entity, action, values):
+    """Key value of a queued write (as text), in key_column()."""
+    if key_column(entity, values) == "MarkID":
+        return str(values[MARK_ID_INDEX]).strip()
+    if action == "delete":
+        return str(values).strip()
+    spec = services.ENTITIES[entity]
+    return str(values[spec["columns"].index(spec["key"][0])]).strip()
+
+
+def _row_values(entry):
+    """The row values of a queued write: deletes store [key] or [row]."""
+    return entry["values"][0] if entry["action"] == "delete" else entry["values"]
+
+
+class WriteQueue:
+    """Append-only queue of writes in a local SQLite file (thread-safe)."""
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")   # a queued write survives a crash
+            conn.execute(QUEUE_DDL)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, entity, action, values, base=None):
+        """Store one write; returns its id. values: row values, or the key value for deletes
+        (the row for a Marks delete by MarkID)."""
+        if entity not in services.BATCH_SQL or action not in ACTIONS:
+            raise QueueError(f"Can't queue {action!r} on {entity!r}")
+        key = key_of(entity, action, values)
+        if not key:
+            raise QueueError(f"{key_column(entity, values)} is required")
+        stored = [values] if action == "delete" else list(values)
+        with self._lock:
+            db = self._db()
+            cur = db.execute("INSERT INTO pending_writes (entity, action, key_value, vals, base, queued_at) "
+                             "VALUES (?,?,?,?,?,?)",
+                             (entity, action, key, json.dumps(stored, default=str),
+                              json.dumps(base, default=str) if base is not None else None,
+                              time.strftime("%Y-%m-%d %H:%M:%S")))
+            db.commit()
+            return cur.lastrowid
+
+    def pending(self, limit=REPLAY_BATCH, after_id=0):
+        return self._select("WHERE status = 'pending' AND id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+    def entries(self, status=None):
+        """All queued writes (or those with status), oldest first."""
+        if status:
+            return self._select("WHERE status = ? ORDER BY id", (status,))
+        return self._select("ORDER BY id", ())
+
+    def _select(self, tail, params):
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, entity, action, key_value, vals, base, status, error, attempts, queued_at "
+                f"FROM pending_writes {tail}", params).fetchall()
+        return [{"id": r[0], "entity": r[1], "action": r[2], "key": r[3], "values": json.loads(r[4]),
+                 "base": json.loads(r[5]) if r[5] else None, "status": r[6], "error": r[7],
+                 "attempts": r[8], "queued_at": r[9]} for r in rows]
+
+    def blocked_keys(self):
+        """(entity, key) pairs with a failed / conflicting write: later writes to them wait."""
+        with self._lock:
+            return set(self._db().execute(
+                "SELECT DISTINCT entity, key_value FROM pending_writes WHERE status <> 'pending'").fetchall())
+
+    def counts(self):
+        """{"pending": n, "failed": n, "conflict": n}"""
+        with self._lock:
+            rows = self._db().execute("SELECT status, COUNT(*) FROM pending_writes GROUP BY status").fetchall()
+        out = dict.fromkeys(STATUSES, 0)
+        out.update(rows)
+        return out
+
+    def resolve(self, done_ids, marks=()):
+        """Remove replayed writes and record (id, status, error) for the rest, in one commit."""
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM pending_writes WHERE id = ?", [(i,) for i in done_ids])
+            db.executemany("UPDATE pending_writes SET status = ?, error = ?, attempts = attempts + 1 WHERE id = ?",
+                           [(status, error, i) for i, status, error in marks])
+            db.commit()
+
+    def retry(self, ids=None):
+        """Put failed / conflicting writes (all, or ids) back to pending. Returns how many."""
+        return self._update("UPDATE pending_writes SET status = 'pending', error = NULL", ids)
+
+    def discard(self, ids=None):
+        """Drop queued writes (all failed / conflicting ones, or exactly ids). Returns how many."""
+        return self._update("DELETE FROM pending_writes", ids)
+
+    def _update(self, sql, ids):
+        with self._lock:
+            db = self._db()
+            if ids:
+                n = sum(db.execute(sql + " WHERE id = ?", (int(i),)).rowcount for i in ids)
+            else:
+                n = db.execute(sql + " WHERE status <> 'pending'").rowcount
+            db.commit()
+            return n
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+QUEUE = WriteQueue()
+
+
+# ---------- replay ----------
+def _norm(value):
+    """Compare '85' with 85.0 and ' x' with 'x' as equal."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def _differs(row, values, entity):
+    """Columns whose value in row (dict) differs from values (dict)."""
+    skip = DERIVED.get(entity, set())
+    return [c for c, v in values.items() if c in row and c not in skip and _norm(row[c]) != _norm(v)]
+
+
+def _current_row(cursor, entity, key, column=None):
+    spec = services.ENTITIES[entity]
+    sql = (f"SELECT {', '.join(spec['columns'])} FROM {spec['table']} WHERE {column or spec['key'][0]} = %s"
+           + (" FOR UPDATE" if services.BACKEND == "mysql" else ""))
+    cursor.execute(sql, (key,))
+    row = cursor.fetchone()
+    cursor.fetchall()   # leave the cursor clean if the key isn't unique
+    return dict(zip(spec["columns"], row)) if row is not None else None
+
+
+def check_conflict(cursor, entry):
+    """(outcome, detail): "apply", "skip" (already done) or "conflict".
+
+    The stored base is the row as the user saw it; a current row that matches
+    neither the base nor the new values was changed by somebody else.
+    Marks rows are compared by MarkID; a Marks write without one (adds, or a
+    schema before migration 1) matches every row of its EvaluationID and
+    isn't checked.
+    """
+    entity, action = entry["entity"], entry["action"]
+    column = key_column(entity, _row_values(entry))
+    if entity == "marks" and column != "MarkID":
+        return "apply", None
+    columns = services.ENTITIES[entity]["columns"]
+    if column not in columns:
+        columns = columns + [column]   # MarkID: ENTITIES only lists it once the GUI looked the key up
+    new = dict(zip(columns, entry["values"])) if action != "delete" else None
+    current = _current_row(cursor, entity, entry["key"], column)
+    base = entry["base"]
+    if action == "add":
+        if current is None:
+            return "apply", None
+        if not _differs(current, new, entity):
+            return "skip", None   # replayed before (e.g. crash after the commit)
+        return "conflict", f"{entry['key']} already exists with different values"
+    if current is None:
+        if action == "delete":
+            return "skip", None
+        return "conflict", f"{entry['key']} no longer exists"
+    if action == "update" and not _differs(current, new, entity):
+        return "skip", None
+    if base is not None:
+        changed = _differs(current, base, entity)
+        if changed:
+            return "conflict", f"changed by someone else since it was read: {', '.join(changed)}"
+    return "apply", None
+
+
+def _apply(cursor, entry):
+    values = _row_values(entry)
+    if key_column(entry["entity"], values) == "MarkID":
+        sql, to_params = services.MARK_ROW_SQL[ACTIONS[entry["action"]]]
+        if entry["action"] == "delete":
+            values = values[MARK_ID_INDEX]
+    else:
+        sql, to_params = services.BATCH_SQL[entry["entity"]][ACTIONS[entry["action"]]]
+    cursor.execute(sql, to_params(values))
+
+
+def replay(queue=None, conn_fn=None, batch_size=REPLAY_BATCH, max_batches=None):
+    """Send pending writes to the database, oldest first (runs on a worker thread).
+
+    Each batch is one transaction with a savepoint per write: a write that fails
+    (constraint, bad value) is rolled back alone and marked failed, a conflict is
+    marked conflict, the rest commit together and leave the queue. Writes to a key
+    with a failed / conflicting write wait ("held") until it is retried or discarded.
+    Losing the connection stops the replay with everything left pending.
+
+    Returns {"applied", "skipped", "conflicts", "failed", "held", "offline", "tables", "seconds"}.
+    """
+    queue = queue or QUEUE
+    conn_fn = conn_fn or services.get_conn_cursor
+    started = time.perf_counter()
+    out = {"applied": 0, "skipped": 0, "conflicts": 0, "failed": 0, "held": 0, "offline": None, "tables": []}
+    tables, after_id, batches = set(), 0, 0
+    blocked = queue.blocked_keys()
+    while max_batches is None or batches < max_batches:
+        entries = queue.pending(batch_size, after_id)
+        if not entries:
+            break
+        batches += 1
+        after_id = entries[-1]["id"]
+        done, marks = [], []
+        batch = dict.fromkeys(("applied", "skipped", "conflicts", "failed", "held"), 0)
+        batch_tables = set()
+        try:
+            conn, cursor = conn_fn()
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            out["offline"] = str(e)
+            break
+        try:
+            for entry in entries:
+                target = (entry["entity"], entry["key"])
+                if target in blocked:
+                    batch["held"] += 1
+                    continue
+                cursor.execute("SAVEPOINT queued_write")
+                try:
+                    outcome, detail = check_conflict(cursor, entry)
+                    if outcome == "apply":
+                        _apply(cursor, entry)
+                    cursor.execute("RELEASE SAVEPOINT queued_write")
+                except Exception as e:
+                    if is_connection_error(e):
+                        raise
+                    cursor.execute("ROLLBACK TO SAVEPOINT queued_write")
+                    outcome, detail = "failed", str(e)
+                if outcome == "apply":
+                    done.append(entry["id"])
+                    batch["applied"] += 1
+                    batch_tables.add(services.ENTITIES[entry["entity"]]["table"])
+                elif outcome == "skip":
+                    done.append(entry["id"])
+                    batch["skipped"] += 1
+                else:
+                    marks.append((entry["id"], outcome, detail))
+                    batch["conflicts" if outcome == "conflict" else "failed"] += 1
+                    blocked.add(target)
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            if not is_connection_error(e):
+                raise
+            out["offline"] = str(e)   # nothing of this batch was committed
+            break
+        finally:
+            conn.close()
+        for k, n in batch.items():
+            out[k] += n
+        tables |= batch_tables
+        queue.resolve(done, marks)
+    if tables:
+        services.invalidate(*tables)
+    out["tables"] = sorted(tables)
+    out["seconds"] = round(time.perf_counter() - started, 3)
+    return out
+
+
+def format_replay(result):
+    text = (f"Synced {result['applied']} queued write(s) in {result['seconds']:.2f}s"
+            + (f", {result['skipped']} already applied" if result["skipped"] else ""))
+    problems = [f"{result[k]} {label}" for k, label in (("conflicts", "conflict(s)"), ("failed", "failed"),
+                                                      ("held", "waiting on those")) if result[k]]
+    if problems:
+        text += "; " + ", ".join(problems)
+    if result["offline"]:
+        text += f"\nStopped, database unreachable: {result['offline']}"
+    return text
+
+
+def format_counts(counts):
+    return ", ".join(f"{n} {status}" for status, n in counts.items() if n) or "empty"